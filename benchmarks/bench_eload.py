@@ -0,0 +1,159 @@
+"""End-to-end benchmark of eloader on synthetic MELs.
+
+Each stage is timed separately and every run is appended to a JSON lines results
+file, so a regression shows up as a slower stage than the previous record of the
+same size. Run from the repository root with:
+
+    PYTHONPATH=src python benchmarks/bench_eload.py --rows 1000 --rows 100000
+"""
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+
+import click
+
+from eload import els_builder, read_client_mel, read_standards
+from synthetic import default_mccs, generate_project, project_files
+from writer import els_writer, mcc_writer
+
+STAGES = ["read_standards", "read_client_mel", "els_builder", "mcc_writer", "els_writer"]
+
+RESULTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results.jsonl")
+
+
+def version():
+    """ This function describes the checked out version of eloader."""
+
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def bench(standards, mel, output, columnar=False):
+    """ This function runs every stage once, returning the seconds each took."""
+
+    seconds = {}
+
+    start = time.perf_counter()
+    STANDARD = read_standards(standards)
+    seconds["read_standards"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    MEL = read_client_mel(mel, columnar)
+    seconds["read_client_mel"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    els = els_builder(STANDARD, MEL)
+    seconds["els_builder"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    mcc_writer(els, STANDARD, output)
+    seconds["mcc_writer"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    els_writer(els, STANDARD, output)
+    seconds["els_writer"] = time.perf_counter() - start
+
+    return seconds
+
+
+def previous_result(results_file, record):
+    """ This function returns the last recorded run of the same benchmark, if any."""
+
+    if not os.path.exists(results_file):
+        return None
+
+    same = ("rows", "mccs", "seed", "columnar")
+    previous = None
+    with open(results_file) as f:
+        for line in f:
+            result = json.loads(line)
+            if all(result.get(key) == record[key] for key in same):
+                previous = result
+    return previous
+
+
+@click.command()
+@click.option(
+    "--rows",
+    type=click.IntRange(min=1),
+    multiple=True,
+    default=[1000, 10000],
+    show_default=True,
+    help="Equipment rows to benchmark, may be given more than once.",
+)
+@click.option("--mccs", type=click.IntRange(min=1), help="Number of MCCs [default: rows / 200].")
+@click.option("--seed", type=int, default=0, show_default=True)
+@click.option("--columnar", is_flag=True, help="Store the MEL in columnar form.")
+@click.option(
+    "--data",
+    type=click.Path(file_okay=False),
+    default=os.path.join(tempfile.gettempdir(), "eloader-bench"),
+    show_default=True,
+    help="Folder the synthetic inputs are generated in, and reused from.",
+)
+@click.option(
+    "--results",
+    type=click.Path(dir_okay=False),
+    default=RESULTS_FILE,
+    show_default=True,
+    help="JSON lines file every run is appended to.",
+)
+def main(rows, mccs, seed, columnar, data, results):
+    """Benchmark eloader on synthetic MELs."""
+
+    click.echo(
+        "{:>8} {:>6}".format("rows", "mccs")
+        + "".join(" {:>16}".format(stage) for stage in STAGES)
+    )
+
+    for count in rows:
+        standards, mel = project_files(data, count, mccs, seed)
+        if not (os.path.exists(standards) and os.path.exists(mel)):
+            generate_project(data, count, mccs, seed)
+
+        with tempfile.TemporaryDirectory() as output:
+            seconds = bench(standards, mel, output, columnar)
+
+        record = {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "version": version(),
+            "python": platform.python_version(),
+            "rows": count,
+            "mccs": mccs or default_mccs(count),
+            "seed": seed,
+            "columnar": columnar,
+            "seconds": seconds,
+        }
+        previous = previous_result(results, record)
+
+        click.echo(
+            "{:>8} {:>6}".format(count, record["mccs"])
+            + "".join(
+                " {:>8.2f}s{:>7}".format(
+                    seconds[stage],
+                    "{:+.0%}".format(seconds[stage] / previous["seconds"][stage] - 1)
+                    if previous
+                    else "",
+                )
+                for stage in STAGES
+            )
+        )
+
+        with open(results, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+if __name__ == "__main__":
+
+    main()
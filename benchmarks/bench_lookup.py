@@ -0,0 +1,56 @@
+"""Benchmark of LookupTable against the linear-scan vlookup.
+
+Run from the repository root with:
+
+    PYTHONPATH=src python benchmarks/bench_lookup.py
+"""
+import random
+from timeit import timeit
+
+from data import (
+    CONTINGENCY_LOOKUP,
+    CONTINGENCY_TABLE,
+    LOAD_FACTOR,
+    LOAD_FACTOR_LOOKUP,
+    MOTOR_POWER_FACTOR,
+    MOTOR_POWER_FACTOR_LOOKUP,
+)
+from utility import vlookup
+
+
+def bench(name, table, lookup_table, keys, column, approximate_match=True, number=5):
+    linear = timeit(
+        lambda: [vlookup(key, table, column, approximate_match) for key in keys],
+        number=number,
+    )
+    indexed = timeit(
+        lambda: [lookup_table.lookup(key, column, approximate_match) for key in keys],
+        number=number,
+    )
+    print(
+        "{:<22} {:>10.1f} {:>10.1f} {:>8.1f}x".format(
+            name,
+            linear / number / len(keys) * 1e9,
+            indexed / number / len(keys) * 1e9,
+            linear / indexed,
+        )
+    )
+
+
+def main(rows=40000, seed=0):
+    rng = random.Random(seed)
+    kw_keys = [rng.choice(MOTOR_POWER_FACTOR)[0] * rng.uniform(1, 1.5) for _ in range(rows)]
+    type_keys = [rng.choice(LOAD_FACTOR)[0] for _ in range(rows)]
+    rating_keys = [rng.choice(CONTINGENCY_TABLE)[0] for _ in range(rows)]
+
+    print("{} lookups per table".format(rows))
+    print("{:<22} {:>10} {:>10} {:>9}".format("table", "vlookup ns", "indexed ns", "speedup"))
+    bench("MOTOR_POWER_FACTOR", MOTOR_POWER_FACTOR, MOTOR_POWER_FACTOR_LOOKUP, kw_keys, 2)
+    bench("LOAD_FACTOR", LOAD_FACTOR, LOAD_FACTOR_LOOKUP, type_keys, 2)
+    bench("LOAD_FACTOR (exact)", LOAD_FACTOR, LOAD_FACTOR_LOOKUP, type_keys, 2, False)
+    bench("CONTINGENCY_TABLE", CONTINGENCY_TABLE, CONTINGENCY_LOOKUP, rating_keys, 1)
+
+
+if __name__ == "__main__":
+
+    main()
@@ -0,0 +1,189 @@
+"""Seeded generator of synthetic Project Standards and MEL workbooks.
+
+Equipment types are drawn from LOAD_FACTOR and installed kW values from the
+MOTOR_POWER_FACTOR table, favouring the small motors that make up most of a
+real MEL. Run from the repository root with:
+
+    PYTHONPATH=src python benchmarks/synthetic.py 100000 --mccs 500 --output /tmp
+"""
+import math
+import os
+import random
+from datetime import datetime
+
+import click
+
+from data import CONTINGENCY_TABLE, LOAD_FACTOR, MOTOR_POWER_FACTOR
+from eload import STANDARD_CELLS
+
+# Equipment rows per MCC by default, which keeps every MCC within the largest
+# transformer size
+ROWS_PER_MCC = 200
+
+# Installed kW values, up to the motors a single MCC bucket commonly feeds
+KW_VALUES = [row[0] for row in MOTOR_POWER_FACTOR if 0 < row[0] <= 75]
+
+STARTER_TYPES = ["DOL", "DOL", "DOL", "VSD", "FEEDER"]
+
+# Operation mode of standby equipment, as eloader reads it
+STANDBY = 2
+
+# Bumped whenever generated rows change, so stale benchmark data is not reused
+MEL_FORMAT = 2
+
+MEL_HEADER = [
+    "Area",
+    "Type",
+    "Number",
+    "Equipment Name",
+    "Construction Workpack",
+    "MCC Number",
+    "Installed Power kW",
+    "Starter Type",
+    "Voltage",
+    "Duty/\nStandby",
+    "Rev",
+    " Procurement Rating",
+]
+
+
+def default_mccs(rows):
+    """ This function returns the default MCC count for a number of rows."""
+
+    return max(1, math.ceil(rows / ROWS_PER_MCC))
+
+
+def generate_standards(path, seed=0):
+    """ This function writes a synthetic Project Standards workbook."""
+
+    from openpyxl import Workbook
+
+    rng = random.Random(seed)
+    prepared = datetime(2020, rng.randint(1, 12), rng.randint(1, 28))
+
+    values = [
+        "No",
+        "SYNTHETIC",
+        seed,
+        "synthetic",
+        "8 Pair",
+        "4 Pair",
+        "4 Pair",
+        "2 Pair",
+        "Synthetic {}".format(seed),
+        "A",
+        "BM",
+        prepared,
+        "RV",
+        prepared,
+        rng.choice([0, 5, 10]),
+        rng.choice([3, 5]),
+        rng.choice([30, 45, 60]),
+        37,
+        350,
+        370,
+        "Above",
+        8000,
+        75,
+    ]
+
+    wb = Workbook()
+    ws = wb.active
+    for cell, value in zip(STANDARD_CELLS, values):
+        ws[cell] = value
+    wb.save(path)
+
+
+def generate_rows(rows, mccs, seed=0):
+    """ This function yields synthetic MEL rows spread evenly over mccs MCCs."""
+
+    rng = random.Random(seed)
+    # Types without load factors, such as stacks, carry no electrical load
+    types = [row[0] for row in LOAD_FACTOR if row[2] is not None]
+    ratings = [int(row[0]) for row in CONTINGENCY_TABLE]
+    per_mcc = math.ceil(rows / mccs)
+
+    for i in range(rows):
+        type = rng.choice(types)
+        yield (
+            100 + i // 1000,
+            type,
+            "{:03d}".format(i % 1000 + 1),
+            "SYNTHETIC {} {}".format(type, i + 1),
+            rng.randint(1, 9),
+            "MCC-{:03d}".format(i // per_mcc + 1),
+            # Smaller motors are far more common
+            KW_VALUES[int(len(KW_VALUES) * rng.random() ** 2)],
+            rng.choice(STARTER_TYPES),
+            415,
+            STANDBY if rng.random() < 0.15 else "DUTY",
+            "A",
+            rng.choice(ratings),
+        )
+
+
+def generate_mel(path, rows, mccs=None, seed=0):
+    """This function writes a synthetic MEL workbook.
+
+    The workbook is streamed, so MELs of a million rows can be generated.
+    """
+
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("MEL")
+
+    # Equipment rows start on row 8, below the title block and header
+    for _ in range(6):
+        ws.append([])
+    ws.append(MEL_HEADER)
+    for row in generate_rows(rows, mccs or default_mccs(rows), seed):
+        ws.append(row)
+
+    wb.save(path)
+
+
+def project_files(folder, rows, mccs=None, seed=0):
+    """ This function returns the standards and MEL paths of a synthetic project."""
+
+    return (
+        os.path.join(folder, "standards-{}.xlsx".format(seed)),
+        os.path.join(
+            folder,
+            "mel-{}-{}-{}-v{}.xlsx".format(
+                rows, mccs or default_mccs(rows), seed, MEL_FORMAT
+            ),
+        ),
+    )
+
+
+def generate_project(folder, rows, mccs=None, seed=0):
+    """This function writes a synthetic standards and MEL pair into folder.
+
+    Returns the paths of the standards and MEL workbooks.
+    """
+
+    os.makedirs(folder, exist_ok=True)
+    standards, mel = project_files(folder, rows, mccs, seed)
+
+    generate_standards(standards, seed)
+    generate_mel(mel, rows, mccs, seed)
+
+    return standards, mel
+
+
+@click.command()
+@click.argument("rows", type=click.IntRange(min=1))
+@click.option("--mccs", type=click.IntRange(min=1), help="Number of MCCs.")
+@click.option("--seed", type=int, default=0, show_default=True)
+@click.option("--output", type=click.Path(file_okay=False), default=".", show_default=True)
+def main(rows, mccs, seed, output):
+    """Generate a synthetic standards and MEL pair of ROWS equipment rows."""
+
+    for path in generate_project(output, rows, mccs, seed):
+        click.echo(path)
+
+
+if __name__ == "__main__":
+
+    main()
@@ -5,6 +5,11 @@ requirements = [
     "openpyxl==3.0.5",
 ]
 
+extras = {
+    "batch": ["numpy==1.23.5"],
+    "parquet": ["numpy==1.23.5", "pyarrow==12.0.1"],
+}
+
 setup(
     name="eload",
     version="0.1.1",
@@ -14,11 +19,18 @@ setup(
     author_email="devan.rehunathan@technogen.com.au",
     url="https://www.technogen.com.au/",
     package_dir={'': 'src'},
-    py_modules=["cli", "eload", "data", "writer", "utility"],
+    py_modules=["cli", "eload", "data", "writer", "utility", "batch", "columnar", "stream", "runcache", "rowcache", "watch", "projects", "profiler", "server", "readers", "scenarios", "simulation", "profiles"],
     install_requires=requirements,
+    extras_require=extras,
     entry_points={
         "console_scripts": [
             "eloader = cli:main",
+            "eloader-batch = cli:batch_cli",
+            "eloader-cache = cli:cache_cli",
+            "eloader-serve = cli:serve_cli",
+            "eloader-client = cli:client_cli",
+            "eloader-scenarios = cli:scenarios_cli",
+            "eloader-simulate = cli:simulate_cli",
         ]
     },
 )
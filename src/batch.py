@@ -0,0 +1,185 @@
+"""Vectorized batch engine for Mechanical Equipment calculations.
+
+This module requires NumPy, which is an optional dependency:
+
+    pip install eload[batch]
+"""
+from math import acos, tan
+from typing import Any
+
+import numpy as np
+
+from data import CONTINGENCY_LOOKUP, LOAD_FACTOR_LOOKUP, MOTOR_POWER_FACTOR_LOOKUP
+from dataclasses import dataclass
+from readers import read_mel_columns
+
+VSD_STARTERS = ["VSD", "VSD Dual"]
+VSD_POWER_FACTOR = 0.9
+
+# Scaled values closer than this to a rounding midpoint are rounded by the
+# builtin round, which works on the exact binary value.
+MIDPOINT_TOLERANCE = 1e-7
+
+
+def round_array(values, decimals=0):
+    """ This function emulates the builtin round over an array."""
+
+    multiplier = 10 ** decimals
+    scaled = values * multiplier
+    rounded = np.rint(scaled) / multiplier
+
+    fraction = scaled - np.floor(scaled)
+    for i in np.flatnonzero(np.abs(fraction - 0.5) < MIDPOINT_TOLERANCE):
+        rounded[i] = round(float(values[i]), decimals)
+
+    return rounded
+
+
+def round_up_array(values, decimals=0):
+    """ This function emulates utility.round_up over an array."""
+
+    multiplier = 10 ** decimals
+    return np.ceil(values * multiplier) / multiplier
+
+
+def lookup_array(keys, lookup_table, column):
+    """ This function performs a LookupTable lookup for every key in an array.
+
+    Numeric keys are matched with a single searchsorted over the table keys.
+    Other keys are looked up once per distinct value. Missing matches are NaN.
+    """
+
+    if keys.dtype.kind in "biuf":
+        table_keys = np.asarray(lookup_table.keys, dtype=float)
+        values = np.array(
+            [np.nan] + [_float(row[column]) for row in lookup_table.rows], dtype=float
+        )
+        return values[np.searchsorted(table_keys, keys, side="right")]
+
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    values = np.array(
+        [_float(lookup_table.lookup(key, column)) for key in unique_keys.tolist()],
+        dtype=float,
+    )
+    return values[inverse]
+
+
+def _float(value):
+    return np.nan if value is None else float(value)
+
+
+@dataclass
+class MechanicalEquipmentBatch:
+    """Class for the derived electrical details of a batch of Mechanical Equipment."""
+
+    installed_kw: Any
+    efficiency: Any
+    power_factor: Any
+    kva: Any
+    load_factor: Any
+    diversity_utilisation: Any
+    avg_load_factor: Any
+    max_kw: Any
+    max_kvar: Any
+    max_kva: Any
+    avg_load_kw: Any
+    avg_load_kva: Any
+    contingency_factor: Any
+    spare_capacity: Any
+
+    def __len__(self):
+        return len(self.installed_kw)
+
+
+def me_batch_builder(installed_kw, type, starter_type, operation_mode, procurement_rating):
+    """This method computes the MechanicalEquipment derived fields for whole columns.
+
+    Each argument is a sequence with one value per equipment item, in the raw
+    form accepted by `me_builder`. Results match MechanicalEquipment row for row.
+    """
+
+    installed_kw = np.asarray(installed_kw, dtype=float)
+    type = np.asarray(type).astype(str)
+    starter_type = np.asarray(starter_type).astype(str)
+    standby = np.asarray(operation_mode, dtype=object) == 2
+    procurement_rating = np.asarray(procurement_rating).astype(str)
+
+    efficiency = lookup_array(installed_kw, MOTOR_POWER_FACTOR_LOOKUP, 1)
+
+    power_factor = np.where(
+        np.isin(starter_type, VSD_STARTERS),
+        VSD_POWER_FACTOR,
+        lookup_array(installed_kw, MOTOR_POWER_FACTOR_LOOKUP, 2),
+    )
+
+    kva = round_array(installed_kw / efficiency / power_factor, 1)
+
+    load_factor = np.where(standby, 0.0, lookup_array(type, LOAD_FACTOR_LOOKUP, 2))
+
+    diversity_utilisation = np.where(
+        standby, 0.0, lookup_array(type, LOAD_FACTOR_LOOKUP, 3)
+    )
+
+    avg_load_factor = round_up_array(load_factor * diversity_utilisation, 3)
+
+    max_kw = round_up_array(installed_kw * load_factor, 1)
+
+    # Power factors only take a handful of distinct values
+    unique_power_factors, inverse = np.unique(power_factor, return_inverse=True)
+    reactive_ratio = np.array(
+        [round(tan(acos(pf)), 2) for pf in unique_power_factors.tolist()], dtype=float
+    )[inverse]
+
+    max_kvar = round_array(max_kw * reactive_ratio, 1)
+
+    max_kva = round_array(kva * load_factor, 1)
+
+    avg_load_kw = round_array(installed_kw * avg_load_factor, 1)
+
+    avg_load_kva = round_array(kva * avg_load_factor, 1)
+
+    contingency_factor = lookup_array(procurement_rating, CONTINGENCY_LOOKUP, 1)
+
+    spare_capacity = round_array(contingency_factor * avg_load_kva, 2)
+
+    return MechanicalEquipmentBatch(
+        installed_kw,
+        efficiency,
+        power_factor,
+        kva,
+        load_factor,
+        diversity_utilisation,
+        avg_load_factor,
+        max_kw,
+        max_kvar,
+        max_kva,
+        avg_load_kw,
+        avg_load_kva,
+        contingency_factor,
+        spare_capacity,
+    )
+
+
+def mel_batch_builder(rows):
+    """ This method computes a MechanicalEquipmentBatch from ME excel row data."""
+
+    columns = list(zip(*rows)) or [()] * 12
+
+    return mel_columns_batch_builder(columns)
+
+
+def mel_columns_batch_builder(columns):
+    """ This method computes a MechanicalEquipmentBatch from the 12 MEL columns."""
+
+    return me_batch_builder(
+        columns[6], columns[1], columns[7], columns[9], columns[11]
+    )
+
+
+def read_mel_batch(mel):
+    """This method computes a MechanicalEquipmentBatch straight from a MEL file.
+
+    Parquet MELs are read as whole columns, skipping the per-row objects.
+    """
+
+    return mel_columns_batch_builder(read_mel_columns(mel))
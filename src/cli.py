@@ -1,19 +1,554 @@
+import json
+import os
+import sys
+import time
+
 import click
 
-from eload import eload
+from eload import eload, equipment_cache_info
+from profiler import NULL_PROFILER, Profiler
+from readers import MELError
+from runcache import RunCache
 
 
 @click.command()
 @click.argument("standards", type=click.Path(exists=True))
-@click.argument("mel", type=click.Path(exists=True))
-def main(standards, mel):
+@click.argument("mel", nargs=-1, required=True, type=click.Path(exists=True))
+@click.option(
+    "--sheet",
+    multiple=True,
+    help="Sheet to read from every excel MEL, may be given more than once "
+    "[default: the active sheet].",
+)
+@click.option(
+    "--columnar",
+    is_flag=True,
+    help="Store the MEL in columnar form to reduce memory use.",
+)
+@click.option(
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of MEL files to read and MCC workbooks to write in parallel.",
+)
+@click.option(
+    "--output-engine",
+    type=click.Choice(["template", "stream"]),
+    default="template",
+    show_default=True,
+    help="Edit the templates in memory, or stream rows for very large MELs.",
+)
+@click.option(
+    "--input-engine",
+    type=click.Choice(["openpyxl", "xml"]),
+    default="openpyxl",
+    show_default=True,
+    help="Read excel MELs with openpyxl, or parse the sheet XML directly.",
+)
+@click.option(
+    "--incremental",
+    is_flag=True,
+    help="Only rewrite the workbooks whose contents changed since the last run.",
+)
+@click.option(
+    "--load-profile",
+    type=click.IntRange(min=1),
+    help="Also write the LOAD PROFILE workbook of every MCC over a year, with this "
+    "many steps per hour.",
+)
+@click.option(
+    "--duty-cycles",
+    type=click.Path(exists=True, dir_okay=False),
+    help="JSON file of the duty cycles of equipment types in the load profile. "
+    "Needs --load-profile.",
+)
+@click.option(
+    "--cache",
+    is_flag=True,
+    help="Serve repeated runs of the same inputs from the run cache.",
+)
+@click.option(
+    "--row-cache",
+    is_flag=True,
+    help="Cache the rows read from the input files next to them.",
+)
+@click.option(
+    "--watch",
+    is_flag=True,
+    help="Keep running and rebuild the changed outputs whenever an input file is saved.",
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Report the time, rows and memory of every stage of the run.",
+)
+@click.option(
+    "--profile-output",
+    type=click.Path(dir_okay=False),
+    help="Write the stage report to a JSON file.",
+)
+@click.option(
+    "--pstats",
+    type=click.Path(file_okay=False),
+    help="Dump cProfile statistics of every stage into a folder.",
+)
+def main(
+    standards,
+    mel,
+    sheet,
+    columnar,
+    jobs,
+    output_engine,
+    input_engine,
+    incremental,
+    load_profile,
+    duty_cycles,
+    cache,
+    row_cache,
+    watch,
+    profile,
+    profile_output,
+    pstats,
+):
     """eMax ELoader Command Line Interface
 
     STANDARDS is an excel file that contains the project standard details.
 
-    MEL is an excel file that contains the Mechanical Equipment List.
+    MEL is an excel, CSV, JSON lines or Parquet file that contains the Mechanical
+    Equipment List. Several MEL files may be given, which are read in parallel
+    and merged into one.
+    """
+    if watch:
+        from watch import Watcher, watch as watch_inputs
+
+        if len(mel) > 1 or sheet:
+            raise click.UsageError("--watch follows a single MEL file and sheet.")
+
+        ignored = [
+            option
+            for option, value in (
+                ("--columnar", columnar),
+                ("--incremental", incremental),
+                ("--cache", cache),
+                ("--row-cache", row_cache),
+                ("--profile", profile),
+                ("--profile-output", profile_output),
+                ("--pstats", pstats),
+                ("--load-profile", load_profile),
+                ("--duty-cycles", duty_cycles),
+            )
+            if value
+        ]
+        if ignored:
+            raise click.UsageError(
+                "--watch cannot be combined with {}.".format(", ".join(ignored))
+            )
+        (mel,) = mel
+
+        click.echo("Watching {} and {}, press Ctrl+C to stop.".format(standards, mel))
+        try:
+            watch_inputs(
+                Watcher(standards, mel, jobs, output_engine, input_engine=input_engine),
+                click.echo,
+            )
+        except KeyboardInterrupt:
+            pass
+        return
+
+    if profile or profile_output or pstats:
+        profiler = Profiler(pstats)
+    else:
+        profiler = NULL_PROFILER
+
+    if duty_cycles and not load_profile:
+        raise click.UsageError("--duty-cycles needs --load-profile.")
+
+    if duty_cycles:
+        from profiles import read_duty_cycles
+
+        duty_cycles = read_duty_cycles(duty_cycles)
+
+    cache_info = equipment_cache_info()
+    try:
+        errors = eload(
+            standards,
+            list(mel),
+            columnar,
+            jobs,
+            output_engine,
+            incremental,
+            RunCache() if cache else None,
+            row_cache,
+            profiler=profiler,
+            input_engine=input_engine,
+            sheets=list(sheet),
+            load_profile=load_profile,
+            duty_cycles=duty_cycles,
+        )
+    except MELError as error:
+        raise click.ClickException(str(error))
+
+    if profile:
+        click.echo(profiler.format())
+
+        hits = equipment_cache_info().hits - cache_info.hits
+        misses = equipment_cache_info().misses - cache_info.misses
+        click.echo(
+            "Equipment cache: {} hits, {} misses ({:.1%} of equipment shared)".format(
+                hits, misses, hits / (hits + misses) if hits + misses else 0
+            )
+        )
+    if profile_output:
+        with open(profile_output, "w") as f:
+            json.dump(profiler.report(), f, indent=2)
+
+    for name, error in errors.items():
+        click.echo("Unable to write {}: {}".format(name, error), err=True)
+
+    if errors:
+        sys.exit(1)
+
+
+@click.command()
+@click.argument("manifest", type=click.Path(exists=True))
+@click.option(
+    "--output",
+    type=click.Path(file_okay=False),
+    default="output",
+    show_default=True,
+    help="Folder the project output folders are created in.",
+)
+@click.option(
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of projects to run in parallel.",
+)
+@click.option(
+    "--output-engine",
+    type=click.Choice(["template", "stream"]),
+    default="template",
+    show_default=True,
+    help="Edit the templates in memory, or stream rows for very large MELs.",
+)
+@click.option(
+    "--row-cache",
+    is_flag=True,
+    help="Cache the rows read from the input files next to them.",
+)
+def batch_cli(manifest, output, jobs, output_engine, row_cache):
+    """eMax ELoader batch mode
+
+    MANIFEST is a CSV file listing one project per row, with name, standards
+    and mel columns and an optional output column.
+    """
+    from projects import read_projects, run_projects
+
+    def report(result):
+        click.echo(
+            "{} {} in {:.1f}s".format(
+                result.name, "done" if result.ok else "FAILED", result.seconds
+            )
+        )
+
+    start = time.perf_counter()
+    results = run_projects(
+        read_projects(manifest, output), jobs, output_engine, row_cache, report
+    )
+    failed = [result for result in results if not result.ok]
+
+    click.echo("")
+    click.echo("{:<30} {:<8} {:>9}  {}".format("PROJECT", "STATUS", "SECONDS", "OUTPUT"))
+    for result in results:
+        click.echo(
+            "{:<30} {:<8} {:>9.1f}  {}".format(
+                result.name,
+                "ok" if result.ok else "failed",
+                result.seconds,
+                result.output_folder,
+            )
+        )
+    for result in failed:
+        for name, error in result.errors.items():
+            # Errors raised before writing are recorded under the project name
+            if name == result.name:
+                click.echo("{}: {}".format(result.name, error), err=True)
+            else:
+                click.echo(
+                    "{}: unable to write {}: {}".format(result.name, name, error),
+                    err=True,
+                )
+
+    click.echo(
+        "{} of {} projects succeeded in {:.1f}s".format(
+            len(results) - len(failed), len(results), time.perf_counter() - start
+        )
+    )
+
+    if failed:
+        sys.exit(1)
+
+
+@click.command()
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option("--port", type=int, default=8642, show_default=True)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=2,
+    show_default=True,
+    help="Number of jobs to run at once.",
+)
+@click.option(
+    "--queue-size",
+    type=click.IntRange(min=0),
+    default=8,
+    show_default=True,
+    help="Number of jobs that may wait for a worker before jobs are refused.",
+)
+@click.option(
+    "--output-root",
+    type=click.Path(exists=True, file_okay=False),
+    default=".",
+    show_default=True,
+    help="Folder that every job output folder must be inside.",
+)
+def serve_cli(host, port, workers, queue_size, output_root):
+    """eMax ELoader service
+
+    Keeps the templates and lookup tables warm and runs the jobs forwarded by
+    eloader-client.
+    """
+    from server import serve
+
+    click.echo("Serving eloader on http://{}:{}, press Ctrl+C to stop.".format(host, port))
+    try:
+        serve(host, port, workers, queue_size, output_root)
+    except KeyboardInterrupt:
+        pass
+
+
+@click.command()
+@click.argument("standards", type=click.Path(exists=True))
+@click.argument("mel", type=click.Path(exists=True))
+@click.option(
+    "--output",
+    type=click.Path(file_okay=False),
+    default="output",
+    show_default=True,
+    help="Folder the workbooks are written into.",
+)
+@click.option(
+    "--url",
+    default="http://127.0.0.1:8642",
+    show_default=True,
+    help="Address of the eloader service.",
+)
+@click.option(
+    "--output-engine",
+    type=click.Choice(["template", "stream"]),
+    default="template",
+    show_default=True,
+    help="Edit the templates in memory, or stream rows for very large MELs.",
+)
+@click.option(
+    "--row-cache",
+    is_flag=True,
+    help="Cache the rows read from the input files next to them.",
+)
+def client_cli(standards, mel, output, url, output_engine, row_cache):
+    """eMax ELoader client
+
+    Forwards a STANDARDS and MEL pair to a running eloader-serve service.
     """
-    eload(standards, mel)
+    from server import JobError, submit_job
+
+    try:
+        reply = submit_job(standards, mel, output, url, output_engine, row_cache)
+    except JobError as error:
+        click.echo("The eloader service refused the job: {}".format(error), err=True)
+        sys.exit(1)
+    except OSError as error:
+        click.echo("Unable to reach the eloader service at {}: {}".format(url, error), err=True)
+        sys.exit(1)
+
+    for name in reply["files"]:
+        click.echo(os.path.join(reply["output"], name))
+    for name, error in reply["errors"].items():
+        click.echo("Unable to write {}: {}".format(name, error), err=True)
+
+    if reply["errors"]:
+        sys.exit(1)
+
+
+@click.command()
+@click.argument("standards", type=click.Path(exists=True))
+@click.argument("mel", type=click.Path(exists=True))
+@click.option(
+    "--scenarios",
+    "scenarios_file",
+    type=click.Path(exists=True, dir_okay=False),
+    help="JSON file listing named scenarios.",
+)
+@click.option(
+    "--procurement-rating",
+    multiple=True,
+    help="Procurement rating to give all equipment, may be given more than once.",
+)
+@click.option(
+    "--contingency-percent",
+    type=float,
+    multiple=True,
+    help="MCC contingency factor percent as a fraction, may be given more than once.",
+)
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False),
+    help="Write the tx_size and cost of every MCC in every scenario to a CSV file.",
+)
+def scenarios_cli(standards, mel, scenarios_file, procurement_rating, contingency_percent, output):
+    """eMax ELoader what-if scenarios
+
+    Reports the transformer cost of a STANDARDS and MEL pair under every
+    scenario, against the project as it stands. Every combination of the
+    --procurement-rating and --contingency-percent values is a scenario.
+    """
+    from eload import read_client_mel, read_standards
+    from scenarios import Scenario, ScenarioModel, read_scenarios, scenario_grid, write_report
+
+    scenarios = [Scenario("base")]
+    if scenarios_file:
+        scenarios.extend(read_scenarios(scenarios_file))
+    scenarios.extend(scenario_grid(procurement_rating, contingency_percent))
+
+    model = ScenarioModel(read_standards(standards), read_client_mel(mel))
+    result = model.evaluate(scenarios)
+
+    click.echo("{:<40} {:>14} {:>14}".format("SCENARIO", "TX COST", "TX CHANGES"))
+    for i, scenario in enumerate(scenarios):
+        click.echo(
+            "{:<40} {:>14,.0f} {:>14}".format(
+                scenario.name,
+                result.total_transformer_cost[i],
+                int((result.tx_size[i] != result.tx_size[0]).sum()),
+            )
+        )
+
+    if output:
+        write_report(result, output)
+
+
+@click.command()
+@click.argument("standards", type=click.Path(exists=True))
+@click.argument("mel", type=click.Path(exists=True))
+@click.option(
+    "--trials",
+    type=click.IntRange(min=1),
+    default=10000,
+    show_default=True,
+    help="Number of Monte Carlo trials.",
+)
+@click.option(
+    "--distribution",
+    type=click.Choice(["triangular", "uniform", "normal"]),
+    default="triangular",
+    show_default=True,
+    help="Distribution of the load factors and diversity utilisations.",
+)
+@click.option(
+    "--spread",
+    type=click.FloatRange(min=0),
+    default=0.2,
+    show_default=True,
+    help="Relative spread of the load factors and diversity utilisations.",
+)
+@click.option(
+    "--contingency-spread",
+    type=click.FloatRange(min=0),
+    default=0.0,
+    show_default=True,
+    help="Relative spread of the procurement rating contingency factors.",
+)
+@click.option("--seed", type=int, help="Seed of the random draws.")
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False),
+    help="Write the simulated demand of every MCC to a CSV file.",
+)
+def simulate_cli(standards, mel, trials, distribution, spread, contingency_spread, seed, output):
+    """eMax ELoader load uncertainty simulation
+
+    Reports the percentile demand of every MCC of a STANDARDS and MEL pair, and
+    how likely it is to exceed its transformer size.
+    """
+    from eload import els_builder, read_client_mel, read_standards
+    from simulation import FactorDistribution, LoadSimulation, report_columns, write_report
+
+    els = els_builder(read_standards(standards), read_client_mel(mel))
+    result = LoadSimulation(els).run(
+        trials,
+        FactorDistribution(distribution, spread),
+        FactorDistribution(distribution, contingency_spread),
+        seed,
+    )
+
+    # Every column is as wide as its header name, and at least 10 characters
+    columns = report_columns()
+    widths = [max(len(column), 10) for column in columns]
+    click.echo("  ".join(column.rjust(width) for column, width in zip(columns, widths)))
+    for row in result.rows():
+        values = (
+            ["{}".format(value) for value in row[:2]]
+            + ["{:.1f}".format(value) for value in row[2:-2]]
+            + ["{:.1%}".format(value) for value in row[-2:]]
+        )
+        click.echo("  ".join(value.rjust(width) for value, width in zip(values, widths)))
+
+    if output:
+        write_report(result, output)
+
+
+@click.group()
+def cache_cli():
+    """eMax ELoader run cache
+
+    The cache folder and size cap are set by the ELOADER_CACHE_DIR and
+    ELOADER_CACHE_MB environment variables.
+    """
+
+
+@cache_cli.command()
+def info():
+    """Show the cached runs, least recently used first."""
+
+    from datetime import datetime
+
+    cache = RunCache()
+    entries = cache.entries()
+
+    click.echo("Cache folder: {}".format(cache.path))
+    click.echo(
+        "{} entries, {:.1f} of {:.1f} MB used".format(
+            len(entries),
+            sum(size for _, size, _ in entries) / 2 ** 20,
+            cache.max_size / 2 ** 20,
+        )
+    )
+    for key, size, last_used in entries:
+        click.echo(
+            "{}  {:>10.1f} kB  {:%Y-%m-%d %H:%M}".format(
+                key[:16], size / 2 ** 10, datetime.fromtimestamp(last_used)
+            )
+        )
+
+
+@cache_cli.command()
+def purge():
+    """Remove every cached run."""
+
+    click.echo("Removed {} entries".format(RunCache().purge()))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,218 @@
+"""Columnar storage for Mechanical Equipment Lists."""
+from array import array
+
+# Low cardinality string fields, stored as codes into a list of distinct values
+INTERNED_FIELDS = [
+    "area",
+    "type",
+    "workpack",
+    "mcc_number",
+    "starter_type",
+    "operation_mode",
+    "rev",
+    "procurement_rating",
+]
+
+# High cardinality string fields, stored as plain lists
+TEXT_FIELDS = [
+    "number",
+    "name",
+]
+
+FLOAT_FIELDS = [
+    "installed_kw",
+    "voltage",
+    "contingency_factor",
+    "power_factor",
+    "efficiency",
+    "kva",
+    "load_factor",
+    "diversity_utilisation",
+    "avg_load_factor",
+    "max_kw",
+    "max_kvar",
+    "max_kva",
+    "avg_load_kw",
+    "avg_load_kva",
+    "spare_capacity",
+]
+
+
+class MechanicalEquipmentView:
+    """Class for a read-only row view into a ColumnarMEL.
+
+    Exposes the same attributes as MechanicalEquipment.
+    """
+
+    __slots__ = ("columns", "index")
+
+    def __init__(self, columns, index):
+        self.columns = columns
+        self.index = index
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return self.columns.value(name, self.index)
+
+    def __repr__(self):
+        return "MechanicalEquipmentView({!r})".format(self.tag_number)
+
+
+class ColumnarMEL:
+    """Class for a struct-of-arrays Mechanical Equipment List.
+
+    Numeric fields are stored in typed arrays and low cardinality string fields
+    are interned. Indexing and iteration yield MechanicalEquipmentView rows.
+    """
+
+    def __init__(self):
+        self.floats = {name: array("d") for name in FLOAT_FIELDS}
+        self.codes = {name: array("I") for name in INTERNED_FIELDS}
+        self.categories = {name: [] for name in INTERNED_FIELDS}
+        self.text = {name: [] for name in TEXT_FIELDS}
+        self._category_codes = {name: {} for name in INTERNED_FIELDS}
+
+    @classmethod
+    def from_mel(cls, mel):
+        """ This method creates a ColumnarMEL from MechanicalEquipment objects."""
+
+        columns = cls()
+        for me in mel:
+            columns.append(me)
+        return columns
+
+    def append(self, me):
+        """ This method appends a MechanicalEquipment object."""
+
+        for name, values in self.floats.items():
+            values.append(getattr(me, name))
+
+        for name, codes in self.codes.items():
+            codes.append(self._intern(name, getattr(me, name)))
+
+        for name, values in self.text.items():
+            values.append(getattr(me, name))
+
+    def pop(self):
+        """ This method removes the last row, undoing the last append."""
+
+        for values in (*self.floats.values(), *self.codes.values(), *self.text.values()):
+            values.pop()
+
+    def _intern(self, name, value):
+        category_codes = self._category_codes[name]
+        try:
+            return category_codes[value]
+        except KeyError:
+            code = category_codes[value] = len(self.categories[name])
+            self.categories[name].append(value)
+            return code
+
+    def select(self, indices):
+        """ This method returns a new ColumnarMEL holding the given rows."""
+
+        columns = ColumnarMEL()
+        for name, values in self.floats.items():
+            columns.floats[name] = array("d", [values[i] for i in indices])
+        for name, codes in self.codes.items():
+            columns.codes[name] = array("I", [codes[i] for i in indices])
+            columns.categories[name] = list(self.categories[name])
+            columns._category_codes[name] = dict(self._category_codes[name])
+        for name, values in self.text.items():
+            columns.text[name] = [values[i] for i in indices]
+        return columns
+
+    def partition(self, name):
+        """This method buckets rows by an interned field in a single pass.
+
+        Returns a dict of field value to ColumnarMEL, in first-seen order.
+        """
+
+        buckets = {}
+        for i, code in enumerate(self.codes[name]):
+            try:
+                buckets[code].append(i)
+            except KeyError:
+                buckets[code] = [i]
+
+        categories = self.categories[name]
+        return {
+            categories[code]: self.select(indices) for code, indices in buckets.items()
+        }
+
+    def column(self, name):
+        """ This method returns every value of a field, in row order."""
+
+        if name in self.floats:
+            return self.floats[name]
+        if name in self.codes:
+            categories = self.categories[name]
+            return [categories[code] for code in self.codes[name]]
+        if name in self.text:
+            return self.text[name]
+        if name == "tag_number":
+            return [
+                area + type + number
+                for area, type, number in zip(
+                    self.column("area"), self.column("type"), self.text["number"]
+                )
+            ]
+        raise AttributeError(name)
+
+    def value(self, name, index):
+        """ This method returns a single field value."""
+
+        if name in self.floats:
+            return self.floats[name][index]
+        if name in self.codes:
+            return self.categories[name][self.codes[name][index]]
+        if name in self.text:
+            return self.text[name][index]
+        if name == "tag_number":
+            return (
+                self.value("area", index)
+                + self.value("type", index)
+                + self.text["number"][index]
+            )
+        raise AttributeError(name)
+
+    def __len__(self):
+        return len(self.floats["installed_kw"])
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ColumnarMEL index out of range")
+        return MechanicalEquipmentView(self, index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield MechanicalEquipmentView(self, index)
+
+
+def mcc_partitions(mel):
+    """This function buckets a MEL by mcc_number in a single pass.
+
+    Returns a dict of mcc_number to that MCC's equipment, in first-seen order.
+    """
+
+    if isinstance(mel, ColumnarMEL):
+        return mel.partition("mcc_number")
+
+    partitions = {}
+    for me in mel:
+        try:
+            partitions[me.mcc_number].append(me)
+        except KeyError:
+            partitions[me.mcc_number] = [me]
+    return partitions
+
+
+def mel_column(mel, name):
+    """ This function returns every value of a field across a MEL, in row order."""
+
+    if isinstance(mel, ColumnarMEL):
+        return mel.column(name)
+    return (getattr(me, name) for me in mel)
@@ -1,3 +1,5 @@
+from utility import LookupTable
+
 MOTOR_POWER_FACTOR = [
     [0.00, 0.545, 0.550],
     [0.06, 0.545, 0.550],
@@ -148,3 +150,11 @@ TRANSFORMER_PRICING = [
     [10000, 250000],
     [11000, 300000],
 ]
+
+MOTOR_POWER_FACTOR_LOOKUP = LookupTable(MOTOR_POWER_FACTOR)
+
+LOAD_FACTOR_LOOKUP = LookupTable(LOAD_FACTOR)
+
+CONTINGENCY_LOOKUP = LookupTable(CONTINGENCY_TABLE)
+
+TRANSFORMER_PRICING_LOOKUP = LookupTable(TRANSFORMER_PRICING)
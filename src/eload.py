@@ -1,18 +1,32 @@
 from datetime import date
+from collections import Counter
 from enum import Enum
+from functools import lru_cache
 from math import acos, ceil, tan
+from operator import attrgetter
 from typing import List
 
 from data import (
-    CONTINGENCY_TABLE,
-    LOAD_FACTOR,
-    MOTOR_POWER_FACTOR,
-    TRANSFORMER_PRICING,
+    CONTINGENCY_LOOKUP,
+    LOAD_FACTOR_LOOKUP,
+    MOTOR_POWER_FACTOR_LOOKUP,
+    TRANSFORMER_PRICING_LOOKUP,
     VSD_CONTINGENCY,
 )
+from columnar import ColumnarMEL, mcc_partitions, mel_column
 from dataclasses import dataclass, field
-from utility import round_up, vlookup
-from writer import mcc_writer, els_writer, clear_output
+from profiler import NULL_PROFILER
+from readers import (
+    MEL_FIRST_ROW,
+    MELError,
+    is_excel_mel,
+    iter_xlsx_rows,
+    mel_reader,
+    workbook_sheet,
+)
+from rowcache import cached_rows
+from utility import ExactSum, round_up
+from writer import OUTPUT_FOLDER, clear_output, output_files, write_outputs
 
 
 class OperationMode(Enum):
@@ -250,49 +264,225 @@ class MechanicalEquipment:
 
         self.tag_number = self.area + self.type + self.number
 
-        self.efficiency = vlookup(self.installed_kw, MOTOR_POWER_FACTOR, 1)
+        (
+            self.efficiency,
+            self.power_factor,
+            self.kva,
+            self.load_factor,
+            self.diversity_utilisation,
+            self.avg_load_factor,
+            self.max_kw,
+            self.max_kvar,
+            self.max_kva,
+            self.avg_load_kw,
+            self.avg_load_kva,
+            self.contingency_factor,
+            self.spare_capacity,
+        ) = equipment_quantities(
+            self.installed_kw,
+            self.type,
+            self.starter_type,
+            self.operation_mode,
+            self.procurement_rating,
+            MOTOR_POWER_FACTOR_LOOKUP,
+            LOAD_FACTOR_LOOKUP,
+            CONTINGENCY_LOOKUP,
+        )
 
-        if self.starter_type in ["VSD", "VSD Dual"]:
-            self.power_factor = 0.9
-        else:
-            self.power_factor = vlookup(self.installed_kw, MOTOR_POWER_FACTOR, 2)
 
-        self.kva = round(self.installed_kw / self.efficiency / self.power_factor, 1)
+# Electrical signatures whose derived quantities are kept
+EQUIPMENT_CACHE_SIZE = 4096
 
-        if self.operation_mode == 2:
-            self.load_factor = 0
-        else:
-            self.load_factor = vlookup(self.type, LOAD_FACTOR, 2)
 
-        if self.operation_mode == 2:
-            self.diversity_utilisation = 0
-        else:
-            self.diversity_utilisation = vlookup(self.type, LOAD_FACTOR, 3)
+@lru_cache(maxsize=EQUIPMENT_CACHE_SIZE, typed=True)
+def equipment_quantities(
+    installed_kw,
+    type,
+    starter_type,
+    operation_mode,
+    procurement_rating,
+    motor_power_factor_lookup,
+    load_factor_lookup,
+    contingency_lookup,
+):
+    """This method returns the derived quantities of a Mechanical Equipment.
 
-        self.avg_load_factor = round_up(
-            self.load_factor * self.diversity_utilisation, 3
-        )
+    They depend only on its electrical signature and the lookup tables, so
+    identical motors share one calculation. The tables are part of the cache key
+    so that replacing one never returns quantities computed with the other.
+    Returns the quantities in the order __post_init__ assigns them.
+    """
 
-        self.max_kw = round_up(self.installed_kw * self.load_factor, 1)
+    efficiency = motor_power_factor_lookup.lookup(installed_kw, 1)
 
-        self.max_kvar = round(self.max_kw * round(tan(acos(self.power_factor)), 2), 1)
+    if starter_type in ["VSD", "VSD Dual"]:
+        power_factor = 0.9
+    else:
+        power_factor = motor_power_factor_lookup.lookup(installed_kw, 2)
 
-        self.max_kva = round(self.kva * self.load_factor, 1)
+    kva = round(installed_kw / efficiency / power_factor, 1)
 
-        self.avg_load_kw = round(self.installed_kw * self.avg_load_factor, 1)
+    if operation_mode == 2:
+        load_factor = 0
+    else:
+        load_factor = load_factor_lookup.lookup(type, 2)
 
-        self.avg_load_kva = round(self.kva * self.avg_load_factor, 1)
+    if operation_mode == 2:
+        diversity_utilisation = 0
+    else:
+        diversity_utilisation = load_factor_lookup.lookup(type, 3)
 
-        self.contingency_factor = vlookup(self.procurement_rating, CONTINGENCY_TABLE, 1)
+    avg_load_factor = round_up(load_factor * diversity_utilisation, 3)
+
+    max_kw = round_up(installed_kw * load_factor, 1)
+
+    max_kvar = round(max_kw * round(tan(acos(power_factor)), 2), 1)
+
+    max_kva = round(kva * load_factor, 1)
+
+    avg_load_kw = round(installed_kw * avg_load_factor, 1)
+
+    avg_load_kva = round(kva * avg_load_factor, 1)
+
+    contingency_factor = contingency_lookup.lookup(procurement_rating, 1)
+
+    spare_capacity = round(contingency_factor * round((kva * avg_load_factor), 1), 2)
+
+    return (
+        efficiency,
+        power_factor,
+        kva,
+        load_factor,
+        diversity_utilisation,
+        avg_load_factor,
+        max_kw,
+        max_kvar,
+        max_kva,
+        avg_load_kw,
+        avg_load_kva,
+        contingency_factor,
+        spare_capacity,
+    )
 
-        self.spare_capacity = round(
-            self.contingency_factor * round((self.kva * self.avg_load_factor), 1), 2
+
+def equipment_cache_info():
+    """This method returns the hits, misses and size of the equipment cache.
+
+    The cache is kept per process, so MELs read by worker processes are not
+    counted.
+    """
+
+    return equipment_quantities.cache_info()
+
+
+# MechanicalEquipment fields totalled over the equipment of every MCC
+MCC_TOTAL_FIELDS = [
+    "installed_kw",
+    "kva",
+    "max_kw",
+    "max_kvar",
+    "max_kva",
+    "avg_load_kw",
+    "avg_load_kva",
+    "contingency_factor",
+    "spare_capacity",
+]
+
+# Largest actual contingency load in kVA each transformer size supplies
+TRANSFORMER_SIZES = [
+    (375, 500),
+    (562.5, 750),
+    (750, 1000),
+    (1125, 1500),
+    (1500, 2000),
+    (1875, 2500),
+    (3750, 5000),
+    (6000, 8000),
+    (7500, 10000),
+    (8250, 11000),
+]
+
+
+def transformer_size(load):
+    """ This method returns the transformer size supplying a load, or None if none does."""
+
+    for limit, size in TRANSFORMER_SIZES:
+        if load <= limit:
+            return size
+    return None
+
+
+class EquipmentTotals:
+    """Class for the running totals of the Mechanical Equipment of a MCC.
+
+    The totals are computed in a single pass and then updated in O(1) as
+    equipment is added or removed. Each total is held as an ExactSum seeded
+    with the sequential sum. Appending a single equipment therefore gives the
+    same totals as a rebuild, and removing equipment restores the previous totals
+    exactly. After several changes the totals are the exact sums, which may
+    differ in the last place from the sequential sums of a rebuild.
+    """
+
+    def __init__(self, mel):
+        if isinstance(mel, ColumnarMEL):
+            totals = [sum(mel_column(mel, name)) for name in MCC_TOTAL_FIELDS]
+            voltages = mel_column(mel, "voltage")
+        else:
+            totals = [0] * len(MCC_TOTAL_FIELDS)
+            voltages = []
+            values = attrgetter(*MCC_TOTAL_FIELDS)
+            for me in mel:
+                totals = [total + value for total, value in zip(totals, values(me))]
+                voltages.append(me.voltage)
+
+        self.count = len(mel)
+        self.sums = {name: ExactSum(total) for name, total in zip(MCC_TOTAL_FIELDS, totals)}
+        self.voltages = Counter(voltages)
+
+    def add(self, me):
+        """ This method adds a MechanicalEquipment object to the totals."""
+
+        self.count += 1
+        for name, total in self.sums.items():
+            total.add(getattr(me, name))
+        self.voltages[me.voltage] += 1
+
+    def remove(self, me):
+        """ This method removes a MechanicalEquipment object from the totals."""
+
+        self.count -= 1
+        for name, total in self.sums.items():
+            total.subtract(getattr(me, name))
+        self.voltages[me.voltage] -= 1
+        if not self.voltages[me.voltage]:
+            del self.voltages[me.voltage]
+
+    def total(self, name):
+        """ This method returns the total of a MechanicalEquipment field."""
+
+        return self.sums[name].value
+
+    @property
+    def max_voltage(self):
+        return max(self.voltages)
+
+    def __eq__(self, other):
+        if not isinstance(other, EquipmentTotals):
+            return NotImplemented
+        return (
+            self.count == other.count
+            and self.voltages == other.voltages
+            and all(self.total(name) == other.total(name) for name in self.sums)
         )
 
 
 @dataclass
 class MotorControlCenter:
-    """Class for Motor Control Center details."""
+    """Class for Motor Control Center details.
+
+    Equipment may be added, removed or replaced after the MCC is built, which
+    updates every total without summing the whole MEL again.
+    """
 
     name: str
     lighting: LightingEquipment
@@ -321,10 +511,20 @@ class MotorControlCenter:
     tx_size: float = field(init=False)
     spare_tx: int = field(init=False)
 
+    totals: EquipmentTotals = field(init=False, repr=False, compare=False)
+
     def __post_init__(self):
+        self.totals = EquipmentTotals(self.mel)
+        self.update_totals()
+
+    def update_totals(self):
+        """ This method computes the MCC totals from the running equipment totals."""
+
+        totals = self.totals
+
         self.total_installed_kw = round(
             (
-                sum(e.installed_kw for e in self.mel)
+                totals.total("installed_kw")
                 + self.lighting.installed_kw
                 + self.ups.installed_kw
                 + self.field_equipment.installed_kw
@@ -334,7 +534,7 @@ class MotorControlCenter:
 
         self.total_kva = round(
             (
-                sum(e.kva for e in self.mel)
+                totals.total("kva")
                 + self.lighting.kva
                 + self.ups.kva
                 + self.field_equipment.kva
@@ -344,7 +544,7 @@ class MotorControlCenter:
 
         self.total_max_kw = round(
             (
-                sum(e.max_kw for e in self.mel)
+                totals.total("max_kw")
                 + self.lighting.max_kw
                 + self.ups.max_kw
                 + self.field_equipment.max_kw
@@ -354,7 +554,7 @@ class MotorControlCenter:
 
         self.total_max_kvar = round(
             (
-                sum(e.max_kvar for e in self.mel)
+                totals.total("max_kvar")
                 + self.lighting.max_kvar
                 + self.ups.max_kvar
                 + self.field_equipment.max_kvar
@@ -364,7 +564,7 @@ class MotorControlCenter:
 
         self.total_max_kva = round(
             (
-                sum(e.max_kva for e in self.mel)
+                totals.total("max_kva")
                 + self.lighting.max_kva
                 + self.ups.max_kva
                 + self.field_equipment.max_kva
@@ -374,7 +574,7 @@ class MotorControlCenter:
 
         self.total_avg_load_kw = round(
             (
-                sum(e.avg_load_kw for e in self.mel)
+                totals.total("avg_load_kw")
                 + self.lighting.avg_load_kw
                 + self.ups.avg_load_kw
                 + self.field_equipment.avg_load_kw
@@ -384,7 +584,7 @@ class MotorControlCenter:
 
         self.total_avg_load_kva = round(
             (
-                sum(e.avg_load_kva for e in self.mel)
+                totals.total("avg_load_kva")
                 + self.lighting.avg_load_kva
                 # + self.ups.avg_load_kva
                 + self.field_equipment.avg_load_kva
@@ -393,17 +593,12 @@ class MotorControlCenter:
         )
 
         self.spare_starters = round_up(
-            (len(self.mel) + self.misc_starters) * self.contingency_factor_percent
+            (totals.count + self.misc_starters) * self.contingency_factor_percent
         )
 
         # Init contingency_load
-        installed_kw = round(sum(me.installed_kw for me in self.mel), 2)
-        max_kva = sum(me.max_kva for me in self.mel)
-        avg_load_kw = sum(me.avg_load_kw for me in self.mel)
-        avg_starter_load = round(installed_kw / len(self.mel), 2)
-        contingency_spare_starters = sum(
-            me.contingency_factor for me in self.mel
-        ) / len(self.mel)
+        installed_kw = round(totals.total("installed_kw"), 2)
+        avg_starter_load = round(installed_kw / totals.count, 2)
         self.contingency_load = min(
             [load for load in VSD_CONTINGENCY if load >= avg_starter_load]
         )
@@ -414,37 +609,99 @@ class MotorControlCenter:
             self.total_spare_allocation + self.total_installed_kw
         )
 
-        self.max_voltage = max(me.voltage for me in self.mel)
+        self.max_voltage = totals.max_voltage
 
-        self.contingency_factor = round_up(sum(me.spare_capacity for me in self.mel), 0)
+        self.contingency_factor = round_up(totals.total("spare_capacity"), 0)
 
         self.total_actual_contingency = self.contingency_factor + self.total_max_kva
 
-        if self.total_actual_contingency <= 375:
-            self.tx_size = 500
-        elif self.total_actual_contingency <= 562.5:
-            self.tx_size = 750
-        elif self.total_actual_contingency <= 750:
-            self.tx_size = 1000
-        elif self.total_actual_contingency <= 1125:
-            self.tx_size = 1500
-        elif self.total_actual_contingency <= 1500:
-            self.tx_size = 2000
-        elif self.total_actual_contingency <= 1875:
-            self.tx_size = 2500
-        elif self.total_actual_contingency <= 3750:
-            self.tx_size = 5000
-        elif self.total_actual_contingency <= 6000:
-            self.tx_size = 8000
-        elif self.total_actual_contingency <= 7500:
-            self.tx_size = 10000
-        elif self.total_actual_contingency <= 8250:
-            self.tx_size = 11000
+        self.tx_size = transformer_size(self.total_actual_contingency)
+        if self.tx_size is None:
+            raise ValueError(
+                "{} needs {} kVA, more than the largest transformer supplies".format(
+                    self.name, self.total_actual_contingency
+                )
+            )
 
         self.spare_tx = int(
             ((self.tx_size - self.total_actual_contingency) / self.tx_size) * 100
         )
 
+    def add_equipment(self, me):
+        """ This method adds a MechanicalEquipment object to the MCC."""
+
+        self.mel.append(me)
+        self.totals.add(me)
+        self.update_or_undo(lambda: (self.totals.remove(me), self.mel.pop()))
+
+    def remove_equipment(self, me):
+        """This method removes a MechanicalEquipment object from the MCC.
+
+        Raises ValueError if me is not in the MCC or is its last equipment.
+        """
+
+        index = self.equipment_index(me)
+        if len(self.mel) == 1:
+            raise ValueError(
+                "{} is the last equipment of {}, which cannot be left empty".format(
+                    me.tag_number, self.name
+                )
+            )
+
+        del self.mel[index]
+        self.totals.remove(me)
+        self.update_or_undo(lambda: (self.totals.add(me), self.mel.insert(index, me)))
+
+    def update_equipment(self, old, new):
+        """ This method replaces a MechanicalEquipment object of the MCC with new."""
+
+        index = self.equipment_index(old)
+
+        self.mel[index] = new
+        self.totals.remove(old)
+        self.totals.add(new)
+
+        def undo():
+            self.totals.remove(new)
+            self.totals.add(old)
+            self.mel[index] = old
+
+        self.update_or_undo(undo)
+
+    def equipment_index(self, me):
+        """This method returns the position of a MechanicalEquipment object in the MEL.
+
+        Raises TypeError for a ColumnarMEL, whose rows cannot be removed or
+        replaced, and ValueError if me is not in the MCC. The MEL is searched in
+        order, so finding, removing or replacing equipment takes time linear in
+        the size of the MCC; only the totals are updated in constant time.
+        """
+
+        if isinstance(self.mel, ColumnarMEL):
+            raise TypeError(
+                "Equipment of {} is held in a ColumnarMEL and can only be added".format(
+                    self.name
+                )
+            )
+        try:
+            return self.mel.index(me)
+        except ValueError:
+            raise ValueError("{} is not in {}".format(me.tag_number, self.name)) from None
+
+    def update_or_undo(self, undo):
+        """This method updates the totals after a change to the equipment.
+
+        If the change cannot be applied, such as when no transformer supplies the
+        new load, it is undone so the MCC is left as it was, and the error raised.
+        """
+
+        try:
+            self.update_totals()
+        except Exception:
+            undo()
+            self.update_totals()
+            raise
+
 
 @dataclass
 class ElectricalLoadSummary:
@@ -468,50 +725,54 @@ class ElectricalLoadSummary:
     total_transformer_cost: int = field(init=False)
 
     def __post_init__(self):
+        self.update_totals()
 
-        self.connected_load_kw = round_up(
-            sum(mcc.total_installed_kw for mcc in self.mccl)
-        )
+    def update_totals(self):
+        """This method computes the summary from its MCCs in a single pass.
 
-        self.connected_load_kva = round_up(sum(mcc.total_kva for mcc in self.mccl))
+        Call it again once the equipment of a MCC has changed.
+        """
 
-        self.network_loss_kw = int(
-            0.02 * (sum(ceil(mcc.total_max_kw) for mcc in self.mccl))
-        )
+        installed_kw = kva = max_kw = max_kvar = max_kva = 0
+        max_kw_ceil = max_kvar_ceil = 0
+        avg_load_kva = contingency_factor = actual_contingency = transformer_cost = 0
 
-        self.max_demand_kw = int(
-            sum(mcc.total_max_kw for mcc in self.mccl) + self.network_loss_kw
-        )
+        for mcc in self.mccl:
+            installed_kw += mcc.total_installed_kw
+            kva += mcc.total_kva
+            max_kw += mcc.total_max_kw
+            max_kw_ceil += ceil(mcc.total_max_kw)
+            max_kvar += mcc.total_max_kvar
+            max_kvar_ceil += ceil(mcc.total_max_kvar)
+            max_kva += mcc.total_max_kva
+            avg_load_kva += mcc.total_avg_load_kva
+            contingency_factor += mcc.contingency_factor
+            actual_contingency += mcc.total_actual_contingency
+            transformer_cost += TRANSFORMER_PRICING_LOOKUP.lookup(mcc.tx_size, 1)
 
-        self.network_loss_kvar = round(
-            0.02 * (sum(ceil(mcc.total_max_kvar) for mcc in self.mccl))
-        )
+        self.connected_load_kw = round_up(installed_kw)
 
-        self.max_demand_kvar = int(
-            sum(mcc.total_max_kvar for mcc in self.mccl) + self.network_loss_kvar
-        )
+        self.connected_load_kva = round_up(kva)
 
-        self.network_loss_kva = ceil(
-            0.02 * (sum(mcc.total_max_kva for mcc in self.mccl))
-        )
+        self.network_loss_kw = int(0.02 * max_kw_ceil)
 
-        self.max_demand_kva = int(
-            sum(mcc.total_max_kva for mcc in self.mccl) + self.network_loss_kva
-        )
+        self.max_demand_kw = int(max_kw + self.network_loss_kw)
 
-        self.ave_load_kva = int(sum(mcc.total_avg_load_kva for mcc in self.mccl))
+        self.network_loss_kvar = round(0.02 * max_kvar_ceil)
 
-        self.contingency_factor_kva = int(
-            sum(mcc.contingency_factor for mcc in self.mccl)
-        )
+        self.max_demand_kvar = int(max_kvar + self.network_loss_kvar)
 
-        self.total_actual_contingency = int(
-            sum(mcc.total_actual_contingency for mcc in self.mccl)
-        )
+        self.network_loss_kva = ceil(0.02 * max_kva)
 
-        self.total_transformer_cost = sum(
-            vlookup(mcc.tx_size, TRANSFORMER_PRICING, 1) for mcc in self.mccl
-        )
+        self.max_demand_kva = int(max_kva + self.network_loss_kva)
+
+        self.ave_load_kva = int(avg_load_kva)
+
+        self.contingency_factor_kva = int(contingency_factor)
+
+        self.total_actual_contingency = int(actual_contingency)
+
+        self.total_transformer_cost = transformer_cost
 
 
 @dataclass
@@ -520,50 +781,66 @@ class ClientMechanicalEquipmentList:
 
     mel: List[MechanicalEquipment] = field(default_factory=list)
     mcc_numbers: list = field(init=False)
+    partitions: dict = field(init=False, repr=False)
 
     def __post_init__(self):
 
-        self.mcc_numbers = []
-        for me in self.mel:
-            if me.mcc_number not in self.mcc_numbers:
-                self.mcc_numbers.append(me.mcc_number)
-
-
-def read_standards(standards):
-    """ This method creates a ProjectStandard object from a Project Standards excel file."""
+        self.partitions = mcc_partitions(self.mel)
+        self.mcc_numbers = list(self.partitions)
+
+
+# Project Standards cells, in ProjectStandard field order. The avg_count and
+# starters fields are not read from the workbook.
+STANDARD_CELLS = [
+    "E5",
+    "E10",
+    "E11",
+    "E12",
+    "E15",
+    "E16",
+    "E17",
+    "E18",
+    "E21",
+    "E22",
+    "E23",
+    "E24",
+    "E25",
+    "E26",
+    "E37",
+    "E38",
+    "E39",
+    "C43",
+    "E43",
+    "C44",
+    "E44",
+    "D47",
+    "D49",
+]
+
+
+def iter_standards_rows(standards):
+    """ This method yields the Project Standards cell values as a single row."""
 
     from openpyxl import load_workbook
 
     wb = load_workbook(filename=standards, data_only=True)
     ws = wb.active
 
-    standards = ProjectStandard(
-        ws["E5"].value,
-        ws["E10"].value,
-        ws["E11"].value,
-        ws["E12"].value,
-        ws["E15"].value,
-        ws["E16"].value,
-        ws["E17"].value,
-        ws["E18"].value,
-        ws["E21"].value,
-        ws["E22"].value,
-        ws["E23"].value,
-        ws["E24"].value,
-        ws["E25"].value,
-        ws["E26"].value,
-        0,
-        0,
-        ws["E37"].value,
-        ws["E38"].value,
-        ws["E39"].value,
-        ws["C43"].value,
-        ws["E43"].value,
-        ws["C44"].value,
-        ws["E44"].value,
-        ws["D47"].value,
-        ws["D49"].value,
-    )
+    yield tuple(ws[cell].value for cell in STANDARD_CELLS)
+
+
+def read_standards(standards, row_cache=False):
+    """This method creates a ProjectStandard object from a Project Standards excel file.
+
+    When row_cache is set the cell values are read through the binary row cache.
+    """
+
+    if row_cache:
+        (values,) = cached_rows(standards, "standards", iter_standards_rows)
+    else:
+        (values,) = iter_standards_rows(standards)
+
+    standards = ProjectStandard(*values[:14], 0, 0, *values[14:])
 
     return standards
 
@@ -592,10 +869,13 @@ def me_builder(row):
     return me
 
 
-def client_mel_builder(rows):
-    """ This method creates a ClientMechanicalEquipmentList from ME excel row data."""
+def client_mel_builder(rows, columnar=False):
+    """This method creates a ClientMechanicalEquipmentList from ME excel row data.
+
+    When columnar is set the equipment is stored in a ColumnarMEL.
+    """
 
-    me_list = []
+    me_list = ColumnarMEL() if columnar else []
 
     for row in rows:
         me = me_builder(row)
@@ -607,7 +887,16 @@ def client_mel_builder(rows):
 
 
 def mcc_builder(name, lighting_load, ups_load, fe_dist_load, mcc_me_list):
-    """ This method creates a MCC object."""
+    """This method creates a MCC object.
+
+    The MCC holds its own copy of mcc_me_list, so editing its equipment leaves
+    the MEL partition it was built from unchanged.
+    """
+
+    if isinstance(mcc_me_list, ColumnarMEL):
+        mcc_me_list = mcc_me_list.select(range(len(mcc_me_list)))
+    else:
+        mcc_me_list = list(mcc_me_list)
 
     mcc = MotorControlCenter(
         name,
@@ -620,17 +909,141 @@ def mcc_builder(name, lighting_load, ups_load, fe_dist_load, mcc_me_list):
     return mcc
 
 
-def read_client_mel(mel):
-    """This method creates a list of MechanicalEquipment objects from a MEL excel file."""
+def iter_client_mel_rows(mel, engine="openpyxl", sheet=None):
+    """This method lazily yields the ME row data of a MEL file.
+
+    The rows are read by the input adapter registered for the file extension, so
+    excel, CSV, JSON lines and Parquet MELs all yield the same 12 columns. Excel
+    MELs are read by openpyxl, or with the xml engine by parsing the sheet XML.
+    Only excel MELs have sheets; the active sheet is read unless one is named.
+    Raises MELError for a sheet that is not in the MEL.
+    """
+
+    reader = mel_reader(mel, engine)
+    if sheet is None:
+        return reader(mel)
+
+    if not is_excel_mel(mel):
+        raise MELError("{} has no sheets, it is not an excel MEL".format(mel))
+    return reader(mel, sheet)
+
+
+def read_client_mel(
+    mel, columnar=False, streaming=True, row_cache=False, engine="openpyxl", sheet=None
+):
+    """This method creates a list of MechanicalEquipment objects from a MEL file.
+
+    By default rows are streamed from the file. Set streaming to False to load
+    the full workbook of an openpyxl read excel MEL before reading the rows.
+    When row_cache is set the rows are read through the binary row cache.
+    """
+
+    if row_cache:
+        kind = "mel" if sheet is None else "mel-{}".format(sheet)
+        return client_mel_builder(
+            cached_rows(
+                mel, kind, lambda path: iter_client_mel_rows(path, engine, sheet)
+            ),
+            columnar,
+        )
+
+    if streaming or mel_reader(mel, engine) is not iter_xlsx_rows:
+        return client_mel_builder(iter_client_mel_rows(mel, engine, sheet), columnar)
 
     from openpyxl import load_workbook
 
     wb = load_workbook(filename=mel, data_only=True)
-    ws = wb.active
+    ws = workbook_sheet(wb, mel, sheet)
+
+    rows = ws.iter_rows(
+        min_row=MEL_FIRST_ROW, max_col=12, max_row=ws.max_row, values_only=True
+    )
+
+    return client_mel_builder(rows, columnar)
+
+
+def mel_sources(mel_files, sheets=None):
+    """This method returns the (file, sheet) pairs to read from a list of MEL files.
+
+    Excel MELs are read once for every named sheet, or from their active sheet
+    when no sheets are named. Other MELs are read whole.
+    """
+
+    sources = []
+    for mel in mel_files:
+        if sheets and is_excel_mel(mel):
+            sources.extend((mel, sheet) for sheet in sheets)
+        else:
+            sources.append((mel, None))
+    return sources
+
 
-    rows = ws.iter_rows(min_row=8, max_col=12, max_row=ws.max_row, values_only=True)
+def read_mel_source(source, row_cache=False, engine="openpyxl"):
+    """ This method returns the MechanicalEquipment objects of a (file, sheet) pair."""
 
-    return client_mel_builder(rows)
+    mel, sheet = source
+    return read_client_mel(mel, row_cache=row_cache, engine=engine, sheet=sheet).mel
+
+
+def check_tag_numbers(named_mels):
+    """This method checks that no tag number is used twice in a set of MELs.
+
+    named_mels holds a (name, MechanicalEquipment objects) pair for every MEL.
+    Raises MELError naming every duplicate tag number and the MELs holding it.
+    """
+
+    found = {}
+    duplicates = []
+    for name, me_list in named_mels:
+        for me in me_list:
+            if me.tag_number in found:
+                duplicates.append(
+                    "{} in {} and {}".format(me.tag_number, found[me.tag_number], name)
+                )
+            else:
+                found[me.tag_number] = name
+
+    if duplicates:
+        raise MELError("Duplicate tag numbers: {}".format("; ".join(duplicates)))
+
+
+def read_client_mels(
+    mel_files, sheets=None, columnar=False, jobs=1, row_cache=False, engine="openpyxl"
+):
+    """This method creates a single ClientMechanicalEquipmentList from several MELs.
+
+    Every file, or every named sheet of the excel files, is parsed in its own
+    worker process when jobs is more than one. The equipment is merged in file
+    then sheet order, whichever worker finishes first.
+
+    Raises MELError naming the tag numbers found more than once across the
+    MELs.
+    """
+
+    sources = mel_sources(mel_files, sheets)
+
+    if jobs > 1 and len(sources) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        from itertools import repeat
+
+        with ProcessPoolExecutor(max_workers=min(jobs, len(sources))) as executor:
+            mels = list(
+                executor.map(read_mel_source, sources, repeat(row_cache), repeat(engine))
+            )
+    else:
+        mels = [read_mel_source(source, row_cache, engine) for source in sources]
+
+    check_tag_numbers(
+        (mel if sheet is None else "{} [{}]".format(mel, sheet), me_list)
+        for (mel, sheet), me_list in zip(sources, mels)
+    )
+
+    me_list = ColumnarMEL() if columnar else []
+    for mel in mels:
+        for me in mel:
+            me_list.append(me)
+
+    return ClientMechanicalEquipmentList(me_list)
 
 
 def els_builder(STANDARD, MEL):
@@ -640,19 +1053,13 @@ def els_builder(STANDARD, MEL):
     MCC_List = []
     for number in MEL.mcc_numbers:
 
-        # Filter equipment by mcc_number
-        mcc_mel = []
-        for me in MEL.mel:
-            if me.mcc_number == number:
-                mcc_mel.append(me)
-
         # Build a MCC
         MCC = mcc_builder(
             number,
             STANDARD.lighting_load,
             STANDARD.ups_load,
             STANDARD.fe_dist_load,
-            mcc_mel,
+            MEL.partitions[number],
         )
 
         MCC_List.append(MCC)
@@ -663,27 +1070,136 @@ def els_builder(STANDARD, MEL):
     return els
 
 
-def eload(standards_file, mel_file):
+def write_load_profile_output(
+    els, steps_per_hour, duty_cycles=None, folder=OUTPUT_FOLDER, profiler=NULL_PROFILER
+):
+    """This method writes the LOAD PROFILE workbook when steps_per_hour is given.
+
+    Returns a dict of output name to error, as write_outputs does.
+    """
+
+    if not steps_per_hour:
+        return {}
+
+    import profiles
+
+    with profiler.stage("load_profile", len(els.mccl)):
+        try:
+            profiles.write_load_profile(
+                profiles.load_profile(els, steps_per_hour, duty_cycles), folder
+            )
+        except Exception as error:
+            return {"LOAD PROFILE": error}
+    return {}
+
+
+def eload(
+    standards_file,
+    mel_file,
+    columnar=False,
+    jobs=1,
+    output_engine="template",
+    incremental=False,
+    cache=None,
+    row_cache=False,
+    output_folder=OUTPUT_FOLDER,
+    profiler=NULL_PROFILER,
+    input_engine="openpyxl",
+    sheets=None,
+    load_profile=None,
+    duty_cycles=None,
+):
     """Main eload CLI method that reads in the Project Standards and Client MEL Excel file
     to populate the relavant data classes and output the MCC and Electrical Load List
     Excel outputs.
-    """
 
-    # Read in Project Standards excel file
-    STANDARD = read_standards(standards_file)
+    When columnar is set the MEL is held in a ColumnarMEL to reduce memory use.
+    With more than one job the MCC workbooks are written in parallel. The stream
+    output engine writes the workbooks without loading them into memory.
+    Incremental runs only rewrite the workbooks whose contents changed.
+
+    When a RunCache is given, a previously seen pair of input files is served from
+    the cache instead of being read, built and written again. With row_cache set
+    the input rows are read through the binary row cache kept next to each file.
+
+    The workbooks are written into output_folder. Every stage of the run is
+    measured by profiler, which records nothing by default. Excel MELs are read
+    by openpyxl, or with the xml input engine by parsing the sheet XML directly.
 
-    # Read in client Mechanical Equipment List
-    MEL = read_client_mel(mel_file)
+    mel_file may also be a list of MEL files, and sheets a list of sheet names to
+    read from each excel MEL. These are parsed in parallel over jobs worker
+    processes and merged into one MEL.
 
-    # Build data classes
-    els = els_builder(STANDARD, MEL)
+    When load_profile is given, the LOAD PROFILE workbook of the hourly load of
+    every MCC is also written, with load_profile steps per hour and the equipment
+    types following duty_cycles.
 
-    # Clear output directory
-    clear_output()
+    Returns a dict of output name to error for every workbook that failed.
+    """
+
+    mel_files = [mel_file] if isinstance(mel_file, str) else list(mel_file)
+
+    cached = None
+    if cache is not None:
+        with profiler.stage("run_cache"):
+            key = cache.key(standards_file, mel_files, sheets, output_engine)
+            cached = cache.load(key)
+
+    if cached is None:
+        # Read in Project Standards excel file
+        with profiler.stage("read_standards"):
+            STANDARD = read_standards(standards_file, row_cache)
+
+        # Read in client Mechanical Equipment List
+        with profiler.stage("read_client_mel") as stage:
+            if len(mel_files) == 1 and not sheets:
+                MEL = read_client_mel(
+                    mel_files[0], columnar, row_cache=row_cache, engine=input_engine
+                )
+                check_tag_numbers([(mel_files[0], MEL.mel)])
+            else:
+                MEL = read_client_mels(
+                    mel_files, sheets, columnar, jobs, row_cache, input_engine
+                )
+            stage.rows = len(MEL.mel)
+
+        # Build data classes
+        with profiler.stage("els_builder", len(MEL.mel)):
+            els = els_builder(STANDARD, MEL)
+    else:
+        STANDARD, els = cached
+
+    # Clear output directory, unless only the changed outputs are rewritten
+    if not incremental:
+        with profiler.stage("clear_output"):
+            clear_output(output_folder)
+
+        if cached is not None:
+            with profiler.stage("run_cache_restore"):
+                restored = cache.restore(key, output_folder)
+            # An entry evicted since it was loaded is written as a normal run
+            if restored:
+                return write_load_profile_output(
+                    els, load_profile, duty_cycles, output_folder, profiler
+                )
+
+    # Write MCC and ELS output
+    errors = write_outputs(
+        els,
+        STANDARD,
+        jobs,
+        output_engine,
+        incremental,
+        output_folder,
+        profiler,
+    )
 
-    # Write MCC output
-    mcc_writer(els, STANDARD)
+    if cache is not None and cached is None and not errors:
+        with profiler.stage("run_cache_store"):
+            cache.store(key, STANDARD, els, output_files(els, output_folder))
 
-    # Write ELS output
-    els_writer(els, STANDARD)
+    errors.update(
+        write_load_profile_output(els, load_profile, duty_cycles, output_folder, profiler)
+    )
 
+    return errors
@@ -0,0 +1,177 @@
+"""Per-stage timing and profiling of eload runs."""
+import os
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+@dataclass
+class StageTiming:
+    """Class for the measurements of a single pipeline stage.
+
+    peak_rss is the process high-water mark in bytes once the stage finished,
+    which includes every earlier stage. peak_rss_growth is how far the stage
+    raised that mark, the memory attributable to the stage beyond what earlier
+    stages already used. Both are None where they are unavailable, such as for
+    work done in a worker process.
+    """
+
+    name: str
+    rows: int = None
+    wall: float = 0.0
+    cpu: float = 0.0
+    peak_rss: int = None
+    peak_rss_growth: int = None
+
+
+def peak_rss():
+    """ This function returns the peak resident set size of the process in bytes."""
+
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, other platforms kilobytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def megabytes(size):
+    """ This function formats a size in bytes as megabytes, or "" if it is unknown."""
+
+    return "" if size is None else "{:.1f}".format(size / 2 ** 20)
+
+
+def timed_call(function, *args):
+    """This function calls function(*args), returning its (wall, cpu) seconds.
+
+    Used to time work submitted to worker processes.
+    """
+
+    wall, cpu = time.perf_counter(), time.process_time()
+    function(*args)
+    return time.perf_counter() - wall, time.process_time() - cpu
+
+
+class Profiler:
+    """Class for recording the wall time, CPU time, rows and memory of each stage.
+
+    When pstats_folder is set every outermost stage is also run under cProfile
+    and its statistics dumped to <pstats_folder>/<stage>.pstats.
+    """
+
+    def __init__(self, pstats_folder=None):
+        self.pstats_folder = pstats_folder
+        self.stages = []
+        self._profiling = False
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        """This method measures the enclosed block as a stage.
+
+        Yields the StageTiming, so rows may be set once they are known.
+        """
+
+        timing = StageTiming(name, rows)
+        self.stages.append(timing)
+
+        profile = None
+        if self.pstats_folder is not None and not self._profiling:
+            import cProfile
+
+            profile = cProfile.Profile()
+            self._profiling = True
+
+        start_rss = peak_rss()
+        wall, cpu = time.perf_counter(), time.process_time()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield timing
+        finally:
+            if profile is not None:
+                profile.disable()
+                self._profiling = False
+
+            timing.wall = time.perf_counter() - wall
+            timing.cpu = time.process_time() - cpu
+            timing.peak_rss = peak_rss()
+            if start_rss is not None:
+                timing.peak_rss_growth = timing.peak_rss - start_rss
+
+            if profile is not None:
+                os.makedirs(self.pstats_folder, exist_ok=True)
+                profile.dump_stats(
+                    os.path.join(
+                        self.pstats_folder, "{}.pstats".format(name.replace("/", "-"))
+                    )
+                )
+
+    def record(self, name, wall, cpu, rows=None):
+        """ This method adds a stage timed elsewhere, such as in a worker process."""
+
+        self.stages.append(StageTiming(name, rows, wall, cpu))
+
+    def report(self):
+        """ This method returns the recorded stages as a list of dicts."""
+
+        return [asdict(timing) for timing in self.stages]
+
+    def format(self):
+        """ This method returns the recorded stages as a text table."""
+
+        lines = [
+            "{:<32} {:>9} {:>9} {:>9} {:>15} {:>14}".format(
+                "STAGE", "ROWS", "WALL s", "CPU s", "PROCESS PEAK MB", "PEAK GROWTH MB"
+            )
+        ]
+        for timing in self.stages:
+            lines.append(
+                "{:<32} {:>9} {:>9.3f} {:>9.3f} {:>15} {:>14}".format(
+                    timing.name,
+                    "" if timing.rows is None else timing.rows,
+                    timing.wall,
+                    timing.cpu,
+                    megabytes(timing.peak_rss),
+                    megabytes(timing.peak_rss_growth),
+                )
+            )
+        return "\n".join(lines)
+
+
+class NullStage:
+    """Class for the context of a stage that is not measured."""
+
+    def __enter__(self):
+        return NULL_TIMING
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class NullProfiler:
+    """Class for a profiler that records nothing, used when profiling is disabled."""
+
+    stages = []
+
+    def stage(self, name, rows=None):
+        return NULL_STAGE
+
+    def record(self, name, wall, cpu, rows=None):
+        pass
+
+    def report(self):
+        return []
+
+
+# Shared by every disabled stage, so setting its rows is harmless
+NULL_TIMING = StageTiming("")
+
+NULL_STAGE = NullStage()
+
+NULL_PROFILER = NullProfiler()
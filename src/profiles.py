@@ -0,0 +1,251 @@
+"""Time series load profiles of every MCC and the whole site over a year.
+
+Every equipment type is given a DutyCycle: it runs at its maximum load for a
+share of every period and is idle for the rest. The running share defaults to
+the LOAD_FACTOR diversity utilisation, so the average load of every equipment
+matches its avg_load_kw. Standby equipment carries no load. The equipment of a
+type is staggered evenly over the period unless its cycle has a fixed start,
+in which case all of it runs together.
+
+The profiles are summed a chunk of equipment at a time, so no per-equipment
+profile matrix is kept in memory, and returned as dense step by MCC arrays.
+
+This module requires NumPy, which is an optional dependency:
+
+    pip install eload[batch]
+"""
+import json
+import os
+from typing import Any
+
+import numpy as np
+
+from data import LOAD_FACTOR_LOOKUP
+from dataclasses import dataclass
+from writer import LOAD_PROFILE_OUTPUT_FILE, OUTPUT_FOLDER
+
+HOURS_PER_YEAR = 8760
+
+# Profile cells computed at once, bounding the memory of a chunk of equipment
+CHUNK_CELLS = 2 ** 21
+
+# Types running less than this share of the time cycle every hour, the rest
+# over a day
+INTERMITTENT_UTILISATION = 0.5
+
+# Fractional part of the golden ratio, spreading staggered starts evenly
+STAGGER = 0.6180339887498949
+
+# Columns of the peak demand report
+PEAK_COLUMNS = [
+    "mcc",
+    "total_max_kw",
+    "peak_kw",
+    "total_max_kva",
+    "peak_kva",
+    "peak_hour",
+    "average_kw",
+    "load_factor",
+]
+
+
+@dataclass
+class DutyCycle:
+    """Class for the running pattern of a type of equipment.
+
+    The equipment runs for duty of every period hours, starting at start hours
+    into the year, or at staggered starts when start is None.
+    """
+
+    period: float = 24
+    duty: float = 1
+    start: float = None
+
+    def running(self, hours, offsets):
+        """This method returns the running hours up to each of hours.
+
+        hours is a one-dimensional array and offsets has one row per equipment
+        item. Returns one row per item and one column per hour.
+        """
+
+        elapsed = hours[np.newaxis, :] - offsets
+        cycles = np.floor(elapsed / self.period)
+        on = self.period * min(max(self.duty, 0), 1)
+        return cycles * on + np.minimum(elapsed - cycles * self.period, on)
+
+
+def default_duty_cycle(key):
+    """ This function returns the duty cycle of a LOAD_FACTOR type from its table values."""
+
+    duty = LOAD_FACTOR_LOOKUP.lookup(key, 3, False) or 0
+    return DutyCycle(1 if duty < INTERMITTENT_UTILISATION else 24, duty)
+
+
+def read_duty_cycles(path):
+    """This function reads duty cycles from a JSON file.
+
+    The file holds an object mapping LOAD_FACTOR type codes to objects with any
+    of the DutyCycle period, duty and start fields.
+    """
+
+    with open(path) as f:
+        return {key: DutyCycle(**values) for key, values in json.load(f).items()}
+
+
+@dataclass
+class LoadProfile:
+    """Class for the load profiles of every MCC of an ElectricalLoadSummary.
+
+    kw and kva hold one row per step and one column per MCC, each step lasting
+    1 / steps_per_hour hours. The lighting, UPS and field equipment loads are
+    constant.
+    """
+
+    mcc_names: list
+    steps_per_hour: int
+    kw: Any
+    kva: Any
+    total_max_kw: Any
+    total_max_kva: Any
+
+    @property
+    def site_kw(self):
+        return self.kw.sum(axis=1)
+
+    @property
+    def site_kva(self):
+        return self.kva.sum(axis=1)
+
+    def hours(self):
+        """ This method returns the hour each step starts at."""
+
+        return np.arange(len(self.kw)) / self.steps_per_hour
+
+    def peak_rows(self):
+        """This method yields a peak demand row for every MCC and the site.
+
+        The site peak is the coincident peak of all MCCs, which is at most the sum
+        of their own peaks.
+        """
+
+        columns = [(name, self.kw[:, j], self.kva[:, j]) for j, name in enumerate(self.mcc_names)]
+        columns.append(("SITE", self.site_kw, self.site_kva))
+        total_max_kw = list(self.total_max_kw) + [sum(self.total_max_kw)]
+        total_max_kva = list(self.total_max_kva) + [sum(self.total_max_kva)]
+
+        for (name, kw, kva), max_kw, max_kva in zip(columns, total_max_kw, total_max_kva):
+            peak = int(kw.argmax())
+            average_kw = float(kw.mean())
+            yield [
+                name,
+                round(float(max_kw), 1),
+                round(float(kw[peak]), 1),
+                round(float(max_kva), 1),
+                round(float(kva.max()), 1),
+                peak / self.steps_per_hour,
+                round(average_kw, 1),
+                round(average_kw / kw[peak], 3) if kw[peak] else 0.0,
+            ]
+
+
+def load_profile(els, steps_per_hour=1, duty_cycles=None, hours=HOURS_PER_YEAR):
+    """This function builds the LoadProfile of every MCC of an els object.
+
+    duty_cycles maps LOAD_FACTOR type codes to the DutyCycle overriding their
+    default_duty_cycle.
+    """
+
+    duty_cycles = duty_cycles or {}
+    mcc_names = [mcc.name for mcc in els.mccl]
+    steps = int(round(hours * steps_per_hour))
+    edges = np.arange(steps + 1) / steps_per_hour
+
+    # Running equipment grouped by type, in MEL order
+    groups = {}
+    for j, mcc in enumerate(els.mccl):
+        for me in mcc.mel:
+            if me.operation_mode != 2 and (me.max_kw or me.max_kva):
+                key = LOAD_FACTOR_LOOKUP.row(me.type)[0]
+                groups.setdefault(key, []).append((j, me.max_kw, me.max_kva))
+
+    kw = np.zeros((steps, len(mcc_names)))
+    kva = np.zeros((steps, len(mcc_names)))
+
+    for key, equipment in groups.items():
+        cycle = duty_cycles.get(key) or default_duty_cycle(key)
+
+        # The load of a type repeats every period, so when the period is a whole
+        # number of steps only the first one is computed
+        span = cycle.period * steps_per_hour
+        span = int(span) if float(span).is_integer() and 0 < span < steps else steps
+        chunk = max(1, CHUNK_CELLS // (span + 1))
+
+        columns, max_kw, max_kva = (np.array(values) for values in zip(*equipment))
+        load = np.zeros((span, len(mcc_names) * 2))
+        for start in range(0, len(equipment), chunk):
+            end = min(start + chunk, len(equipment))
+            if cycle.start is None:
+                offsets = np.mod(np.arange(start, end) * STAGGER, 1) * cycle.period
+            else:
+                offsets = np.full(end - start, float(cycle.start))
+
+            share = np.diff(cycle.running(edges[: span + 1], offsets[:, np.newaxis]), axis=1)
+            share *= steps_per_hour
+
+            # Weights place the kW and kVA of every item in the column of its MCC
+            weights = np.zeros((end - start, len(mcc_names) * 2))
+            rows = np.arange(end - start)
+            weights[rows, columns[start:end]] = max_kw[start:end]
+            weights[rows, len(mcc_names) + columns[start:end]] = max_kva[start:end]
+            load += share.T @ weights
+
+        load = np.tile(load, (-(-steps // span), 1))[:steps]
+        kw += load[:, : len(mcc_names)]
+        kva += load[:, len(mcc_names) :]
+
+    for j, mcc in enumerate(els.mccl):
+        for misc in (mcc.lighting, mcc.ups, mcc.field_equipment):
+            kw[:, j] += misc.max_kw
+            kva[:, j] += misc.max_kva
+
+    return LoadProfile(
+        mcc_names,
+        steps_per_hour,
+        kw,
+        kva,
+        np.array([mcc.total_max_kw for mcc in els.mccl], dtype=float),
+        np.array([mcc.total_max_kva for mcc in els.mccl], dtype=float),
+    )
+
+
+def write_load_profile(profile, folder=OUTPUT_FOLDER):
+    """This function writes the LOAD PROFILE workbook of a LoadProfile.
+
+    The PEAK DEMAND sheet compares the coincident peak of every MCC and the site
+    with the sum of its maximum loads, and the PROFILE sheet holds the kW and kVA
+    of every step.
+    """
+
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+
+    ws = wb.create_sheet("PEAK DEMAND")
+    ws.append(PEAK_COLUMNS)
+    for row in profile.peak_rows():
+        ws.append(row)
+
+    ws = wb.create_sheet("PROFILE")
+    names = profile.mcc_names + ["SITE"]
+    ws.append(
+        ["hour"]
+        + ["{} kW".format(name) for name in names]
+        + ["{} kVA".format(name) for name in names]
+    )
+    values = np.column_stack(
+        [profile.hours(), profile.kw, profile.site_kw, profile.kva, profile.site_kva]
+    )
+    for row in np.round(values, 2).tolist():
+        ws.append(row)
+
+    wb.save(os.path.join(folder, LOAD_PROFILE_OUTPUT_FILE))
@@ -0,0 +1,128 @@
+"""Batch mode, running eload for many projects in one process."""
+import csv
+import os
+import time
+from dataclasses import dataclass, field
+
+from eload import eload
+from writer import ELS_TEMPLATE, MCC_TEMPLATE, OUTPUT_FOLDER, template_cache
+
+
+@dataclass
+class Project:
+    """Class for a project listed in a batch manifest."""
+
+    name: str
+    standards: str
+    mel: str
+    output_folder: str
+
+
+@dataclass
+class ProjectResult:
+    """Class for the outcome of running a single batch project."""
+
+    name: str
+    output_folder: str
+    seconds: float
+    errors: dict = field(default_factory=dict)
+
+    @property
+    def ok(self):
+        return not self.errors
+
+
+def read_projects(manifest, output_root=OUTPUT_FOLDER):
+    """This function reads the projects of a CSV batch manifest.
+
+    Every row names a project and its standards and MEL files, and may give an
+    output folder. Paths are relative to the manifest, and projects without an
+    output folder are written into a folder named after them under output_root.
+    """
+
+    folder = os.path.dirname(os.path.abspath(manifest))
+
+    projects = []
+    with open(manifest, newline="") as f:
+        for row in csv.DictReader(f):
+            name = row["name"].strip()
+            output = (row.get("output") or "").strip()
+            projects.append(
+                Project(
+                    name,
+                    os.path.join(folder, row["standards"].strip()),
+                    os.path.join(folder, row["mel"].strip()),
+                    os.path.join(folder, output)
+                    if output
+                    else os.path.join(output_root, name),
+                )
+            )
+
+    output_folders = [os.path.abspath(project.output_folder) for project in projects]
+    if len(set(output_folders)) != len(output_folders):
+        raise ValueError("Batch projects must each have their own output folder")
+
+    return projects
+
+
+def warm_worker():
+    """ This function parses the output templates once for every later project."""
+
+    template_cache.parsed(MCC_TEMPLATE)
+    template_cache.parsed(ELS_TEMPLATE)
+
+
+def run_project(project, output_engine="template", row_cache=False):
+    """This function runs eload for a single batch project.
+
+    Failures are recorded in the result rather than raised.
+    """
+
+    start = time.perf_counter()
+    try:
+        errors = eload(
+            project.standards,
+            project.mel,
+            output_engine=output_engine,
+            row_cache=row_cache,
+            output_folder=project.output_folder,
+        )
+        errors = {name: str(error) for name, error in errors.items()}
+    except Exception as error:
+        errors = {project.name: "{}: {}".format(type(error).__name__, error)}
+
+    return ProjectResult(
+        project.name, project.output_folder, time.perf_counter() - start, errors
+    )
+
+
+def run_projects(projects, jobs=1, output_engine="template", row_cache=False, report=None):
+    """This function runs every batch project, spread over jobs worker processes.
+
+    Each worker parses the templates once and keeps them warm across its
+    projects. report is called with every ProjectResult as it completes.
+    Returns the results in project order.
+    """
+
+    results = [None] * len(projects)
+
+    if jobs > 1:
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+
+        with ProcessPoolExecutor(max_workers=jobs, initializer=warm_worker) as executor:
+            futures = {
+                executor.submit(run_project, project, output_engine, row_cache): i
+                for i, project in enumerate(projects)
+            }
+            for future in as_completed(futures):
+                result = results[futures[future]] = future.result()
+                if report is not None:
+                    report(result)
+    else:
+        warm_worker()
+        for i, project in enumerate(projects):
+            result = results[i] = run_project(project, output_engine, row_cache)
+            if report is not None:
+                report(result)
+
+    return results
@@ -0,0 +1,481 @@
+"""Input adapters reading MEL rows from excel, CSV, JSON lines and Parquet files.
+
+Every adapter yields the same 12 column rows as the MEL workbook, in the order
+area, type, number, name, workpack, mcc_number, installed_kw, starter_type,
+voltage, operation_mode, rev and procurement_rating. The adapter is chosen by
+the file extension, and excel MELs may be read by openpyxl or by parsing the
+sheet XML directly.
+"""
+import csv
+import json
+import os
+import posixpath
+import zipfile
+from xml.etree.ElementTree import fromstring, iterparse
+
+MEL_COLUMNS = [
+    "area",
+    "type",
+    "number",
+    "name",
+    "workpack",
+    "mcc_number",
+    "installed_kw",
+    "starter_type",
+    "voltage",
+    "operation_mode",
+    "rev",
+    "procurement_rating",
+]
+
+# Equipment rows of a MEL workbook start below the title block and header
+MEL_FIRST_ROW = 8
+
+# Columns excel stores as numbers, which text formats give as numeric text
+MEL_NUMERIC_COLUMNS = [
+    MEL_COLUMNS.index("installed_kw"),
+    MEL_COLUMNS.index("voltage"),
+    MEL_COLUMNS.index("operation_mode"),
+]
+
+SHEET_MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+RELATIONSHIPS_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+RELATIONSHIP_ID = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id"
+
+
+class MELError(ValueError):
+    """Class for a MEL that cannot be read, such as a missing sheet or duplicate tags."""
+
+
+def mel_row(values):
+    """ This function pads or truncates values to a 12 column MEL row."""
+
+    values = tuple(values)[: len(MEL_COLUMNS)]
+    return values + (None,) * (len(MEL_COLUMNS) - len(values))
+
+
+def mel_number(value):
+    """This function returns numeric text as the int or float excel would store.
+
+    Other values, such as the DUTY operation mode, are returned unchanged.
+    """
+
+    if isinstance(value, str):
+        for number in (int, float):
+            try:
+                return number(value.strip())
+            except ValueError:
+                pass
+    return value
+
+
+def text_mel_row(values):
+    """This function returns a MEL row read from a text format.
+
+    The MEL_NUMERIC_COLUMNS are converted with mel_number, so a standby row reads
+    as operation mode 2, as in the workbook.
+    """
+
+    row = list(mel_row(values))
+    for i in MEL_NUMERIC_COLUMNS:
+        row[i] = mel_number(row[i])
+    return tuple(row)
+
+
+def workbook_sheet(wb, mel, sheet=None):
+    """This function returns the named sheet of a MEL workbook, or its active sheet.
+
+    Raises MELError if the workbook has no sheet of that name.
+    """
+
+    if sheet is None:
+        return wb.active
+    try:
+        return wb[sheet]
+    except KeyError:
+        raise MELError("{} has no sheet named {}".format(mel, sheet)) from None
+
+
+def iter_xlsx_rows(mel, sheet=None):
+    """This function lazily yields the ME row data of a MEL excel file.
+
+    The named sheet is read, or the active sheet by default. The workbook is
+    parsed in read-only mode, so only the current row is held in memory
+    regardless of the size of the MEL.
+    """
+
+    from openpyxl import load_workbook
+
+    wb = load_workbook(filename=mel, read_only=True, data_only=True)
+    try:
+        ws = workbook_sheet(wb, mel, sheet)
+        yield from ws.iter_rows(min_row=MEL_FIRST_ROW, max_col=12, values_only=True)
+    finally:
+        wb.close()
+
+
+def xlsx_relationships(archive, part):
+    """ This function returns the (type, target path) of each relationship of a part."""
+
+    folder, name = posixpath.split(part)
+    rels = posixpath.join(folder, "_rels", name + ".rels")
+
+    relationships = {}
+    for rel in fromstring(archive.read(rels)).iter(RELATIONSHIPS_NS + "Relationship"):
+        target = rel.get("Target")
+        if target.startswith("/"):
+            target = target[1:]
+        else:
+            target = posixpath.normpath(posixpath.join(folder, target))
+        relationships[rel.get("Id")] = (rel.get("Type").rsplit("/", 1)[-1], target)
+    return relationships
+
+
+def xlsx_shared_strings(archive, path):
+    """ This function reads the shared strings table of a workbook."""
+
+    strings = []
+    if path is None:
+        return strings
+
+    with archive.open(path) as f:
+        for _, element in iterparse(f):
+            if element.tag == SHEET_MAIN_NS + "si":
+                strings.append(xlsx_text(element).replace("x005F_", ""))
+                element.clear()
+    return strings
+
+
+def xlsx_text(element):
+    """ This function returns the text of a string item, joining its rich text runs."""
+
+    texts = [element.findtext(SHEET_MAIN_NS + "t") or ""]
+    for run in element.iterfind(SHEET_MAIN_NS + "r"):
+        texts.append(run.findtext(SHEET_MAIN_NS + "t") or "")
+    return "".join(texts)
+
+
+def xlsx_date_styles(archive, path):
+    """ This function returns the indices of the cell styles formatting dates."""
+
+    if path is None:
+        return set()
+
+    from openpyxl.styles.numbers import builtin_format_code, is_date_format
+
+    styles = fromstring(archive.read(path))
+    custom = {
+        int(fmt.get("numFmtId")): fmt.get("formatCode")
+        for fmt in styles.iterfind(
+            "{0}numFmts/{0}numFmt".format(SHEET_MAIN_NS)
+        )
+    }
+
+    date_styles = set()
+    for i, xf in enumerate(styles.iterfind("{0}cellXfs/{0}xf".format(SHEET_MAIN_NS))):
+        number_format = int(xf.get("numFmtId", 0))
+        fmt = custom.get(number_format) or builtin_format_code(number_format)
+        if fmt is not None and is_date_format(fmt):
+            date_styles.add(i)
+    return date_styles
+
+
+def column_index(reference):
+    """ This function returns the column number of a cell reference such as C8."""
+
+    column = 0
+    for char in reference:
+        if char <= "9":
+            break
+        column = column * 26 + ord(char) - 64
+    return column
+
+
+def iter_xlsx_xml_rows(mel, sheet=None):
+    """This function lazily yields the ME row data of a MEL excel file, parsing
+    the sheet XML directly.
+
+    The shared strings are resolved once, then the named or active sheet is parsed
+    incrementally and every row is discarded once decoded, so memory stays
+    constant regardless of the size of the MEL. Rows match those of
+    iter_xlsx_rows.
+    """
+
+    from openpyxl.utils.datetime import (
+        CALENDAR_MAC_1904,
+        CALENDAR_WINDOWS_1900,
+        from_excel,
+        from_ISO8601,
+    )
+
+    width = len(MEL_COLUMNS)
+    empty_row = (None,) * width
+
+    row_tag = SHEET_MAIN_NS + "row"
+    cell_tag = SHEET_MAIN_NS + "c"
+    value_tag = SHEET_MAIN_NS + "v"
+
+    with zipfile.ZipFile(mel) as archive:
+        workbook_part = next(
+            target
+            for type, target in xlsx_relationships(archive, "").values()
+            if type == "officeDocument"
+        )
+        workbook = fromstring(archive.read(workbook_part))
+        relationships = xlsx_relationships(archive, workbook_part)
+        parts = {type: target for type, target in relationships.values()}
+
+        properties = workbook.find(SHEET_MAIN_NS + "workbookPr")
+        date1904 = properties is not None and properties.get("date1904") in ("1", "true")
+        epoch = CALENDAR_MAC_1904 if date1904 else CALENDAR_WINDOWS_1900
+
+        sheets = workbook.findall("{0}sheets/{0}sheet".format(SHEET_MAIN_NS))
+        if sheet is None:
+            view = workbook.find("{0}bookViews/{0}workbookView".format(SHEET_MAIN_NS))
+            active = sheets[int(view.get("activeTab", 0)) if view is not None else 0]
+        else:
+            try:
+                active = next(e for e in sheets if e.get("name") == sheet)
+            except StopIteration:
+                raise MELError("{} has no sheet named {}".format(mel, sheet)) from None
+        sheet_part = relationships[active.get(RELATIONSHIP_ID)][1]
+
+        shared_strings = xlsx_shared_strings(archive, parts.get("sharedStrings"))
+        date_styles = xlsx_date_styles(archive, parts.get("styles"))
+
+        def decode(cell):
+            type = cell.get("t", "n")
+            if type == "inlineStr":
+                child = cell.find(SHEET_MAIN_NS + "is")
+                return None if child is None else xlsx_text(child)
+
+            value = cell.findtext(value_tag) or None
+            if value is None:
+                return None
+            if type == "n":
+                if "." in value or "E" in value or "e" in value:
+                    value = float(value)
+                else:
+                    value = int(value)
+                if int(cell.get("s", 0)) in date_styles:
+                    try:
+                        return from_excel(value, epoch)
+                    except ValueError:
+                        return "#VALUE!"
+                return value
+            if type == "s":
+                return shared_strings[int(value)]
+            if type == "b":
+                return bool(int(value))
+            if type == "d":
+                return from_ISO8601(value)
+            return value
+
+        with archive.open(sheet_part) as f:
+            max_row = None
+            counter = MEL_FIRST_ROW
+            index = 0
+            sheet_data = None
+
+            for event, element in iterparse(f, ("start", "end")):
+                if event == "start":
+                    tag = element.tag
+                    if tag == SHEET_MAIN_NS + "dimension":
+                        reference = element.get("ref").rsplit(":", 1)[-1]
+                        digits = reference.lstrip("ABCDEFGHIJKLMNOPQRSTUVWXYZ$")
+                        max_row = int(digits) if digits.isdigit() else None
+                    elif tag == SHEET_MAIN_NS + "sheetData":
+                        sheet_data = element
+                    continue
+
+                if element.tag != row_tag:
+                    continue
+
+                number = element.get("r")
+                index = int(number) if number else index + 1
+                if max_row is not None and index > max_row:
+                    break
+
+                # Missing rows are read as empty rows
+                while counter < index:
+                    counter += 1
+                    yield empty_row
+
+                if counter <= index:
+                    row = [None] * width
+                    column = 0
+                    for cell in element.iterfind(cell_tag):
+                        reference = cell.get("r")
+                        column = column_index(reference) if reference else column + 1
+                        if column <= width:
+                            row[column - 1] = decode(cell)
+                    counter += 1
+                    yield tuple(row)
+
+                # Drop the decoded row, keeping the parsed tree empty
+                if sheet_data is not None:
+                    sheet_data.clear()
+
+            if max_row is not None and max_row < index:
+                while counter <= max_row:
+                    counter += 1
+                    yield empty_row
+
+
+def iter_csv_rows(mel):
+    """This function lazily yields the ME row data of a MEL CSV export.
+
+    The first line is a header and is skipped, as are blank lines. Empty fields
+    are read as None, like empty cells of the workbook.
+    """
+
+    with open(mel, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for row in reader:
+            if any(value.strip() for value in row):
+                yield text_mel_row(value if value != "" else None for value in row)
+
+
+def iter_jsonl_rows(mel):
+    """This function lazily yields the ME row data of a MEL JSON lines file.
+
+    Each line holds either an array of the 12 column values or an object keyed
+    by MEL_COLUMNS names. Numeric columns may be given as numbers or text.
+    """
+
+    with open(mel, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+
+            values = json.loads(line)
+            if isinstance(values, dict):
+                yield text_mel_row(values.get(name) for name in MEL_COLUMNS)
+            else:
+                yield text_mel_row(values)
+
+
+def parquet_file(mel):
+    """ This function opens a Parquet MEL, which needs the optional pyarrow package."""
+
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError(
+            "Reading Parquet MELs needs pyarrow, install eload[parquet]"
+        ) from None
+
+    return pq.ParquetFile(mel)
+
+
+def iter_parquet_batches(mel):
+    """This function yields the record batches of a Parquet MEL.
+
+    Only the first 12 columns are read, whatever they are named.
+    """
+
+    pf = parquet_file(mel)
+    yield from pf.iter_batches(columns=pf.schema_arrow.names[: len(MEL_COLUMNS)])
+
+
+def iter_parquet_rows(mel):
+    """ This function lazily yields the ME row data of a Parquet MEL, a batch at a time."""
+
+    for batch in iter_parquet_batches(mel):
+        yield from map(
+            text_mel_row, zip(*(column.to_pylist() for column in batch.columns))
+        )
+
+
+def read_parquet_columns(mel):
+    """This function returns the 12 MEL columns of a Parquet MEL as numpy arrays.
+
+    The columns are read without building a row at a time, ready for
+    vectorized computation.
+    """
+
+    import numpy as np
+
+    pf = parquet_file(mel)
+    table = pf.read(columns=pf.schema_arrow.names[: len(MEL_COLUMNS)])
+
+    columns = [column.to_numpy(zero_copy_only=False) for column in table.columns]
+    while len(columns) < len(MEL_COLUMNS):
+        columns.append(np.full(table.num_rows, None, dtype=object))
+
+    # Numeric columns stored as strings are converted as text_mel_row does
+    for i in MEL_NUMERIC_COLUMNS:
+        if columns[i].dtype == object:
+            columns[i] = np.array([mel_number(value) for value in columns[i]], dtype=object)
+    return columns
+
+
+# Row adapter of each supported MEL file extension
+MEL_READERS = {
+    ".xlsx": iter_xlsx_rows,
+    ".xlsm": iter_xlsx_rows,
+    ".csv": iter_csv_rows,
+    ".jsonl": iter_jsonl_rows,
+    ".ndjson": iter_jsonl_rows,
+    ".parquet": iter_parquet_rows,
+}
+
+
+# Row adapters of excel MELs, selectable as the input engine
+XLSX_ENGINES = {
+    "openpyxl": iter_xlsx_rows,
+    "xml": iter_xlsx_xml_rows,
+}
+
+
+def register_mel_reader(extension, reader):
+    """ This function adds or replaces the row adapter of a MEL file extension."""
+
+    MEL_READERS[extension.lower()] = reader
+
+
+def mel_extension(mel):
+    """ This function returns the lower case file extension of a MEL."""
+
+    return os.path.splitext(mel)[1].lower()
+
+
+def mel_reader(mel, engine="openpyxl"):
+    """This function returns the row adapter for a MEL file.
+
+    Excel MELs are read by the adapter of the given engine. Raises ValueError
+    for an unknown engine or an extension without an adapter.
+    """
+
+    if engine not in XLSX_ENGINES:
+        raise ValueError("Unknown MEL input engine {}".format(engine))
+
+    try:
+        reader = MEL_READERS[mel_extension(mel)]
+    except KeyError:
+        raise ValueError(
+            "Unsupported MEL file {}, expected one of {}".format(
+                mel, ", ".join(sorted(MEL_READERS))
+            )
+        ) from None
+
+    return XLSX_ENGINES[engine] if reader is iter_xlsx_rows else reader
+
+
+def is_excel_mel(mel):
+    """ This function returns whether a MEL file is an excel workbook with sheets."""
+
+    return MEL_READERS.get(mel_extension(mel)) is iter_xlsx_rows
+
+
+def read_mel_columns(mel, engine="openpyxl"):
+    """This function returns the 12 MEL columns of any supported MEL file.
+
+    Parquet columns are read directly. Other formats are read row by row.
+    """
+
+    if mel_extension(mel) == ".parquet":
+        return read_parquet_columns(mel)
+
+    return list(zip(*mel_reader(mel, engine)(mel))) or [()] * len(MEL_COLUMNS)
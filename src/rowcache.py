@@ -0,0 +1,202 @@
+"""Binary cache of the raw rows read from excel input files.
+
+The rows of an input file are stored next to it in a compact columnar file. Each
+column is dictionary encoded: its distinct values are kept in a JSON header and
+every cell is a 32-bit code into them. Cached rows are read straight from a
+memory map, so later runs skip parsing the workbook XML altogether. A cache file
+is only used while the digest of its source file matches.
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from datetime import date, datetime, time, timedelta
+
+from utility import file_digest
+
+MAGIC = b"ELROWS1\n"
+
+# Length of the JSON header, which follows the magic bytes
+HEADER_LENGTH = struct.Struct("<I")
+
+ENCODERS = [
+    (datetime, "datetime", datetime.isoformat),
+    (date, "date", date.isoformat),
+    (time, "time", time.isoformat),
+    (timedelta, "timedelta", lambda value: [value.days, value.seconds, value.microseconds]),
+]
+
+DECODERS = {
+    "datetime": datetime.fromisoformat,
+    "date": date.fromisoformat,
+    "time": time.fromisoformat,
+    "timedelta": lambda value: timedelta(*value),
+}
+
+
+def encode_value(value):
+    """ This function converts a cell value into a JSON value."""
+
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    for kind, tag, encode in ENCODERS:
+        if isinstance(value, kind):
+            return {tag: encode(value)}
+    raise TypeError("Unable to cache a {} cell value".format(type(value).__name__))
+
+
+def decode_value(value):
+    """ This function converts a JSON value back into a cell value."""
+
+    if isinstance(value, dict):
+        ((tag, encoded),) = value.items()
+        return DECODERS[tag](encoded)
+    return value
+
+
+def row_cache_file(path, kind):
+    """ This function returns the cache file of the kind of rows read from path."""
+
+    folder, name = os.path.split(os.path.abspath(path))
+    return os.path.join(folder, ".{}.{}.rows".format(name, kind))
+
+
+class RowTable:
+    """Class for dictionary encoding rows into columns as they are read."""
+
+    def __init__(self):
+        self.width = None
+        self.length = 0
+        self.codes = []
+        self.values = []
+        self.value_codes = []
+
+    def append(self, row):
+        """ This method encodes a single row."""
+
+        if self.width is None:
+            self.width = len(row)
+            self.codes = [array("I") for _ in row]
+            self.values = [[] for _ in row]
+            self.value_codes = [{} for _ in row]
+        elif len(row) != self.width:
+            raise ValueError("Rows of differing widths cannot be cached")
+
+        for codes, values, value_codes, value in zip(
+            self.codes, self.values, self.value_codes, row
+        ):
+            # Cells such as 1 and 1.0 compare equal but must stay distinct
+            key = (type(value), value)
+            try:
+                codes.append(value_codes[key])
+            except KeyError:
+                code = value_codes[key] = len(values)
+                values.append(value)
+                codes.append(code)
+
+        self.length += 1
+
+    def save(self, cache_file, digest):
+        """ This method writes the encoded rows to a cache file."""
+
+        header = json.dumps(
+            {
+                "digest": digest,
+                "rows": self.length,
+                "byteorder": sys.byteorder,
+                "itemsize": array("I").itemsize,
+                "columns": [
+                    [encode_value(value) for value in values] for values in self.values
+                ],
+            }
+        ).encode()
+
+        # Pad the header so the codes are aligned to their item size
+        header += b" " * (-(len(MAGIC) + HEADER_LENGTH.size + len(header)) % 8)
+
+        staging = "{}.{}.tmp".format(cache_file, os.getpid())
+        with open(staging, "wb") as f:
+            f.write(MAGIC)
+            f.write(HEADER_LENGTH.pack(len(header)))
+            f.write(header)
+            for codes in self.codes:
+                codes.tofile(f)
+        os.replace(staging, cache_file)
+
+
+def load_row_cache(cache_file, digest):
+    """This function returns the rows of a cache file, or None if it is stale.
+
+    Rows are decoded lazily from a memory map of the cache file.
+    """
+
+    try:
+        with open(cache_file, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            (length,) = HEADER_LENGTH.unpack(f.read(HEADER_LENGTH.size))
+            header = json.loads(f.read(length))
+            if (
+                header["digest"] != digest
+                or header["byteorder"] != sys.byteorder
+                or header["itemsize"] != array("I").itemsize
+            ):
+                return None
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError, KeyError):
+        return None
+
+    columns = [[decode_value(value) for value in values] for values in header["columns"]]
+    return iter_row_cache(
+        mm, len(MAGIC) + HEADER_LENGTH.size + length, header["rows"], columns
+    )
+
+
+def iter_row_cache(mm, offset, rows, columns):
+    """ This function yields the rows of a memory mapped cache file."""
+
+    view = memoryview(mm)
+    codes = view[offset:].cast("I")
+    try:
+        for i in range(rows):
+            yield tuple(
+                values[codes[c * rows + i]] for c, values in enumerate(columns)
+            )
+    finally:
+        codes.release()
+        view.release()
+        mm.close()
+
+
+def cached_rows(path, kind, read_rows):
+    """This function yields the rows read_rows(path) yields, through the row cache.
+
+    On a miss the rows are encoded as they stream past, and the cache file is
+    written once they have all been read. A cache file that cannot be written,
+    for example next to a read-only source, is skipped.
+    """
+
+    digest = file_digest(path)
+    cache_file = row_cache_file(path, kind)
+
+    rows = load_row_cache(cache_file, digest)
+    if rows is not None:
+        yield from rows
+        return
+
+    table = RowTable()
+    for row in read_rows(path):
+        if table is not None:
+            try:
+                table.append(row)
+            except ValueError:
+                table = None
+        yield row
+
+    if table is not None:
+        try:
+            table.save(cache_file, digest)
+        except (OSError, TypeError):
+            pass
@@ -0,0 +1,177 @@
+"""Content-addressed on-disk cache of whole eload runs."""
+import hashlib
+import os
+import pickle
+import shutil
+
+from utility import file_digest
+
+# Bumped whenever the cached result format changes
+RUN_CACHE_VERSION = 2
+
+# Modules whose code determines the results and workbooks of a run. Their
+# digests are part of every key, so runs cached by other code are not served.
+RESULT_MODULES = ["data", "eload", "writer", "stream"]
+
+RESULT_FILE = "result.pickle"
+
+
+def default_cache_dir():
+    """ This function returns the run cache folder, honouring ELOADER_CACHE_DIR."""
+
+    return os.environ.get(
+        "ELOADER_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "eloader")
+    )
+
+
+def default_cache_size():
+    """ This function returns the run cache size cap in bytes, honouring ELOADER_CACHE_MB."""
+
+    return int(os.environ.get("ELOADER_CACHE_MB", 512)) * 2 ** 20
+
+
+class RunCache:
+    """Class for caching the results of eload runs on disk.
+
+    Entries are keyed by the digests of the standards and MEL files, the output
+    templates and the RESULT_MODULES code, together with the output engine. Each
+    entry holds the pickled ProjectStandard and ElectricalLoadSummary and the
+    names of the generated workbooks, alongside the workbooks themselves. Once the
+    cache grows past max_size bytes the least recently used entries are evicted.
+    """
+
+    def __init__(self, path=None, max_size=None):
+        self.path = path or default_cache_dir()
+        self.max_size = default_cache_size() if max_size is None else max_size
+
+    def key(self, standards_file, mel_file, sheets=None, output_engine="template"):
+        """This method returns the cache key of a standards and MEL file pair.
+
+        mel_file may also be a list of MEL files, read from the named sheets. The
+        workbooks of each output_engine are cached separately.
+        """
+
+        from importlib import import_module
+        from writer import ELS_TEMPLATE, MCC_TEMPLATE
+
+        mel_files = [mel_file] if isinstance(mel_file, str) else list(mel_file)
+        modules = [import_module(name).__file__ for name in RESULT_MODULES]
+
+        digest = hashlib.sha256(repr((RUN_CACHE_VERSION, output_engine)).encode())
+        for path in (standards_file, *mel_files, MCC_TEMPLATE, ELS_TEMPLATE, *modules):
+            digest.update(file_digest(path).encode())
+        if sheets:
+            digest.update(repr(list(sheets)).encode())
+        return digest.hexdigest()
+
+    def load(self, key):
+        """This method returns the cached (STANDARD, els) pair for a key.
+
+        Returns None on a miss. Unreadable entries, and entries missing any of
+        their workbooks, are removed and treated as a miss.
+        """
+
+        entry = os.path.join(self.path, key)
+        try:
+            with open(os.path.join(entry, RESULT_FILE), "rb") as f:
+                STANDARD, els, names = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+
+        if not all(os.path.isfile(os.path.join(entry, name)) for name in names):
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+
+        # Mark the entry as recently used
+        os.utime(entry)
+        return STANDARD, els
+
+    def restore(self, key, folder):
+        """This method copies the cached workbooks of a key into folder.
+
+        Returns False if the entry has gone, such as when another process evicted
+        it after it was loaded, in which case the run must be written normally.
+        """
+
+        entry = os.path.join(self.path, key)
+        try:
+            with open(os.path.join(entry, RESULT_FILE), "rb") as f:
+                names = pickle.load(f)[2]
+            for name in names:
+                shutil.copyfile(os.path.join(entry, name), os.path.join(folder, name))
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return False
+        return True
+
+    def store(self, key, STANDARD, els, files):
+        """ This method caches the result of a run along with its workbook files."""
+
+        os.makedirs(self.path, exist_ok=True)
+
+        entry = os.path.join(self.path, key)
+        staging = "{}.{}.tmp".format(entry, os.getpid())
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+
+        for path in files:
+            shutil.copyfile(path, os.path.join(staging, os.path.basename(path)))
+        names = [os.path.basename(path) for path in files]
+        with open(os.path.join(staging, RESULT_FILE), "wb") as f:
+            pickle.dump((STANDARD, els, names), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        # Entries are published whole, so readers never see a partial entry
+        shutil.rmtree(entry, ignore_errors=True)
+        try:
+            os.rename(staging, entry)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        self.evict()
+
+    def entries(self):
+        """This method lists the cached entries, least recently used first.
+
+        Returns a list of (key, size in bytes, last used timestamp) tuples.
+        """
+
+        if not os.path.isdir(self.path):
+            return []
+
+        entries = []
+        for key in os.listdir(self.path):
+            entry = os.path.join(self.path, key)
+            if key.endswith(".tmp") or not os.path.isdir(entry):
+                continue
+            size = sum(
+                os.path.getsize(os.path.join(entry, name)) for name in os.listdir(entry)
+            )
+            entries.append((key, size, os.path.getmtime(entry)))
+
+        return sorted(entries, key=lambda entry: entry[2])
+
+    def size(self):
+        """ This method returns the total size of the cached entries in bytes."""
+
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        """ This method removes least recently used entries until the cache fits max_size."""
+
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for key, size, _ in entries:
+            if total <= self.max_size:
+                break
+            shutil.rmtree(os.path.join(self.path, key), ignore_errors=True)
+            total -= size
+
+    def purge(self):
+        """ This method removes every cached entry and returns how many were removed."""
+
+        entries = self.entries()
+        for key, _, _ in entries:
+            shutil.rmtree(os.path.join(self.path, key), ignore_errors=True)
+        return len(entries)
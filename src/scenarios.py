@@ -0,0 +1,351 @@
+"""What-if scenarios evaluated for every MCC of a project at once.
+
+The per-equipment quantities that no scenario changes are computed once. Every
+scenario then overrides the procurement rating, the MCC contingency factor
+percent or LOAD_FACTOR rows, and all scenarios are evaluated together as array
+operations. Results match building the MCCs with the same overrides.
+
+This module requires NumPy, which is an optional dependency:
+
+    pip install eload[batch]
+"""
+import csv
+import json
+from typing import Any, List
+
+import numpy as np
+
+from batch import round_array, round_up_array
+from data import (
+    CONTINGENCY_LOOKUP,
+    LOAD_FACTOR_LOOKUP,
+    TRANSFORMER_PRICING_LOOKUP,
+    VSD_CONTINGENCY,
+)
+from dataclasses import dataclass, field
+from eload import (
+    TRANSFORMER_SIZES,
+    FieldEquipment,
+    LightingEquipment,
+    MotorControlCenter,
+    UPSEquipment,
+)
+
+# Columns of the per-MCC scenario report
+REPORT_COLUMNS = [
+    "scenario",
+    "mcc",
+    "total_actual_contingency",
+    "tx_size",
+    "spare_tx",
+    "transformer_cost",
+    "spare_starters",
+    "total_mcc_load_allowed",
+]
+
+
+@dataclass
+class Scenario:
+    """Class for a set of overrides of the project inputs.
+
+    procurement_rating replaces the rating of all equipment. load_factors maps
+    LOAD_FACTOR type codes to a (load factor, diversity utilisation) pair.
+    Unset overrides keep the project values.
+    """
+
+    name: str
+    procurement_rating: str = None
+    contingency_factor_percent: float = None
+    load_factors: dict = field(default_factory=dict)
+
+
+@dataclass
+class ScenarioResult:
+    """Class for the per-MCC results of a list of scenarios.
+
+    Arrays hold one row per scenario and one column per MCC. MCCs too heavily
+    loaded for the largest transformer have a tx_size of 0 and no spare_tx or
+    transformer_cost, which are NaN.
+    """
+
+    scenarios: List[Scenario]
+    mcc_names: list
+    total_actual_contingency: Any
+    tx_size: Any
+    spare_tx: Any
+    transformer_cost: Any
+    spare_starters: Any
+    total_mcc_load_allowed: Any
+    total_transformer_cost: Any
+
+    def rows(self):
+        """ This method yields a report row for every scenario and MCC."""
+
+        for i, scenario in enumerate(self.scenarios):
+            for j, name in enumerate(self.mcc_names):
+                yield [
+                    scenario.name,
+                    name,
+                    float(self.total_actual_contingency[i, j]),
+                    int(self.tx_size[i, j]),
+                    None if np.isnan(self.spare_tx[i, j]) else int(self.spare_tx[i, j]),
+                    None
+                    if np.isnan(self.transformer_cost[i, j])
+                    else int(self.transformer_cost[i, j]),
+                    float(self.spare_starters[i, j]),
+                    float(self.total_mcc_load_allowed[i, j]),
+                ]
+
+
+def _round(values, decimals=0):
+    return round_array(values.ravel(), decimals).reshape(values.shape)
+
+
+def _sequential_sums(values, segments):
+    """This function sums each MCC segment of a scenario by equipment array.
+
+    The equipment is added in MEL order, as the builtin sum does, so totals
+    round exactly as those of MotorControlCenter.
+    """
+
+    return np.stack(
+        [np.cumsum(values[:, start:end], axis=1)[:, -1] for start, end in segments],
+        axis=1,
+    )
+
+
+class ScenarioModel:
+    """Class for the scenario independent quantities of a project.
+
+    Built once from the ProjectStandard and ClientMechanicalEquipmentList of a
+    project, after which any number of scenarios may be evaluated.
+    """
+
+    def __init__(self, STANDARD, MEL):
+        self.mcc_names = list(MEL.mcc_numbers)
+
+        mel = []
+        self.segments = []
+        for name in self.mcc_names:
+            start = len(mel)
+            mel.extend(MEL.partitions[name])
+            self.segments.append((start, len(mel)))
+
+        self.installed_kw = np.array([me.installed_kw for me in mel], dtype=float)
+        self.kva = np.array([me.kva for me in mel], dtype=float)
+        self.standby = np.array([me.operation_mode == 2 for me in mel], dtype=bool)
+        self.contingency_factor = np.array(
+            [me.contingency_factor for me in mel], dtype=float
+        )
+
+        # Equipment types resolve to LOAD_FACTOR rows by approximate match
+        keys = [LOAD_FACTOR_LOOKUP.row(me.type)[0] for me in mel]
+        self.load_factor_keys = list(dict.fromkeys(keys))
+        index = {key: i for i, key in enumerate(self.load_factor_keys)}
+        self.load_factor_index = np.array([index[key] for key in keys], dtype=int)
+
+        self.lighting = LightingEquipment(STANDARD.lighting_load)
+        self.ups = UPSEquipment(STANDARD.ups_load)
+        self.field_equipment = FieldEquipment(STANDARD.fe_dist_load)
+
+        self.counts = np.array([end - start for start, end in self.segments], dtype=float)
+
+        installed_kw = _sequential_sums(self.installed_kw[np.newaxis, :], self.segments)[0]
+        self.total_installed_kw = np.array(
+            [
+                round(
+                    total
+                    + self.lighting.installed_kw
+                    + self.ups.installed_kw
+                    + self.field_equipment.installed_kw,
+                    1,
+                )
+                for total in installed_kw.tolist()
+            ]
+        )
+        self.contingency_load = np.array(
+            [
+                min(
+                    load
+                    for load in VSD_CONTINGENCY
+                    if load >= round(round(total, 2) / count, 2)
+                )
+                for total, count in zip(installed_kw.tolist(), self.counts.tolist())
+            ]
+        )
+
+    def load_factor_table(self, scenarios, column):
+        """This method returns a scenario by LOAD_FACTOR key array of a factor.
+
+        column is 2 for the load factor and 3 for the diversity utilisation.
+        """
+
+        table = np.array(
+            [
+                [
+                    scenario.load_factors[key][column - 2]
+                    if key in scenario.load_factors
+                    else LOAD_FACTOR_LOOKUP.lookup(key, column, False)
+                    for key in self.load_factor_keys
+                ]
+                for scenario in scenarios
+            ],
+            dtype=float,
+        ).reshape(len(scenarios), len(self.load_factor_keys))
+        return table[:, self.load_factor_index]
+
+    def evaluate(self, scenarios, chunk_size=64):
+        """This method evaluates a list of scenarios, returning a ScenarioResult.
+
+        Scenarios are evaluated chunk_size at a time to bound the memory used by
+        the scenario by equipment arrays.
+        """
+
+        scenarios = list(scenarios)
+        results = [
+            self.evaluate_chunk(scenarios[start : start + chunk_size])
+            for start in range(0, len(scenarios), chunk_size)
+        ]
+
+        return ScenarioResult(
+            scenarios,
+            self.mcc_names,
+            *(
+                np.concatenate([getattr(result, name) for result in results])
+                for name in REPORT_COLUMNS[2:] + ["total_transformer_cost"]
+            ),
+        )
+
+    def evaluate_chunk(self, scenarios):
+        """ This method evaluates scenarios together, returning a ScenarioResult."""
+
+        S = len(scenarios)
+
+        load_factor = np.where(self.standby, 0.0, self.load_factor_table(scenarios, 2))
+        diversity_utilisation = np.where(
+            self.standby, 0.0, self.load_factor_table(scenarios, 3)
+        )
+
+        contingency_factor = np.tile(self.contingency_factor, (S, 1))
+        for i, scenario in enumerate(scenarios):
+            if scenario.procurement_rating is not None:
+                contingency_factor[i] = CONTINGENCY_LOOKUP.lookup(
+                    str(scenario.procurement_rating), 1
+                )
+
+        avg_load_factor = round_up_array(load_factor * diversity_utilisation, 3)
+        max_kva = _round(self.kva * load_factor, 1)
+        avg_load_kva = _round(self.kva * avg_load_factor, 1)
+        spare_capacity = _round(contingency_factor * avg_load_kva, 2)
+
+        total_max_kva = _round(
+            _sequential_sums(max_kva, self.segments)
+            + self.lighting.max_kva
+            + self.ups.max_kva
+            + self.field_equipment.max_kva,
+            1,
+        )
+        total_actual_contingency = (
+            round_up_array(_sequential_sums(spare_capacity, self.segments), 0)
+            + total_max_kva
+        )
+
+        limits = np.array([limit for limit, size in TRANSFORMER_SIZES], dtype=float)
+        sizes = np.array([size for limit, size in TRANSFORMER_SIZES] + [0])
+        tx_size = sizes[np.searchsorted(limits, total_actual_contingency, side="left")]
+
+        costs = {
+            size: TRANSFORMER_PRICING_LOOKUP.lookup(size, 1)
+            for limit, size in TRANSFORMER_SIZES
+        }
+        oversized = tx_size == 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            spare_tx = np.where(
+                oversized,
+                np.nan,
+                np.trunc((tx_size - total_actual_contingency) / tx_size * 100),
+            )
+        transformer_cost = np.array(
+            [costs.get(size, np.nan) for size in tx_size.ravel().tolist()], dtype=float
+        ).reshape(tx_size.shape)
+
+        percent = np.array(
+            [
+                MotorControlCenter.contingency_factor_percent
+                if scenario.contingency_factor_percent is None
+                else scenario.contingency_factor_percent
+                for scenario in scenarios
+            ],
+            dtype=float,
+        )
+        spare_starters = round_up_array(
+            (self.counts + MotorControlCenter.misc_starters) * percent[:, np.newaxis]
+        )
+        total_mcc_load_allowed = (
+            self.contingency_load * spare_starters + self.total_installed_kw
+        )
+
+        return ScenarioResult(
+            list(scenarios),
+            self.mcc_names,
+            total_actual_contingency,
+            tx_size,
+            spare_tx,
+            transformer_cost,
+            spare_starters,
+            total_mcc_load_allowed,
+            transformer_cost.sum(axis=1),
+        )
+
+
+def read_scenarios(path):
+    """This function reads scenarios from a JSON file holding a list of objects.
+
+    Each object has a name and any of the Scenario overrides, with load_factors
+    mapping type codes to [load factor, diversity utilisation] pairs.
+    """
+
+    with open(path) as f:
+        return [
+            Scenario(
+                values["name"],
+                values.get("procurement_rating"),
+                values.get("contingency_factor_percent"),
+                {
+                    key: tuple(factors)
+                    for key, factors in values.get("load_factors", {}).items()
+                },
+            )
+            for values in json.load(f)
+        ]
+
+
+def scenario_grid(procurement_ratings=(), contingency_factor_percents=()):
+    """ This function returns a scenario for every combination of the given overrides."""
+
+    return [
+        Scenario(
+            " ".join(
+                name
+                for name in (
+                    "" if rating is None else "rating={}".format(rating),
+                    "" if percent is None else "contingency={}".format(percent),
+                )
+                if name
+            ),
+            rating,
+            percent,
+        )
+        for rating in procurement_ratings or [None]
+        for percent in contingency_factor_percents or [None]
+        if rating is not None or percent is not None
+    ]
+
+
+def write_report(result, path):
+    """ This function writes the per-MCC rows of a ScenarioResult to a CSV file."""
+
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(REPORT_COLUMNS)
+        writer.writerows(result.rows())
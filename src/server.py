@@ -0,0 +1,237 @@
+"""Local eloader service, keeping templates and lookup tables warm between jobs.
+
+Jobs are posted as JSON to http://127.0.0.1:8642/jobs and name a standards
+file, a MEL file and an output folder on the local machine. Output folders must
+be inside the output root the service was started with. The reply lists the
+generated workbooks in that folder.
+
+Jobs must be sent with an application/json Content-Type and a Host naming the
+service, so web pages cannot post jobs with simple cross-origin requests or
+through rebound DNS names.
+"""
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from projects import Project, run_project, warm_worker
+
+SERVE_HOST = "127.0.0.1"
+SERVE_PORT = 8642
+SERVE_URL = "http://{}:{}".format(SERVE_HOST, SERVE_PORT)
+
+# Host names of the local machine accepted besides the address served on
+LOOPBACK_HOSTS = ["127.0.0.1", "localhost", "[::1]"]
+
+
+class JobError(Exception):
+    """Class for a job the service refuses, with the HTTP status to reply with."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class JobServer(ThreadingHTTPServer):
+    """Class for the HTTP server running eload jobs on a bounded worker pool.
+
+    At most workers jobs run at once and up to queue_size more wait for a
+    worker. Further jobs are refused until one completes. Jobs writing to the
+    same output folder run one at a time. Jobs may only write into folders
+    inside output_root, the current folder by default.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self, address=(SERVE_HOST, SERVE_PORT), workers=2, queue_size=8, output_root=None
+    ):
+        super().__init__(address, JobHandler)
+        self.output_root = os.path.realpath(output_root or os.getcwd())
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=warm_worker)
+        self.slots = threading.BoundedSemaphore(workers + queue_size)
+        self.lock = threading.Lock()
+        self.folder_locks = {}
+        self.active = 0
+        self.completed = 0
+
+    def folder_lock(self, folder):
+        """ This method returns the lock serialising the jobs of an output folder."""
+
+        with self.lock:
+            return self.folder_locks.setdefault(folder, threading.Lock())
+
+    def run_job(self, job):
+        """This method runs a single job and returns its reply.
+
+        Raises JobError for a job that is invalid or cannot be queued.
+        """
+
+        try:
+            standards = job["standards"]
+            mel = job["mel"]
+            output = job["output"]
+        except (KeyError, TypeError):
+            raise JobError(400, "Jobs need standards, mel and output paths")
+
+        for path in (standards, mel, output):
+            if not os.path.isabs(path):
+                raise JobError(400, "{} is not an absolute path".format(path))
+        for path in (standards, mel):
+            if not os.path.isfile(path):
+                raise JobError(400, "{} does not exist".format(path))
+
+        # Symbolic links and .. are resolved so a folder cannot escape the root
+        output = os.path.realpath(output)
+        if os.path.commonpath([self.output_root, output]) != self.output_root:
+            raise JobError(
+                403, "{} is not inside the output root {}".format(output, self.output_root)
+            )
+
+        output_engine = job.get("output_engine", "template")
+        if output_engine not in ("template", "stream"):
+            raise JobError(400, "Unknown output engine {}".format(output_engine))
+
+        if not self.slots.acquire(blocking=False):
+            raise JobError(503, "The service is busy, try again later")
+        try:
+            with self.lock:
+                self.active += 1
+            with self.folder_lock(output):
+                result = self.executor.submit(
+                    run_project,
+                    Project(os.path.basename(mel), standards, mel, output),
+                    output_engine,
+                    bool(job.get("row_cache", False)),
+                ).result()
+        finally:
+            with self.lock:
+                self.active -= 1
+                self.completed += 1
+            self.slots.release()
+
+        return {
+            "output": output,
+            "files": sorted(os.listdir(output)) if os.path.isdir(output) else [],
+            "errors": result.errors,
+            "seconds": result.seconds,
+        }
+
+    def status(self):
+        """ This method returns the health reply of the service."""
+
+        with self.lock:
+            return {
+                "status": "ok",
+                "workers": self.workers,
+                "active": self.active,
+                "completed": self.completed,
+            }
+
+    def allowed_hosts(self):
+        """ This method returns the Host header values jobs may be sent with."""
+
+        host, port = self.server_address[:2]
+        hosts = LOOPBACK_HOSTS + [host, "[{}]".format(host)]
+        return {"{}:{}".format(name, port) for name in hosts}
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown()
+
+
+class JobHandler(BaseHTTPRequestHandler):
+    """Class for handling the requests of the eloader service."""
+
+    def reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self.reply(200, self.server.status())
+        else:
+            self.reply(404, {"error": "Not found"})
+
+    def do_POST(self):
+        if self.path != "/jobs":
+            self.reply(404, {"error": "Not found"})
+            return
+
+        content_type = self.headers.get("Content-Type", "").split(";")[0].strip()
+        if content_type.lower() != "application/json":
+            self.reply(415, {"error": "Jobs must be sent as application/json"})
+            return
+        if self.headers.get("Host", "").lower() not in self.server.allowed_hosts():
+            self.reply(403, {"error": "Jobs must be sent to the service address"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            job = json.loads(self.rfile.read(length))
+        except ValueError:
+            job = None
+        if not isinstance(job, dict):
+            self.reply(400, {"error": "Jobs must be JSON objects"})
+            return
+
+        try:
+            self.reply(200, self.server.run_job(job))
+        except JobError as error:
+            self.reply(error.status, {"error": str(error)})
+        except Exception as error:
+            self.reply(500, {"error": "{}: {}".format(type(error).__name__, error)})
+
+    def log_message(self, format, *args):
+        # Job results are reported to the client rather than logged per request
+        pass
+
+
+def serve(host=SERVE_HOST, port=SERVE_PORT, workers=2, queue_size=8, output_root=None):
+    """ This function runs the eloader service until interrupted."""
+
+    with JobServer((host, port), workers, queue_size, output_root) as server:
+        server.serve_forever()
+
+
+def submit_job(
+    standards, mel, output, url=SERVE_URL, output_engine="template", row_cache=False
+):
+    """This function forwards a job to the eloader service and returns its reply.
+
+    Relative paths are resolved here, as the service may run in another folder.
+    Raises JobError if the service refuses the job, and OSError if it cannot be
+    reached.
+    """
+
+    from urllib.error import HTTPError
+    from urllib.request import Request, urlopen
+
+    job = {
+        "standards": os.path.abspath(standards),
+        "mel": os.path.abspath(mel),
+        "output": os.path.abspath(output),
+        "output_engine": output_engine,
+        "row_cache": row_cache,
+    }
+    request = Request(
+        url.rstrip("/") + "/jobs",
+        data=json.dumps(job).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+
+    try:
+        with urlopen(request) as response:
+            return json.load(response)
+    except HTTPError as error:
+        try:
+            message = json.load(error)["error"]
+        except (ValueError, KeyError):
+            message = error.reason
+        raise JobError(error.code, message)
@@ -0,0 +1,247 @@
+"""Monte Carlo simulation of the load uncertainty of every MCC.
+
+Load factors and diversity utilisations are drawn around their LOAD_FACTOR
+values, and optionally the contingency factors around their CONTINGENCY_TABLE
+values. A single draw is made per equipment type, or per procurement rating,
+in each trial and shared by all equipment of that type, as a wrong assumption
+about a type of equipment affects all of it. The equipment of every MCC is
+aggregated by type once, so each trial is a handful of matrix products
+regardless of the number of equipment items.
+
+This module requires NumPy, which is an optional dependency:
+
+    pip install eload[batch]
+"""
+import csv
+from typing import Any
+
+import numpy as np
+
+from data import CONTINGENCY_LOOKUP, LOAD_FACTOR_LOOKUP
+from dataclasses import dataclass
+from eload import TRANSFORMER_SIZES
+
+PERCENTILES = [50, 90, 95, 99]
+
+# Trials drawn and evaluated together
+TRIAL_CHUNK = 10000
+
+
+@dataclass
+class FactorDistribution:
+    """Class for the spread of a factor around its table value.
+
+    Each draw scales the table value by 1 + noise, where noise is triangular or
+    uniform over [-spread, spread], or normal with a standard deviation of
+    spread. Load factors and diversity utilisations are kept within [0, 1].
+    """
+
+    kind: str = "triangular"
+    spread: float = 0.2
+
+    def draw(self, rng, shape):
+        """ This method draws relative noise of the given shape."""
+
+        if self.kind == "triangular":
+            if not self.spread:
+                return np.zeros(shape)
+            return rng.triangular(-self.spread, 0, self.spread, shape)
+        if self.kind == "uniform":
+            return rng.uniform(-self.spread, self.spread, shape)
+        if self.kind == "normal":
+            return rng.normal(0, self.spread, shape)
+        raise ValueError("Unknown distribution {}".format(self.kind))
+
+
+@dataclass
+class SimulationResult:
+    """Class for the simulated actual contingency load of every MCC and the ELS.
+
+    percentiles hold one row per PERCENTILES value and one column per MCC.
+    exceed_probability is the share of trials loading a MCC beyond its
+    transformer size, and upsize_probability the share needing a larger
+    transformer than was selected. For the whole ELS, the demand of all MCCs is
+    compared with the capacity of all their transformers, and
+    els_upsize_probability is the share of trials in which any MCC needs a
+    larger transformer.
+    """
+
+    trials: int
+    mcc_names: list
+    tx_size: Any
+    total_actual_contingency: Any
+    percentiles: Any
+    exceed_probability: Any
+    upsize_probability: Any
+    els_total_actual_contingency: float
+    els_capacity: float
+    els_percentiles: Any
+    els_exceed_probability: float
+    els_upsize_probability: float
+
+    def rows(self):
+        """ This method yields a report row for every MCC and the ELS."""
+
+        for j, name in enumerate(self.mcc_names):
+            yield [
+                name,
+                int(self.tx_size[j]),
+                float(self.total_actual_contingency[j]),
+                *(round(float(value), 1) for value in self.percentiles[:, j]),
+                float(self.exceed_probability[j]),
+                float(self.upsize_probability[j]),
+            ]
+        yield [
+            "ELS",
+            int(self.els_capacity),
+            float(self.els_total_actual_contingency),
+            *(round(float(value), 1) for value in self.els_percentiles),
+            float(self.els_exceed_probability),
+            float(self.els_upsize_probability),
+        ]
+
+
+class LoadSimulation:
+    """Class for simulating the load uncertainty of a built ElectricalLoadSummary.
+
+    Each MCC keeps the transformer selected for it by the deterministic
+    calculation. With no spread every trial reproduces its
+    total_actual_contingency.
+    """
+
+    def __init__(self, els):
+        self.mcc_names = [mcc.name for mcc in els.mccl]
+        self.tx_size = np.array([mcc.tx_size for mcc in els.mccl], dtype=float)
+        self.total_actual_contingency = np.array(
+            [mcc.total_actual_contingency for mcc in els.mccl], dtype=float
+        )
+
+        limits = dict((size, limit) for limit, size in TRANSFORMER_SIZES)
+        self.tx_limit = np.array([limits[size] for size in self.tx_size.tolist()])
+
+        kva = []
+        types = []
+        ratings = []
+        columns = []
+        for j, mcc in enumerate(els.mccl):
+            for me in mcc.mel:
+                # Standby equipment carries no load
+                if me.operation_mode != 2:
+                    kva.append(me.kva)
+                    types.append(LOAD_FACTOR_LOOKUP.row(me.type)[0])
+                    ratings.append(CONTINGENCY_LOOKUP.row(me.procurement_rating)[0])
+                    columns.append(j)
+
+        self.types = list(dict.fromkeys(types))
+        self.ratings = list(dict.fromkeys(ratings))
+        self.load_factor = np.array(
+            [LOAD_FACTOR_LOOKUP.lookup(key, 2, False) for key in self.types], dtype=float
+        )
+        self.diversity_utilisation = np.array(
+            [LOAD_FACTOR_LOOKUP.lookup(key, 3, False) for key in self.types], dtype=float
+        )
+        self.contingency_factor = np.array(
+            [CONTINGENCY_LOOKUP.lookup(key, 1, False) for key in self.ratings], dtype=float
+        )
+
+        # kVA of every MCC by equipment type and procurement rating
+        type_index = {key: i for i, key in enumerate(self.types)}
+        rating_index = {key: i for i, key in enumerate(self.ratings)}
+        self.kva = np.zeros((len(self.ratings), len(self.types), len(self.mcc_names)))
+        np.add.at(
+            self.kva,
+            (
+                np.array([rating_index[key] for key in ratings], dtype=int),
+                np.array([type_index[key] for key in types], dtype=int),
+                np.array(columns, dtype=int),
+            ),
+            np.array(kva, dtype=float),
+        )
+
+        # The per-equipment rounding and the lighting, UPS and field equipment
+        # loads are carried over from the deterministic calculation
+        self.offset = self.total_actual_contingency - self.load(
+            self.load_factor[np.newaxis, :],
+            self.diversity_utilisation[np.newaxis, :],
+            self.contingency_factor[np.newaxis, :],
+        )[0]
+
+    def load(self, load_factor, diversity_utilisation, contingency_factor):
+        """This method returns the unrounded equipment load of every MCC.
+
+        Each argument has one row per trial, and one column per type or rating.
+        Returns one row per trial and one column per MCC.
+        """
+
+        max_kva = load_factor @ self.kva.sum(axis=0)
+        spare_capacity = sum(
+            (load_factor * diversity_utilisation * contingency_factor[:, [r]]) @ kva
+            for r, kva in enumerate(self.kva)
+        )
+        return max_kva + spare_capacity
+
+    def run(
+        self,
+        trials=10000,
+        load=FactorDistribution(),
+        contingency=FactorDistribution(spread=0),
+        seed=None,
+    ):
+        """ This method runs the trials, returning a SimulationResult."""
+
+        rng = np.random.default_rng(seed)
+
+        results = []
+        for start in range(0, trials, TRIAL_CHUNK):
+            count = min(TRIAL_CHUNK, trials - start)
+            shape = (count, len(self.types))
+            load_factor = np.clip(self.load_factor * (1 + load.draw(rng, shape)), 0, 1)
+            diversity_utilisation = np.clip(
+                self.diversity_utilisation * (1 + load.draw(rng, shape)), 0, 1
+            )
+            contingency_factor = np.clip(
+                self.contingency_factor
+                * (1 + contingency.draw(rng, (count, len(self.ratings)))),
+                0,
+                None,
+            )
+            results.append(
+                self.load(load_factor, diversity_utilisation, contingency_factor)
+                + self.offset
+            )
+        demand = np.concatenate(results) if results else np.zeros((0, len(self.mcc_names)))
+        els_demand = demand.sum(axis=1)
+
+        return SimulationResult(
+            trials,
+            self.mcc_names,
+            self.tx_size,
+            self.total_actual_contingency,
+            np.percentile(demand, PERCENTILES, axis=0),
+            (demand > self.tx_size).mean(axis=0),
+            (demand > self.tx_limit).mean(axis=0),
+            float(self.total_actual_contingency.sum()),
+            float(self.tx_size.sum()),
+            np.percentile(els_demand, PERCENTILES),
+            float((els_demand > self.tx_size.sum()).mean()),
+            float((demand > self.tx_limit).any(axis=1).mean()),
+        )
+
+
+def report_columns():
+    """ This function returns the header of the simulation report."""
+
+    return (
+        ["mcc", "tx_size", "total_actual_contingency"]
+        + ["p{}".format(percentile) for percentile in PERCENTILES]
+        + ["exceed_probability", "upsize_probability"]
+    )
+
+
+def write_report(result, path):
+    """ This function writes the rows of a SimulationResult to a CSV file."""
+
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(report_columns())
+        writer.writerows(result.rows())
@@ -0,0 +1,208 @@
+"""Streaming write-only output engine for very large reports.
+
+Rows are written straight into the xlsx package in a single forward pass. The
+header block, styles and footer layout are taken from the cached templates, so
+the reports match those produced by `writer.mcc_writer` and `writer.els_writer`
+without materialising the worksheet in memory.
+"""
+import os
+from copy import copy, deepcopy
+
+from writer import (
+    ELS_OFFSET,
+    ELS_OUTPUT_FILE,
+    ELS_ROW_STYLE,
+    ELS_TEMPLATE,
+    MCC_OFFSET,
+    MCC_OUTPUT_FILE,
+    MCC_ROW_STYLE,
+    MCC_TEMPLATE,
+    OUTPUT_FOLDER,
+    els_cells,
+    mcc_cells,
+    resolve_row_style,
+    template_cache,
+)
+
+# Workbook attributes copied from the template, which keeps its style ids valid
+WORKBOOK_ATTRIBUTES = [
+    "_fonts",
+    "_alignments",
+    "_borders",
+    "_fills",
+    "_number_formats",
+    "_protections",
+    "_cell_styles",
+    "_named_styles",
+    "_differential_styles",
+    "_table_styles",
+    "_colors",
+    "_external_links",
+    "defined_names",
+    "loaded_theme",
+    "calculation",
+    "epoch",
+]
+
+# Worksheet layout and print settings copied from the template
+SHEET_ATTRIBUTES = [
+    "sheet_properties",
+    "sheet_format",
+    "views",
+    "column_dimensions",
+    "row_dimensions",
+    "merged_cells",
+    "conditional_formatting",
+    "data_validations",
+    "page_setup",
+    "page_margins",
+    "print_options",
+    "HeaderFooter",
+    "protection",
+    "row_breaks",
+    "col_breaks",
+]
+
+
+def template_workbook(template_wb, template_ws, title):
+    """This method creates a write-only workbook laid out like a template sheet.
+
+    Returns the workbook and its single, still empty, worksheet.
+    """
+
+    from openpyxl import Workbook
+    from openpyxl.utils.indexed_list import IndexedList
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title)
+
+    memo = {id(template_wb): wb, id(template_ws): ws}
+    for name in WORKBOOK_ATTRIBUTES:
+        value = getattr(template_wb, name)
+        if isinstance(value, IndexedList):
+            value = IndexedList(deepcopy(list(value), memo))
+        else:
+            value = deepcopy(value, memo)
+        setattr(wb, name, value)
+
+    for name in SHEET_ATTRIBUTES:
+        setattr(ws, name, deepcopy(getattr(template_ws, name), memo))
+
+    return wb, ws
+
+
+def stream_rows(ws, template_ws, offset, amount, max_col, row_style, cells):
+    """This method appends the template rows with a block of inserted rows.
+
+    amount rows styled with row_style are inserted at offset, as
+    `insert_rows` would. cells yields the ((row, column), value) cells of the
+    finished sheet in row order, and overrides the template values.
+    """
+
+    from openpyxl.cell import WriteOnlyCell
+
+    template_rows = {}
+    for (row, column), cell in template_ws._cells.items():
+        template_rows.setdefault(row, []).append(cell)
+
+    cells = iter(cells)
+    pending = next(cells, None)
+
+    row = 1
+    while row <= template_ws.max_row + amount or pending is not None:
+        line = {}
+
+        if offset <= row < offset + amount:
+            for column in range(1, max_col + 1):
+                cell = line[column] = WriteOnlyCell(ws)
+                cell._style = copy(row_style)
+        else:
+            source_row = row if row < offset else row - amount
+            for template_cell in template_rows.get(source_row, []):
+                cell = line[template_cell.column] = WriteOnlyCell(
+                    ws, template_cell._value
+                )
+                cell.data_type = template_cell.data_type
+                cell._style = copy(template_cell._style)
+
+        while pending is not None and pending[0][0] == row:
+            (_, column), value = pending
+            if column not in line:
+                line[column] = WriteOnlyCell(ws)
+            line[column].value = value
+            pending = next(cells, None)
+
+        if pending is not None and pending[0][0] < row:
+            raise ValueError("Cells must be yielded in row order")
+
+        ws.append([line.get(column) for column in range(1, max(line, default=0) + 1)])
+        row += 1
+
+
+def stream_mcc(mcc, STANDARD, folder=OUTPUT_FOLDER):
+    """This method streams the MCC template summary for a single MCC."""
+
+    from openpyxl.cell import WriteOnlyCell
+
+    mcc_output_file = os.path.join(folder, MCC_OUTPUT_FILE.format(mcc.name))
+
+    template_wb = template_cache.parsed(MCC_TEMPLATE)
+    template_ws = template_wb["Template for MCC"]
+
+    wb, ws = template_workbook(template_wb, template_ws, mcc.name)
+
+    # Resolve the Inserted Row style
+    row_style = resolve_row_style(
+        WriteOnlyCell(ws), template_ws.cell(row=MCC_ROW_STYLE[0], column=MCC_ROW_STYLE[1])
+    )
+
+    # Adjust print area
+    ws.print_area = "A1:S{}".format(21 + len(mcc.mel))
+
+    stream_rows(
+        ws,
+        template_ws,
+        MCC_OFFSET,
+        len(mcc.mel),
+        19,
+        row_style,
+        mcc_cells(mcc, STANDARD),
+    )
+
+    wb.save(filename=mcc_output_file)
+
+
+def stream_els(els, STANDARD, folder=OUTPUT_FOLDER):
+    """This method streams the POWER SUMMARY for an els object."""
+
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment
+
+    power_summary_output_file = os.path.join(folder, ELS_OUTPUT_FILE)
+
+    template_wb = template_cache.parsed(ELS_TEMPLATE)
+    template_ws = template_wb["ELECTRICAL LOAD SUMMARY"]
+
+    wb, ws = template_workbook(template_wb, template_ws, template_ws.title)
+
+    # Resolve the Inserted Row style
+    row_style = resolve_row_style(
+        WriteOnlyCell(ws),
+        template_ws.cell(row=ELS_ROW_STYLE[0], column=ELS_ROW_STYLE[1]),
+        Alignment(horizontal="center"),
+    )
+
+    # Adjust print area
+    ws.print_area = "A1:M{}".format(19 + len(els.mccl))
+
+    stream_rows(
+        ws,
+        template_ws,
+        ELS_OFFSET,
+        len(els.mccl),
+        13,
+        row_style,
+        els_cells(els, STANDARD),
+    )
+
+    wb.save(filename=power_summary_output_file)
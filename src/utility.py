@@ -1,4 +1,6 @@
+import hashlib
 import math
+from bisect import bisect_right
 from operator import __eq__, __ge__
 
 
@@ -12,8 +14,103 @@ def vlookup(key, table, column, approximate_match=True):
         return None
 
 
+class LookupTable:
+    """Class for indexed vlookup access to a static table.
+
+    The table is indexed once on construction. Approximate matches bisect a
+    sorted array of keys and exact matches use a hash index, both returning
+    the same row `vlookup` would select.
+    """
+
+    def __init__(self, table):
+        self.table = table
+
+        # vlookup returns the max() of all candidate rows, so rows sharing a
+        # key resolve to the greatest of them.
+        index = {}
+        for row in table:
+            key = row[0]
+            if key not in index or row > index[key]:
+                index[key] = row
+
+        self.index = index
+        self.keys = sorted(index)
+        self.rows = [index[key] for key in self.keys]
+
+    def __len__(self):
+        return len(self.table)
+
+    def row(self, key, approximate_match=True):
+        """ This method returns the matching table row, or None if there is no match."""
+
+        if not approximate_match:
+            return self.index.get(key)
+
+        position = bisect_right(self.keys, key)
+        if position == 0:
+            return None
+        return self.rows[position - 1]
+
+    def lookup(self, key, column, approximate_match=True):
+        """ This method emulates vlookup functionality found in Excel."""
+
+        row = self.row(key, approximate_match)
+        if row is None:
+            return None
+        return row[column]
+
+
 def round_up(n, decimals=0):
     """ This function emulates the round functionality found in Excel."""
 
     multiplier = 10 ** decimals
     return math.ceil(n * multiplier) / multiplier
+
+
+def file_digest(path):
+    """ This function returns the SHA-256 hex digest of a file's contents."""
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExactSum:
+    """Class for a float total that values can be added to and subtracted from
+    without accumulating rounding error.
+
+    The total is held as non-overlapping partial sums, as math.fsum does, so
+    adding and later subtracting a value restores the previous total exactly.
+    """
+
+    __slots__ = ("partials",)
+
+    def __init__(self, total=0.0):
+        self.partials = [total] if total else []
+
+    def add(self, value):
+        """ This method adds value to the total."""
+
+        partials = self.partials
+        i = 0
+        for partial in partials:
+            if abs(value) < abs(partial):
+                value, partial = partial, value
+            high = value + partial
+            low = partial - (high - value)
+            if low:
+                partials[i] = low
+                i += 1
+            value = high
+        partials[i:] = [value]
+
+    def subtract(self, value):
+        """ This method subtracts value from the total."""
+
+        self.add(-value)
+
+    @property
+    def value(self):
+        return math.fsum(self.partials)
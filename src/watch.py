@@ -0,0 +1,161 @@
+"""Watch mode, keeping the outputs of a pair of input files up to date."""
+import os
+import time
+from datetime import datetime
+
+from columnar import mcc_partitions
+from eload import (
+    ElectricalLoadSummary,
+    iter_client_mel_rows,
+    mcc_builder,
+    me_builder,
+    read_standards,
+)
+from writer import OUTPUT_FOLDER, write_outputs
+
+# Seconds between checks of the input files
+WATCH_INTERVAL = 0.25
+
+
+def file_stamp(path):
+    """ This function returns the (mtime, size) stamp used to detect file changes."""
+
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+class Watcher:
+    """Class for incrementally rebuilding the outputs of a standards and MEL file.
+
+    The last read standards, equipment and MCCs are kept between polls. When the
+    MEL changes only the MCCs whose equipment rows differ are rebuilt, and only
+    their workbooks and the POWER SUMMARY are rewritten.
+    """
+
+    def __init__(
+        self,
+        standards_file,
+        mel_file,
+        jobs=1,
+        output_engine="template",
+        folder=OUTPUT_FOLDER,
+        input_engine="openpyxl",
+    ):
+        self.standards_file = standards_file
+        self.mel_file = mel_file
+        self.jobs = jobs
+        self.output_engine = output_engine
+        self.folder = folder
+        self.input_engine = input_engine
+
+        self.stamps = {}
+        self.failed_stamps = None
+        self.STANDARD = None
+        self.equipment = {}
+        self.partitions = {}
+        self.mccs = {}
+        self.els = None
+
+    def read_partitions(self):
+        """This method reads the MEL, partitioned by MCC.
+
+        Equipment is only built for rows that are new or changed since the
+        previous read.
+        """
+
+        equipment = {}
+        mel = []
+        for row in iter_client_mel_rows(self.mel_file, self.input_engine):
+            try:
+                me = self.equipment[row]
+            except KeyError:
+                me = me_builder(row)
+            equipment[row] = me
+            mel.append(me)
+
+        self.equipment = equipment
+        return mcc_partitions(mel)
+
+    def poll(self):
+        """This method rebuilds the outputs if either input file changed.
+
+        Returns None when nothing changed, otherwise the names of the rebuilt
+        MCCs and a dict of output name to error for every workbook that failed.
+        """
+
+        stamps = {
+            path: file_stamp(path) for path in (self.standards_file, self.mel_file)
+        }
+        if stamps in (self.stamps, self.failed_stamps):
+            return None
+
+        standards_changed = stamps[self.standards_file] != self.stamps.get(
+            self.standards_file
+        )
+
+        # Inputs that fail to read, such as a half saved file, are only read
+        # again once they change
+        try:
+            if standards_changed:
+                STANDARD = read_standards(self.standards_file)
+            else:
+                STANDARD = self.STANDARD
+            partitions = self.read_partitions()
+        except Exception:
+            self.failed_stamps = stamps
+            raise
+
+        self.stamps = stamps
+        self.STANDARD = STANDARD
+
+        changed = [
+            name
+            for name, mel in partitions.items()
+            if standards_changed or self.partitions.get(name) != mel
+        ]
+        for name in changed:
+            self.mccs[name] = mcc_builder(
+                name,
+                self.STANDARD.lighting_load,
+                self.STANDARD.ups_load,
+                self.STANDARD.fe_dist_load,
+                partitions[name],
+            )
+
+        self.mccs = {name: self.mccs[name] for name in partitions}
+        self.partitions = partitions
+        self.els = ElectricalLoadSummary(list(self.mccs.values()))
+
+        errors = write_outputs(
+            self.els,
+            self.STANDARD,
+            self.jobs,
+            self.output_engine,
+            incremental=True,
+            folder=self.folder,
+        )
+        return changed, errors
+
+
+def watch(watcher, echo=print, interval=WATCH_INTERVAL):
+    """This function polls a Watcher until interrupted, reporting every rebuild."""
+
+    while True:
+        try:
+            result = watcher.poll()
+        except Exception as error:
+            echo("Unable to read the input files: {}".format(error))
+            result = None
+
+        if result is not None:
+            changed, errors = result
+            echo(
+                "{:%H:%M:%S} Rebuilt {} of {} MCCs".format(
+                    datetime.now(), len(changed), len(watcher.mccs)
+                )
+            )
+            for name, error in errors.items():
+                echo("Unable to write {}: {}".format(name, error))
+
+        time.sleep(interval)
+
@@ -1,22 +1,164 @@
-def clear_output():
-    import os, re, os.path
+import hashlib
+import os
+import threading
 
-    folder = "output"
+from profiler import NULL_PROFILER, timed_call
+from utility import file_digest
+
+MCC_TEMPLATE = "src/templates/mcc_template.xlsx"
+ELS_TEMPLATE = "src/templates/electrical_load_summary_template.xlsx"
+
+MCC_TITLE = "ELECTRICAL LOADS LIST SUBSTATION - {}"
+
+OUTPUT_FOLDER = "output"
+MCC_OUTPUT_FILE = MCC_TITLE + ".xlsx"
+ELS_OUTPUT_FILE = "POWER SUMMARY.xlsx"
+LOAD_PROFILE_OUTPUT_FILE = "LOAD PROFILE.xlsx"
+
+# Digests of the last incremental run's outputs
+MANIFEST_FILE = "manifest.json"
+
+# First row of the inserted equipment and MCC rows
+MCC_OFFSET = 9
+ELS_OFFSET = 10
+
+# Template (row, column) the inserted rows take their style from
+MCC_ROW_STYLE = (9, 2)
+ELS_ROW_STYLE = (16, 5)
+
+
+class TemplateCache:
+    """Class for caching parsed template workbooks in memory.
+
+    Each template is parsed once per process and every request returns an
+    in-memory clone of it. A template is parsed again when its file mtime has
+    changed and its content hash no longer matches.
+    """
+
+    def __init__(self):
+        self.templates = {}
+        self.lock = threading.Lock()
+
+    def get(self, path):
+        """ This method returns a fresh copy of the template workbook at path."""
+
+        return clone_workbook(self.parsed(path))
+
+    def parsed(self, path):
+        """This method returns the shared parsed template workbook at path.
+
+        The returned workbook must not be modified.
+        """
+
+        from os import stat
+        from openpyxl import load_workbook
+
+        mtime = stat(path).st_mtime_ns
+
+        with self.lock:
+            cached = self.templates.get(path)
+            if cached is None or cached[0] != mtime:
+                digest = file_digest(path)
+                if cached is None or cached[1] != digest:
+                    wb = load_workbook(filename=path)
+                else:
+                    wb = cached[2]
+                cached = self.templates[path] = (mtime, digest, wb)
+
+        return cached[2]
+
+    def clear(self):
+        """ This method drops every cached template."""
+
+        with self.lock:
+            self.templates.clear()
+
+
+def clone_workbook(wb):
+    """This method returns an independent in-memory copy of a workbook.
+
+    openpyxl keeps its style tables in IndexedLists, which deepcopy restores
+    empty, so those are copied explicitly first.
+    """
+
+    from copy import deepcopy
+    from openpyxl.utils.indexed_list import IndexedList
+
+    memo = {}
+    for value in vars(wb).values():
+        if isinstance(value, IndexedList):
+            memo[id(value)] = IndexedList(deepcopy(list(value), memo))
+
+    return deepcopy(wb, memo)
+
+
+template_cache = TemplateCache()
+
+
+def is_output_file(name):
+    """ This method returns whether a file name is one of the files eload writes."""
+
+    mcc_prefix, mcc_suffix = MCC_OUTPUT_FILE.split("{}")
+    return name in (ELS_OUTPUT_FILE, LOAD_PROFILE_OUTPUT_FILE, MANIFEST_FILE) or (
+        name.startswith(mcc_prefix) and name.endswith(mcc_suffix)
+    )
+
+
+def clear_output(folder=OUTPUT_FOLDER):
+    """This method removes the files a previous run wrote into folder.
+
+    Only the workbooks and manifest eload writes are removed, so an output folder
+    shared with the inputs or other files keeps them. Subfolders are left alone.
+    """
 
     # Create folder if it does not exist
     if not os.path.exists(folder):
         os.makedirs(folder)
 
-    for root, dirs, files in os.walk(folder):
-        for file in files:
-            os.remove(os.path.join(root, file))
+    for entry in os.scandir(folder):
+        if entry.is_file() and is_output_file(entry.name):
+            os.remove(entry.path)
+
+
+def insert_row_style(ws, offset, amount, max_col, style_cell, alignment=None):
+    """This method styles a block of inserted rows after a template cell.
+
+    The template style is resolved once onto the first inserted cell and the
+    resulting style is then shared by every other inserted cell.
+    """
+
+    from copy import copy
+
+    style = resolve_row_style(ws.cell(row=offset, column=1), style_cell, alignment)
+
+    for row in ws.iter_rows(
+        min_row=offset, max_row=offset + amount - 1, min_col=1, max_col=max_col
+    ):
+        for cell in row:
+            cell._style = copy(style)
+
+
+def resolve_row_style(cell, style_cell, alignment=None):
+    """ This method copies the style of style_cell onto cell and returns it."""
+
+    from copy import copy
+
+    cell.style = copy(style_cell.style)
+    cell.font = copy(style_cell.font)
+    cell.border = copy(style_cell.border)
+    cell.fill = copy(style_cell.fill)
+    cell.number_format = copy(style_cell.number_format)
+    cell.protection = copy(style_cell.protection)
+    cell.alignment = copy(alignment or style_cell.alignment)
+    return cell._style
 
 
-def mcc_writer(els, STANDARD):
+def mcc_writer(els, STANDARD, folder=OUTPUT_FOLDER):
     """This method accepts an els object and using the MCC
     template produces a summary for each MCC.
 
-    It does this by first making a copy of the MCC Template file.
+    It does this by first taking an in-memory copy of the cached MCC Template
+    workbook.
 
     Then making a modification of the `Template for MCC' sheet and
     appending the appropriate detail.
@@ -24,129 +166,121 @@ def mcc_writer(els, STANDARD):
     Finally, it removes the template sheet and saves the file.
     """
 
-    from openpyxl import load_workbook
-    from shutil import copyfile
-    from sys import exit, exc_info
-    from copy import copy
-    from openpyxl.worksheet.properties import WorksheetProperties, PageSetupProperties
+    for mcc in els.mccl:
+        write_mcc(mcc, STANDARD, folder)
 
-    mcc_template = "src/templates/mcc_template.xlsx"
 
-    for mcc in els.mccl:
+def write_mcc(mcc, STANDARD, folder=OUTPUT_FOLDER):
+    """This method produces the MCC template summary for a single MCC."""
+
+    # Create MCC workbook from the cached template
+    mcc_output_file = os.path.join(folder, MCC_OUTPUT_FILE.format(mcc.name))
+
+    wb = template_cache.get(MCC_TEMPLATE)
+    ws = wb["Template for MCC"]
+
+    # Insert empty rows and update Inserted Row style
+    offset = MCC_OFFSET
+    if mcc.mel:
+        ws.insert_rows(offset, len(mcc.mel))
+        style_cell = ws.cell(
+            row=MCC_ROW_STYLE[0] + len(mcc.mel), column=MCC_ROW_STYLE[1]
+        )
+        insert_row_style(ws, offset, len(mcc.mel), 19, style_cell)
+
+    # Add Project and Mechanical Equipment details
+    for (row, column), value in mcc_cells(mcc, STANDARD):
+        ws.cell(row=row, column=column).value = value
 
-        # Copy and Create MCC excel files
-        mcc_title = "ELECTRICAL LOADS LIST SUBSTATION - {}".format(mcc.name)
-        mcc_output_file = "output/{}.xlsx".format(mcc_title)
-        try:
-            copyfile(mcc_template, mcc_output_file)
-        except IOError as e:
-            print("Unable to copy file. %s" % e)
-            exit(1)
-        except:
-            print("Unexpected error:", exc_info())
-            exit(1)
-
-        wb = load_workbook(filename=mcc_output_file)
-        ws = wb["Template for MCC"]
-
-        # Add Project Title
-        ws["G1"] = STANDARD.project_name
-        ws["G4"] = mcc_title
-
-        # Add Project Details
-        ws["R1"] = STANDARD.project
-        ws["R2"] = STANDARD.revision
-        ws["R3"] = STANDARD.prepared_by
-        ws["R4"] = STANDARD.date_prepared
-        ws["R5"] = STANDARD.approved_by
-        ws["R6"] = STANDARD.date_approved
-
-        # Update Inserted Row style
-        count =  1
-        offset = 9
-        for me in mcc.mel:
-            # Insert empty rows
-            ws.insert_rows(offset)
-            style_cell = "B" + str(offset+count)
-            # Apply style
-            for row in ws.iter_cols(min_row=offset, max_row=offset, min_col=1, max_col=19):
-                for cell in row:
-                    cell.style = copy(ws[style_cell].style)
-                    cell.font = copy(ws[style_cell].font)
-                    cell.border = copy(ws[style_cell].border)
-                    cell.fill = copy(ws[style_cell].fill)
-                    cell.number_format = copy(ws[style_cell].number_format)
-                    cell.protection = copy(ws[style_cell].protection)
-                    cell.alignment = copy(ws[style_cell].alignment)
-
-        # Insert Mechanical Equipment data
-        start_row = offset
-        for i, me in enumerate(mcc.mel):
-            ws.cell(row=start_row+i, column=1).value = me.tag_number
-            ws.cell(row=start_row+i, column=2).value = me.rev
-            ws.cell(row=start_row+i, column=3).value = me.area
-            ws.cell(row=start_row+i, column=4).value = me.type
-            ws.cell(row=start_row+i, column=5).value = me.starter_type
-            ws.cell(row=start_row+i, column=6).value = me.voltage
-            ws.cell(row=start_row+i, column=7).value = me.operation_mode
-            ws.cell(row=start_row+i, column=8).value = me.name
-            ws.cell(row=start_row+i, column=9).value = me.workpack
-            ws.cell(row=start_row+i, column=10).value = me.installed_kw
-            ws.cell(row=start_row+i, column=11).value = me.power_factor
-            ws.cell(row=start_row+i, column=12).value = me.kva
-            ws.cell(row=start_row+i, column=13).value = me.load_factor
-            ws.cell(row=start_row+i, column=14).value = me.diversity_utilisation
-            ws.cell(row=start_row+i, column=15).value = me.avg_load_factor
-            ws.cell(row=start_row+i, column=16).value = me.max_kw
-            ws.cell(row=start_row+i, column=17).value = me.max_kvar
-            ws.cell(row=start_row+i, column=18).value = me.max_kva
-            ws.cell(row=start_row+i, column=19).value = me.avg_load_kw
-
-        # Insert Misc Equiptment data
-        start_row = offset + len(mcc.mel) + 2
-        for i, misc in enumerate([mcc.lighting, mcc.ups, mcc.field_equipment]):
-            ws.cell(row=start_row+i, column=6).value = 240
-            ws.cell(row=start_row+i, column=10).value = misc.installed_kw
-            ws.cell(row=start_row+i, column=11).value = misc.power_factor
-            ws.cell(row=start_row+i, column=12).value = misc.kva
-            ws.cell(row=start_row+i, column=13).value = misc.load_factor
-            ws.cell(row=start_row+i, column=14).value = misc.diversity_utilisation
-            ws.cell(row=start_row+i, column=15).value = misc.avg_load_factor
-            ws.cell(row=start_row+i, column=16).value = misc.max_kw
-            ws.cell(row=start_row+i, column=17).value = misc.max_kvar
-            ws.cell(row=start_row+i, column=18).value = misc.max_kva
-            ws.cell(row=start_row+i, column=19).value = misc.avg_load_kw
-
-        # Insert Totals
-        start_row = offset + len(mcc.mel) + 6
-        ws.cell(row=start_row, column=10).value = mcc.total_installed_kw
-        ws.cell(row=start_row, column=12).value = mcc.total_kva
-        ws.cell(row=start_row, column=16).value = mcc.total_max_kw
-        ws.cell(row=start_row, column=17).value = mcc.total_max_kvar
-        ws.cell(row=start_row, column=18).value = mcc.total_max_kva
-        ws.cell(row=start_row, column=19).value = mcc.total_avg_load_kw
-
-        # Insert Contingency data
-        start_row = offset + len(mcc.mel) + 8
-        ws.cell(row=start_row, column=10).value = str(int(mcc.contingency_factor_percent * 100))+'%'
-        ws.cell(row=start_row+1, column=10).value = mcc.spare_starters
-        ws.cell(row=start_row+2, column=10).value = mcc.contingency_load
-        ws.cell(row=start_row+3, column=10).value = mcc.total_spare_allocation
-        ws.cell(row=start_row+4, column=10).value = mcc.total_mcc_load_allowed
-
-        # Adjust print area
-        ws.print_area = "A1:S{}".format(21+len(mcc.mel))
-        # Rename sheet
-        ws.title = mcc.name
-        # Save file
-        wb.save(filename=mcc_output_file)
-
-
-def els_writer(els, STANDARD):
+    # Adjust print area
+    ws.print_area = "A1:S{}".format(21+len(mcc.mel))
+    # Rename sheet
+    ws.title = mcc.name
+    # Save file
+    wb.save(filename=mcc_output_file)
+
+
+def mcc_cells(mcc, STANDARD):
+    """This method yields the ((row, column), value) cells of a MCC summary.
+
+    Cells are yielded in row order. Rows are numbered as in the finished summary,
+    after the equipment rows have been inserted into the template.
+    """
+
+    from openpyxl.utils.cell import coordinate_to_tuple
+
+    # Add Project Title and Details, in row order
+    yield coordinate_to_tuple("G1"), STANDARD.project_name
+    yield coordinate_to_tuple("R1"), STANDARD.project
+    yield coordinate_to_tuple("R2"), STANDARD.revision
+    yield coordinate_to_tuple("R3"), STANDARD.prepared_by
+    yield coordinate_to_tuple("G4"), MCC_TITLE.format(mcc.name)
+    yield coordinate_to_tuple("R4"), STANDARD.date_prepared
+    yield coordinate_to_tuple("R5"), STANDARD.approved_by
+    yield coordinate_to_tuple("R6"), STANDARD.date_approved
+
+    # Insert Mechanical Equipment data
+    start_row = MCC_OFFSET
+    for i, me in enumerate(mcc.mel):
+        yield (start_row+i, 1), me.tag_number
+        yield (start_row+i, 2), me.rev
+        yield (start_row+i, 3), me.area
+        yield (start_row+i, 4), me.type
+        yield (start_row+i, 5), me.starter_type
+        yield (start_row+i, 6), me.voltage
+        yield (start_row+i, 7), me.operation_mode
+        yield (start_row+i, 8), me.name
+        yield (start_row+i, 9), me.workpack
+        yield (start_row+i, 10), me.installed_kw
+        yield (start_row+i, 11), me.power_factor
+        yield (start_row+i, 12), me.kva
+        yield (start_row+i, 13), me.load_factor
+        yield (start_row+i, 14), me.diversity_utilisation
+        yield (start_row+i, 15), me.avg_load_factor
+        yield (start_row+i, 16), me.max_kw
+        yield (start_row+i, 17), me.max_kvar
+        yield (start_row+i, 18), me.max_kva
+        yield (start_row+i, 19), me.avg_load_kw
+
+    # Insert Misc Equiptment data
+    start_row = MCC_OFFSET + len(mcc.mel) + 2
+    for i, misc in enumerate([mcc.lighting, mcc.ups, mcc.field_equipment]):
+        yield (start_row+i, 6), 240
+        yield (start_row+i, 10), misc.installed_kw
+        yield (start_row+i, 11), misc.power_factor
+        yield (start_row+i, 12), misc.kva
+        yield (start_row+i, 13), misc.load_factor
+        yield (start_row+i, 14), misc.diversity_utilisation
+        yield (start_row+i, 15), misc.avg_load_factor
+        yield (start_row+i, 16), misc.max_kw
+        yield (start_row+i, 17), misc.max_kvar
+        yield (start_row+i, 18), misc.max_kva
+        yield (start_row+i, 19), misc.avg_load_kw
+
+    # Insert Totals
+    start_row = MCC_OFFSET + len(mcc.mel) + 6
+    yield (start_row, 10), mcc.total_installed_kw
+    yield (start_row, 12), mcc.total_kva
+    yield (start_row, 16), mcc.total_max_kw
+    yield (start_row, 17), mcc.total_max_kvar
+    yield (start_row, 18), mcc.total_max_kva
+    yield (start_row, 19), mcc.total_avg_load_kw
+
+    # Insert Contingency data
+    start_row = MCC_OFFSET + len(mcc.mel) + 8
+    yield (start_row, 10), str(int(mcc.contingency_factor_percent * 100))+'%'
+    yield (start_row+1, 10), mcc.spare_starters
+    yield (start_row+2, 10), mcc.contingency_load
+    yield (start_row+3, 10), mcc.total_spare_allocation
+    yield (start_row+4, 10), mcc.total_mcc_load_allowed
+
+
+def els_writer(els, STANDARD, folder=OUTPUT_FOLDER):
     """This method accepts an els object and using the MCC
     template produces a summary for each MCC.
 
-    It does this by first making a copy of the MCC Template file.
+    It does this by first taking an in-memory copy of the cached MCC Template
+    workbook.
 
     Then making a modification of the `Electrical Load Summary Template' sheet and
     appending the appropriate detail.
@@ -154,94 +288,267 @@ def els_writer(els, STANDARD):
     Finally, it removes the template sheet and saves the file.
     """
 
-    from openpyxl import load_workbook
-    from shutil import copyfile
-    from sys import exit, exc_info
-    from copy import copy
-    from openpyxl.worksheet.properties import WorksheetProperties, PageSetupProperties
     from openpyxl.styles import Alignment
 
-    els_template = "src/templates/electrical_load_summary_template.xlsx"
+    # Create workbook from the cached template
+    power_summary_output_file = os.path.join(folder, ELS_OUTPUT_FILE)
 
-    # Copy and Create excel file
-    power_summary_output_file = "output/POWER SUMMARY.xlsx"
-    try:
-        copyfile(els_template, power_summary_output_file)
-    except IOError as e:
-        print("Unable to copy file. %s" % e)
-        exit(1)
-    except:
-        print("Unexpected error:", exc_info())
-        exit(1)
-
-    wb = load_workbook(filename=power_summary_output_file)
+    wb = template_cache.get(ELS_TEMPLATE)
     ws = wb["ELECTRICAL LOAD SUMMARY"]
 
-    # Add Project Title
-    ws["D1"] = STANDARD.project_name
-    ws["D4"] = "MCC LOAD DISTRIBUTION AND TX SIZING"
-
-    # Add Project Details
-    ws["L1"] = STANDARD.project
-    ws["L2"] = STANDARD.revision
-    ws["L3"] = STANDARD.prepared_by
-    ws["L4"] = STANDARD.date_prepared
-    ws["L5"] = STANDARD.approved_by
-    ws["L6"] = STANDARD.date_approved
-
-    # Update Inserted Row style
-    count =  1
-    offset = 10
-    for mcc in els.mccl:
-        # Insert empty rows
-        style_cell = "E17"
-        ws.insert_rows(offset)
-        # Apply style
-        for row in ws.iter_cols(min_row=offset, max_row=offset, min_col=1, max_col=13):
-            for cell in row:
-                cell.style = copy(ws[style_cell].style)
-                cell.font = copy(ws[style_cell].font)
-                cell.border = copy(ws[style_cell].border)
-                cell.fill = copy(ws[style_cell].fill)
-                cell.number_format = copy(ws[style_cell].number_format)
-                cell.protection = copy(ws[style_cell].protection)
-                cell.alignment = Alignment(horizontal='center')
+    # Insert empty rows and update Inserted Row style
+    offset = ELS_OFFSET
+    if els.mccl:
+        ws.insert_rows(offset, len(els.mccl))
+        style_cell = ws.cell(
+            row=ELS_ROW_STYLE[0] + len(els.mccl), column=ELS_ROW_STYLE[1]
+        )
+        insert_row_style(
+            ws, offset, len(els.mccl), 13, style_cell, Alignment(horizontal="center")
+        )
+
+    # Add Project and MCC details
+    for (row, column), value in els_cells(els, STANDARD):
+        ws.cell(row=row, column=column).value = value
+
+    # Adjust print area
+    ws.print_area = "A1:M{}".format(19+len(els.mccl))
+    # Save file
+    wb.save(filename=power_summary_output_file)
+
+
+def els_cells(els, STANDARD):
+    """This method yields the ((row, column), value) cells of the POWER SUMMARY.
+
+    Cells are yielded in row order. Rows are numbered as in the finished summary,
+    after the MCC rows have been inserted into the template.
+    """
+
+    from openpyxl.utils.cell import coordinate_to_tuple
+
+    # Add Project Title and Details, in row order
+    yield coordinate_to_tuple("D1"), STANDARD.project_name
+    yield coordinate_to_tuple("L1"), STANDARD.project
+    yield coordinate_to_tuple("L2"), STANDARD.revision
+    yield coordinate_to_tuple("L3"), STANDARD.prepared_by
+    yield coordinate_to_tuple("D4"), "MCC LOAD DISTRIBUTION AND TX SIZING"
+    yield coordinate_to_tuple("L4"), STANDARD.date_prepared
+    yield coordinate_to_tuple("L5"), STANDARD.approved_by
+    yield coordinate_to_tuple("L6"), STANDARD.date_approved
 
     # Insert MCC data
-    start_row = offset
+    start_row = ELS_OFFSET
     for i, mcc in enumerate(els.mccl):
-        ws.cell(row=start_row+i, column=1).value = mcc.name
-        ws.cell(row=start_row+i, column=2).value = mcc.max_voltage
-        #ws.cell(row=start_row+i, column=3).value = ""
-        ws.cell(row=start_row+i, column=4).value = mcc.total_installed_kw
-        ws.cell(row=start_row+i, column=5).value = mcc.total_kva
-        ws.cell(row=start_row+i, column=6).value = mcc.total_max_kw
-        ws.cell(row=start_row+i, column=7).value = mcc.total_max_kvar
-        ws.cell(row=start_row+i, column=8).value = mcc.total_max_kva
-        ws.cell(row=start_row+i, column=9).value = mcc.total_avg_load_kva
-        ws.cell(row=start_row+i, column=10).value = mcc.contingency_factor
-        ws.cell(row=start_row+i, column=11).value = mcc.total_actual_contingency
-        ws.cell(row=start_row+i, column=12).value = mcc.tx_size
-        ws.cell(row=start_row+i, column=13).value = mcc.spare_tx
+        yield (start_row+i, 1), mcc.name
+        yield (start_row+i, 2), mcc.max_voltage
+        #yield (start_row+i, 3), ""
+        yield (start_row+i, 4), mcc.total_installed_kw
+        yield (start_row+i, 5), mcc.total_kva
+        yield (start_row+i, 6), mcc.total_max_kw
+        yield (start_row+i, 7), mcc.total_max_kvar
+        yield (start_row+i, 8), mcc.total_max_kva
+        yield (start_row+i, 9), mcc.total_avg_load_kva
+        yield (start_row+i, 10), mcc.contingency_factor
+        yield (start_row+i, 11), mcc.total_actual_contingency
+        yield (start_row+i, 12), mcc.tx_size
+        yield (start_row+i, 13), mcc.spare_tx
 
     # Insert Network Losses
-    start_row = offset + len(els.mccl) + 1
-    ws.cell(row=start_row, column=6).value = els.network_loss_kw
-    ws.cell(row=start_row, column=7).value = els.network_loss_kvar
-    ws.cell(row=start_row, column=8).value = els.network_loss_kva
+    start_row = ELS_OFFSET + len(els.mccl) + 1
+    yield (start_row, 6), els.network_loss_kw
+    yield (start_row, 7), els.network_loss_kvar
+    yield (start_row, 8), els.network_loss_kva
 
     # Insert Totals
-    start_row = offset + len(els.mccl) + 2
-    ws.cell(row=start_row, column=4).value = els.connected_load_kw
-    ws.cell(row=start_row, column=5).value = els.connected_load_kva
-    ws.cell(row=start_row, column=6).value = els.max_demand_kw
-    ws.cell(row=start_row, column=7).value = els.max_demand_kvar
-    ws.cell(row=start_row, column=8).value = els.max_demand_kva
-    ws.cell(row=start_row, column=9).value = els.ave_load_kva
-    ws.cell(row=start_row, column=10).value = els.contingency_factor_kva
-    ws.cell(row=start_row, column=11).value = els.total_actual_contingency
+    start_row = ELS_OFFSET + len(els.mccl) + 2
+    yield (start_row, 4), els.connected_load_kw
+    yield (start_row, 5), els.connected_load_kva
+    yield (start_row, 6), els.max_demand_kw
+    yield (start_row, 7), els.max_demand_kvar
+    yield (start_row, 8), els.max_demand_kva
+    yield (start_row, 9), els.ave_load_kva
+    yield (start_row, 10), els.contingency_factor_kva
+    yield (start_row, 11), els.total_actual_contingency
 
-    # Adjust print area
-    ws.print_area = "A1:M{}".format(19+len(els.mccl))
-    # Save file
-    wb.save(filename=power_summary_output_file)
+
+def report_digest(cells, template_digest):
+    """ This method returns a SHA-256 hex digest of a report's cells and template."""
+
+    digest = hashlib.sha256(template_digest.encode())
+    for cell in cells:
+        digest.update(repr(cell).encode())
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def output_manifest(els, STANDARD, folder=OUTPUT_FOLDER):
+    """This method describes every output of an els object.
+
+    Returns a dict of output name to the output file and the digest of its
+    contents, as written into the incremental run manifest.
+    """
+
+    mcc_template = file_digest(MCC_TEMPLATE)
+    els_template = file_digest(ELS_TEMPLATE)
+
+    manifest = {
+        mcc.name: {
+            "file": os.path.join(folder, MCC_OUTPUT_FILE.format(mcc.name)),
+            "digest": report_digest(mcc_cells(mcc, STANDARD), mcc_template),
+        }
+        for mcc in els.mccl
+    }
+    manifest["POWER SUMMARY"] = {
+        "file": os.path.join(folder, ELS_OUTPUT_FILE),
+        "digest": report_digest(els_cells(els, STANDARD), els_template),
+    }
+    return manifest
+
+
+def output_files(els, folder=OUTPUT_FOLDER):
+    """ This method returns the workbook files written for an els object."""
+
+    return [
+        os.path.join(folder, MCC_OUTPUT_FILE.format(mcc.name)) for mcc in els.mccl
+    ] + [os.path.join(folder, ELS_OUTPUT_FILE)]
+
+
+def read_manifest(folder=OUTPUT_FOLDER):
+    """ This method returns the last incremental run manifest, or {} if there is none."""
+
+    import json
+
+    try:
+        with open(os.path.join(folder, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_manifest(manifest, folder=OUTPUT_FOLDER):
+    """ This method records the incremental run manifest alongside the outputs."""
+
+    import json
+
+    with open(os.path.join(folder, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def write_outputs(
+    els,
+    STANDARD,
+    jobs=1,
+    engine="template",
+    incremental=False,
+    folder=OUTPUT_FOLDER,
+    profiler=NULL_PROFILER,
+):
+    """This method writes every MCC workbook and the POWER SUMMARY workbook.
+
+    The template engine edits a copy of each template with openpyxl, while the
+    stream engine writes the same reports in a single forward pass for MELs too
+    large for openpyxl's in-memory worksheets.
+
+    With more than one job the MCC workbooks are written in a process pool while
+    the POWER SUMMARY is written alongside them.
+
+    When incremental is set, a workbook is only rewritten when the digest of its
+    contents differs from the manifest of the previous incremental run, and the
+    workbooks of MCCs no longer in the MEL are removed.
+
+    Workbooks are written into folder. The writes of every MCC are measured by
+    profiler.
+
+    Failures are collected rather than stopping the run. Returns a dict of output
+    name to error for every workbook that could not be written.
+    """
+
+    if engine == "stream":
+        from stream import stream_els as write_els, stream_mcc as write_one_mcc
+    else:
+        write_els, write_one_mcc = els_writer, write_mcc
+
+    if incremental:
+        with profiler.stage("output_manifest", len(els.mccl)):
+            manifest = output_manifest(els, STANDARD, folder)
+
+            os.makedirs(folder, exist_ok=True)
+            previous = read_manifest(folder)
+
+            # Remove the outputs of MCCs that are no longer in the MEL
+            for name, output in previous.items():
+                path = output.get("file", "")
+                if (
+                    name not in manifest
+                    and os.path.dirname(os.path.abspath(path)) == os.path.abspath(folder)
+                    and is_output_file(os.path.basename(path))
+                    and os.path.exists(path)
+                ):
+                    os.remove(path)
+
+            changed = {
+                name
+                for name, output in manifest.items()
+                if previous.get(name) != output or not os.path.exists(output["file"])
+            }
+    else:
+        changed = {mcc.name for mcc in els.mccl} | {"POWER SUMMARY"}
+
+    mccl = [mcc for mcc in els.mccl if mcc.name in changed]
+    write_summary = "POWER SUMMARY" in changed
+
+    errors = {}
+
+    if jobs > 1 and mccl:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with profiler.stage("mcc_writer", len(mccl)), ProcessPoolExecutor(
+            max_workers=jobs
+        ) as executor:
+            futures = {
+                mcc.name: executor.submit(
+                    timed_call, write_one_mcc, mcc, STANDARD, folder
+                )
+                for mcc in mccl
+            }
+
+            if write_summary:
+                with profiler.stage("els_writer", len(els.mccl)):
+                    try:
+                        write_els(els, STANDARD, folder)
+                    except Exception as error:
+                        errors["POWER SUMMARY"] = error
+
+            for mcc in mccl:
+                try:
+                    wall, cpu = futures[mcc.name].result()
+                except Exception as error:
+                    errors[mcc.name] = error
+                else:
+                    profiler.record(
+                        "mcc_writer/{}".format(mcc.name), wall, cpu, len(mcc.mel)
+                    )
+    else:
+        with profiler.stage("mcc_writer", len(mccl)):
+            for mcc in mccl:
+                with profiler.stage("mcc_writer/{}".format(mcc.name), len(mcc.mel)):
+                    try:
+                        write_one_mcc(mcc, STANDARD, folder)
+                    except Exception as error:
+                        errors[mcc.name] = error
+
+        if write_summary:
+            with profiler.stage("els_writer", len(els.mccl)):
+                try:
+                    write_els(els, STANDARD, folder)
+                except Exception as error:
+                    errors["POWER SUMMARY"] = error
+
+    if incremental:
+        # Failed outputs are left out so the next run writes them again
+        write_manifest(
+            {name: output for name, output in manifest.items() if name not in errors},
+            folder,
+        )
+
+    return errors
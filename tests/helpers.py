@@ -0,0 +1,38 @@
+"""MEL rows and files shared by the reader and batch tests."""
+import csv
+
+import pytest
+
+from eload import iter_client_mel_rows
+from readers import MEL_COLUMNS
+
+MEL_FILE = "tests/fixtures/mel.xlsx"
+
+
+def mel_rows():
+    """ This function returns the fixture rows followed by a standby copy of the first."""
+
+    rows = list(iter_client_mel_rows(MEL_FILE))
+    return rows + [rows[0][:2] + ("901",) + rows[0][3:9] + (2,) + rows[0][10:]]
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(MEL_COLUMNS)
+        writer.writerows(rows)
+        writer.writerow([])
+
+
+def write_parquet(path, rows):
+    pa = pytest.importorskip("pyarrow")
+    from pyarrow import parquet
+
+    columns = [
+        [None if value is None else str(value) for value in column]
+        for column in zip(*rows)
+    ]
+    for i in (6, 8):
+        columns[i] = [float(value) for value in columns[i]]
+
+    parquet.write_table(pa.table(dict(zip(MEL_COLUMNS, columns))), path)
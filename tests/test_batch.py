@@ -0,0 +1,125 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from batch import me_batch_builder, mel_batch_builder, read_mel_batch, round_array
+from data import CONTINGENCY_TABLE, LOAD_FACTOR, MOTOR_POWER_FACTOR
+from eload import me_builder
+from tests.helpers import mel_rows, write_csv, write_parquet
+
+FIELDS = [
+    "installed_kw",
+    "efficiency",
+    "power_factor",
+    "kva",
+    "load_factor",
+    "diversity_utilisation",
+    "avg_load_factor",
+    "max_kw",
+    "max_kvar",
+    "max_kva",
+    "avg_load_kw",
+    "avg_load_kva",
+    "contingency_factor",
+    "spare_capacity",
+]
+
+
+def assert_matches_me_builder(rows):
+    batch = mel_batch_builder(rows)
+
+    assert len(batch) == len(rows)
+    for i, row in enumerate(rows):
+        me = me_builder(row)
+        for name in FIELDS:
+            assert getattr(batch, name)[i] == getattr(me, name), (row, name)
+
+
+def test_me_batch_builder():
+    rows = []
+    rows.append((121, 'CN', '001', 'PRIMARY CRUSHER JIB CRANE ', 2, 'MCC-001', 20, 'DOL', 415, 'DUTY', 'A', 5))
+    rows.append((121, 'CP', '001', 'PRIMARY CRUSHING AIR COMPRESSOR ', 2, 'MCC-001', 7.5, 'FEEDER', 415, 'DUTY', 'A', 5))
+    rows.append((121, 'CR', '001', 'PRIMARY CRUSHER ', 2, 'MCC-001', 10, 'VSD', 415, 'DUTY', 'A', 5))
+    rows.append((121, 'CV', '005', 'PRIMARY FEEDER DRIBBLE CONVEYOR ', 2, 'MCC-001', 2.2, 'DOL', 415, 'DUTY', 'A', 5))
+    rows.append((121, 'DR', '001', 'PRIMARY CRUSHING AIR COMPRESSED AIR DRYER ', 2, 'MCC-001', 0.1, 'DOL', 415, 'DUTY', 'A', 5))
+    rows.append((121, 'PP', '002', 'STANDBY PUMP ', 2, 'MCC-001', 15, 'VSD Dual', 415, 2, 'A', 3))
+
+    assert_matches_me_builder(rows)
+
+
+def test_me_batch_builder_random_rows():
+    rng = random.Random(0)
+    types = [row[0] for row in LOAD_FACTOR if row[2] is not None]
+    ratings = [row[0] for row in CONTINGENCY_TABLE]
+    starters = ["DOL", "VSD", "VSD Dual", "FEEDER", "SOFT STARTER"]
+
+    rows = []
+    for i in range(2000):
+        installed_kw = round(rng.choice(MOTOR_POWER_FACTOR)[0] * rng.uniform(0.5, 3), rng.randint(0, 2))
+        rows.append(
+            (
+                121,
+                rng.choice(types),
+                str(i),
+                "EQUIPMENT",
+                2,
+                "MCC-001",
+                installed_kw,
+                rng.choice(starters),
+                415,
+                rng.choice(["DUTY", 2]),
+                "A",
+                rng.choice(ratings),
+            )
+        )
+
+    assert_matches_me_builder(rows)
+
+
+def test_me_batch_builder_columns():
+    batch = me_batch_builder([20, 7.5], ["CN", "CP"], ["DOL", "FEEDER"], ["DUTY", "DUTY"], [5, 5])
+
+    assert batch.kva.tolist() == [25.6, 9.6]
+    assert batch.spare_capacity.tolist() == [0.26, 1.64]
+
+
+def test_round_array():
+    values = np.array([0.25, 0.35, 2.675, 1.005, 0.125, -0.15, 12.3449999])
+
+    for decimals in (0, 1, 2):
+        assert round_array(values, decimals).tolist() == [
+            round(value, decimals) for value in values.tolist()
+        ]
+
+
+def test_me_batch_builder_fixture():
+    from openpyxl import load_workbook
+
+    ws = load_workbook(filename="tests/fixtures/mel.xlsx", data_only=True).active
+    rows = list(ws.iter_rows(min_row=8, max_col=12, max_row=ws.max_row, values_only=True))
+
+    assert_matches_me_builder(rows)
+
+
+def test_read_mel_batch(tmp_path):
+    rows = mel_rows()
+    expected = mel_batch_builder(rows)
+
+    csv_file = str(tmp_path / "mel.csv")
+    write_csv(csv_file, rows)
+    batch = read_mel_batch(csv_file)
+    np.testing.assert_array_equal(batch.spare_capacity, expected.spare_capacity)
+    np.testing.assert_array_equal(batch.max_kw, expected.max_kw)
+
+
+def test_read_parquet_mel_batch(tmp_path):
+    rows = mel_rows()
+    expected = mel_batch_builder(rows)
+
+    parquet_file = str(tmp_path / "mel.parquet")
+    write_parquet(parquet_file, rows)
+    batch = read_mel_batch(parquet_file)
+    np.testing.assert_array_equal(batch.spare_capacity, expected.spare_capacity)
+    np.testing.assert_array_equal(batch.max_kw, expected.max_kw)
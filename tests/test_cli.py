@@ -1,3 +1,4 @@
+import pytest
 from click.testing import CliRunner
 
 from cli import main
@@ -15,3 +16,151 @@ def test_available_input_arguments():
         main, ["tests/fixtures/standards.xlsx", "tests/fixtures/mel.xlsx"]
     )
     assert result.exit_code == 0
+
+
+def test_parallel_jobs():
+    import os
+
+    runner = CliRunner()
+    result = runner.invoke(
+        main, ["tests/fixtures/standards.xlsx", "tests/fixtures/mel.xlsx", "--jobs", "2"]
+    )
+    assert result.exit_code == 0
+    assert sorted(os.listdir("output")) == [
+        "ELECTRICAL LOADS LIST SUBSTATION - MCC-001.xlsx",
+        "ELECTRICAL LOADS LIST SUBSTATION - MCC-002.xlsx",
+        "ELECTRICAL LOADS LIST SUBSTATION - MCC-003.xlsx",
+        "POWER SUMMARY.xlsx",
+    ]
+
+
+def test_run_cache(tmp_path):
+    import os
+
+    from cli import cache_cli
+
+    runner = CliRunner(env={"ELOADER_CACHE_DIR": str(tmp_path)})
+    args = ["tests/fixtures/standards.xlsx", "tests/fixtures/mel.xlsx", "--cache"]
+
+    result = runner.invoke(main, args)
+    assert result.exit_code == 0
+    (entry,) = os.listdir(tmp_path)
+    assert len(os.listdir(tmp_path / entry)) == 5
+
+    # A hit materialises the cached workbooks
+    os.remove("output/POWER SUMMARY.xlsx")
+    result = runner.invoke(main, args)
+    assert result.exit_code == 0
+    assert len(os.listdir("output")) == 4
+
+    # An entry missing a workbook is a miss, and the run is written again
+    os.remove(tmp_path / entry / "POWER SUMMARY.xlsx")
+    result = runner.invoke(main, args)
+    assert result.exit_code == 0
+    assert "POWER SUMMARY.xlsx" in os.listdir("output")
+    assert len(os.listdir(tmp_path / entry)) == 5
+
+    result = runner.invoke(cache_cli, ["info"])
+    assert result.exit_code == 0
+    assert "1 entries" in result.output
+
+    result = runner.invoke(cache_cli, ["purge"])
+    assert result.exit_code == 0
+    assert os.listdir(tmp_path) == []
+
+
+def test_batch(tmp_path):
+    import os
+
+    from cli import batch_cli
+
+    manifest = tmp_path / "projects.csv"
+    manifest.write_text(
+        "name,standards,mel\nalpha,{0}/standards.xlsx,{0}/mel.xlsx\n".format(
+            os.path.abspath("tests/fixtures")
+        )
+    )
+
+    runner = CliRunner()
+    result = runner.invoke(batch_cli, [str(manifest), "--output", str(tmp_path / "out")])
+    assert result.exit_code == 0
+    assert "1 of 1 projects succeeded" in result.output
+    assert len(os.listdir(tmp_path / "out" / "alpha")) == 4
+
+
+def test_watch_rejects_ignored_options():
+    runner = CliRunner()
+    for options in (["--incremental"], ["--cache", "--profile"], ["--load-profile", "1"]):
+        result = runner.invoke(
+            main,
+            ["tests/fixtures/standards.xlsx", "tests/fixtures/mel.xlsx", "--watch"]
+            + options,
+        )
+        assert result.exit_code == 2
+        assert "--watch cannot be combined with" in result.output
+        for option in options:
+            if option.startswith("--"):
+                assert option in result.output
+
+
+def test_duty_cycles_need_load_profile(tmp_path):
+    duty_cycles = tmp_path / "duty_cycles.json"
+    duty_cycles.write_text("{}")
+
+    runner = CliRunner()
+    result = runner.invoke(
+        main,
+        [
+            "tests/fixtures/standards.xlsx",
+            "tests/fixtures/mel.xlsx",
+            "--duty-cycles",
+            str(duty_cycles),
+        ],
+    )
+    assert result.exit_code == 2
+    assert "--duty-cycles needs --load-profile" in result.output
+
+
+def test_mel_errors(tmp_path):
+    import json
+
+    from eload import iter_client_mel_rows
+
+    runner = CliRunner()
+    result = runner.invoke(
+        main,
+        ["tests/fixtures/standards.xlsx", "tests/fixtures/mel.xlsx", "--sheet", "West"],
+    )
+    assert result.exit_code == 1
+    assert "mel.xlsx has no sheet named West" in result.output
+
+    rows = list(iter_client_mel_rows("tests/fixtures/mel.xlsx"))
+    mel = str(tmp_path / "mel.jsonl")
+    with open(mel, "w") as f:
+        for row in rows + rows[:1]:
+            f.write(json.dumps(list(row)) + "\n")
+
+    result = runner.invoke(main, ["tests/fixtures/standards.xlsx", mel])
+    assert result.exit_code == 1
+    assert "Duplicate tag numbers: " in result.output
+    assert result.output.count("in {} and {}".format(mel, mel)) == 1
+
+
+def test_simulate_report():
+    pytest.importorskip("numpy")
+
+    from cli import simulate_cli
+    from simulation import report_columns
+
+    runner = CliRunner()
+    result = runner.invoke(
+        simulate_cli,
+        ["tests/fixtures/standards.xlsx", "tests/fixtures/mel.xlsx", "--trials", "50"],
+    )
+    assert result.exit_code == 0
+
+    header, *rows = result.output.splitlines()
+    assert header.split() == report_columns()
+    assert len(rows) == 4
+    assert all(len(row) == len(header) for row in rows)
+    assert [row.split()[0] for row in rows] == ["MCC-001", "MCC-002", "MCC-003", "ELS"]
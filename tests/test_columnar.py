@@ -0,0 +1,87 @@
+import pickle
+
+from columnar import ColumnarMEL, mcc_partitions
+from eload import (ClientMechanicalEquipmentList, client_mel_builder,
+                   els_builder, me_builder, read_client_mel, read_standards)
+
+ROWS = [
+    (121, 'CN', '001', 'PRIMARY CRUSHER JIB CRANE ', 2, 'MCC-001', 20, 'DOL', 415, 'DUTY', 'A', 5),
+    (121, 'CP', '001', 'PRIMARY CRUSHING AIR COMPRESSOR ', 2, 'MCC-002', 7.5, 'FEEDER', 415, 'DUTY', 'A', 5),
+    (121, 'CR', '001', 'PRIMARY CRUSHER ', 2, 'MCC-001', 10, 'VSD', 415, 'DUTY', 'A', 5),
+]
+
+FIELDS = [
+    "area", "type", "number", "name", "workpack", "mcc_number", "installed_kw",
+    "starter_type", "voltage", "operation_mode", "rev", "procurement_rating",
+    "tag_number", "contingency_factor", "power_factor", "efficiency", "kva",
+    "load_factor", "diversity_utilisation", "avg_load_factor", "max_kw",
+    "max_kvar", "max_kva", "avg_load_kw", "avg_load_kva", "spare_capacity",
+]
+
+
+def test_columnar_row_views():
+    mel = [me_builder(row) for row in ROWS]
+    columns = ColumnarMEL.from_mel(mel)
+
+    assert len(columns) == 3
+    assert columns.categories["mcc_number"] == ["MCC-001", "MCC-002"]
+    assert list(columns.codes["mcc_number"]) == [0, 1, 0]
+    for me, view in zip(mel, columns):
+        for name in FIELDS:
+            assert getattr(view, name) == getattr(me, name)
+    assert columns[-1].tag_number == "121CR001"
+    assert columns.column("tag_number") == [me.tag_number for me in mel]
+
+
+def test_columnar_select():
+    columns = ColumnarMEL.from_mel(me_builder(row) for row in ROWS)
+    subset = columns.select([0, 2])
+
+    assert len(subset) == 2
+    assert subset.column("tag_number") == ["121CN001", "121CR001"]
+    assert list(subset.column("kva")) == [25.6, 12.1]
+
+    copied = pickle.loads(pickle.dumps(subset))
+    assert copied[1].tag_number == "121CR001"
+
+
+def test_columnar_client_mel_builder():
+    CMEL = client_mel_builder(ROWS, columnar=True)
+
+    assert isinstance(CMEL, ClientMechanicalEquipmentList)
+    assert isinstance(CMEL.mel, ColumnarMEL)
+    assert CMEL.mcc_numbers == ["MCC-001", "MCC-002"]
+
+
+def test_columnar_els_builder():
+    STANDARD = read_standards("tests/fixtures/standards.xlsx")
+
+    els = els_builder(STANDARD, read_client_mel("tests/fixtures/mel.xlsx"))
+    columnar_els = els_builder(
+        STANDARD, read_client_mel("tests/fixtures/mel.xlsx", columnar=True)
+    )
+
+    for mcc, columnar_mcc in zip(els.mccl, columnar_els.mccl):
+        for name in vars(mcc):
+            if name != "mel":
+                assert getattr(columnar_mcc, name) == getattr(mcc, name)
+    for name in vars(els):
+        if name != "mccl":
+            assert getattr(columnar_els, name) == getattr(els, name)
+
+
+def test_mcc_partitions():
+    mel = [me_builder(row) for row in ROWS]
+
+    partitions = mcc_partitions(mel)
+    assert list(partitions) == ["MCC-001", "MCC-002"]
+    assert [me.tag_number for me in partitions["MCC-001"]] == ["121CN001", "121CR001"]
+
+    partitions = mcc_partitions(ColumnarMEL.from_mel(mel))
+    assert list(partitions) == ["MCC-001", "MCC-002"]
+    assert partitions["MCC-001"].column("tag_number") == ["121CN001", "121CR001"]
+    assert partitions["MCC-002"].column("tag_number") == ["121CP001"]
+
+    CMEL = client_mel_builder(ROWS)
+    assert CMEL.mcc_numbers == ["MCC-001", "MCC-002"]
+    assert CMEL.partitions["MCC-002"][0].tag_number == "121CP001"
@@ -1,7 +1,10 @@
+import pytest
+
 from eload import (ElectricalLoadSummary, FieldEquipment, LightingEquipment,
                    MechanicalEquipment, MotorControlCenter, UPSEquipment,
-                   client_mel_builder, eload, mcc_builder, me_builder,
-                   read_client_mel, read_standards, els_builder)
+                   client_mel_builder, eload, equipment_cache_info,
+                   equipment_quantities, iter_client_mel_rows, mcc_builder,
+                   me_builder, read_client_mel, read_standards, els_builder)
 from utility import round_up
 
 
@@ -129,6 +132,107 @@ def test_mcc():
     assert mcc.spare_tx == 85
 
 
+def test_mcc_equipment_updates():
+    STANDARD = read_standards("tests/fixtures/standards.xlsx")
+    rows = list(iter_client_mel_rows("tests/fixtures/mel.xlsx"))
+    mel = [me_builder(row) for row in rows if row[5] == "MCC-001"]
+
+    def build(mel):
+        return mcc_builder(
+            "MCC-001", STANDARD.lighting_load, STANDARD.ups_load, STANDARD.fe_dist_load, mel
+        )
+
+    mcc = build(mel[:-1])
+    mcc.add_equipment(mel[-1])
+    assert mcc == build(mel)
+
+    larger = me_builder(rows[0][:6] + (75,) + rows[0][7:])
+    mcc.update_equipment(mel[0], larger)
+    assert mcc == build([larger] + mel[1:])
+    assert mcc.spare_tx < build(mel).spare_tx
+
+    mcc.remove_equipment(mel[3])
+    assert mcc == build([larger] + mel[1:3] + mel[4:])
+
+    mcc.add_equipment(mel[3])
+    mcc.update_equipment(larger, mel[0])
+    expected = build(mel[:3] + mel[4:] + mel[3:4])
+    assert mcc == expected
+
+    els = ElectricalLoadSummary([build(mel[:2])])
+    els.mccl[0].add_equipment(mel[2])
+    els.update_totals()
+    assert els == ElectricalLoadSummary([build(mel[:3])])
+
+    # MCCs edit their own equipment lists, not the MEL partitions
+    for columnar in (False, True):
+        MEL = client_mel_builder(rows, columnar=columnar)
+        tags = [me.tag_number for me in MEL.partitions["MCC-001"]]
+        mcc = els_builder(STANDARD, MEL).mccl[0]
+        mcc.add_equipment(larger)
+        if not columnar:
+            mcc.remove_equipment(mel[0])
+        assert [me.tag_number for me in MEL.partitions["MCC-001"]] == tags
+
+
+def test_mcc_equipment_update_errors():
+    STANDARD = read_standards("tests/fixtures/standards.xlsx")
+    rows = list(iter_client_mel_rows("tests/fixtures/mel.xlsx"))
+    mel = [me_builder(row) for row in rows if row[5] == "MCC-001"]
+
+    def build(mel):
+        return mcc_builder(
+            "MCC-001", STANDARD.lighting_load, STANDARD.ups_load, STANDARD.fe_dist_load, mel
+        )
+
+    mcc = build(mel[:1])
+    with pytest.raises(ValueError, match="last equipment"):
+        mcc.remove_equipment(mel[0])
+    with pytest.raises(ValueError, match="not in MCC-001"):
+        mcc.update_equipment(mel[1], mel[2])
+    assert mcc == build(mel[:1])
+
+    # A change the totals cannot be computed for is undone
+    huge = me_builder(rows[0][:6] + (20000,) + rows[0][7:])
+    for change in (
+        lambda mcc: mcc.add_equipment(huge),
+        lambda mcc: mcc.update_equipment(mel[1], huge),
+    ):
+        mcc = build(mel)
+        with pytest.raises(ValueError):
+            change(mcc)
+        assert mcc == build(mel)
+        assert mcc.mel == mel and mcc.totals == build(mel).totals
+
+    columnar = mcc_builder(
+        "MCC-001",
+        STANDARD.lighting_load,
+        STANDARD.ups_load,
+        STANDARD.fe_dist_load,
+        client_mel_builder(rows, columnar=True).partitions["MCC-001"],
+    )
+    with pytest.raises(TypeError):
+        columnar.remove_equipment(mel[0])
+    with pytest.raises(ValueError):
+        columnar.add_equipment(huge)
+    assert len(columnar.mel) == len(mel)
+    assert columnar.total_max_kva == build(mel).total_max_kva
+
+
+def test_equipment_cache():
+    row = (121, 'PP', '001', 'PUMP', 2, 'MCC-001', 7.5, 'DOL', 415, 'DUTY', 'A', 3)
+    equipment_quantities.cache_clear()
+
+    first = me_builder(row)
+    second = me_builder(row[:2] + ('002',) + row[3:])
+    standby = me_builder(row[:2] + ('003',) + row[3:9] + (2,) + row[10:])
+
+    info = equipment_cache_info()
+    assert (info.hits, info.misses) == (1, 2)
+    assert vars(second) == dict(vars(first), number='002', tag_number='121PP002')
+    assert standby.max_kw == 0 and first.max_kw > 0
+
+
 def test_els_builder():
 
     standards_file= "tests/fixtures/standards.xlsx"
@@ -153,3 +257,15 @@ def test_els_builder():
     assert els.network_loss_kw == 8
     assert els.network_loss_kvar == 6
     assert els.network_loss_kva == 10
+
+
+def test_read_client_mel_streaming():
+    from openpyxl import load_workbook
+
+    mel_file = "tests/fixtures/mel.xlsx"
+
+    ws = load_workbook(filename=mel_file, data_only=True).active
+    rows = list(ws.iter_rows(min_row=8, max_col=12, max_row=ws.max_row, values_only=True))
+
+    assert list(iter_client_mel_rows(mel_file)) == rows
+    assert read_client_mel(mel_file).mel == read_client_mel(mel_file, streaming=False).mel
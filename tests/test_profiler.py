@@ -0,0 +1,54 @@
+from eload import eload
+from profiler import NULL_PROFILER, Profiler
+
+
+def test_eload_stages(tmp_path):
+    profiler = Profiler(str(tmp_path))
+    assert eload(
+        "tests/fixtures/standards.xlsx", "tests/fixtures/mel.xlsx", profiler=profiler
+    ) == {}
+
+    stages = {timing["name"]: timing for timing in profiler.report()}
+    assert list(stages) == [
+        "read_standards",
+        "read_client_mel",
+        "els_builder",
+        "clear_output",
+        "mcc_writer",
+        "mcc_writer/MCC-001",
+        "mcc_writer/MCC-002",
+        "mcc_writer/MCC-003",
+        "els_writer",
+    ]
+    assert stages["read_client_mel"]["rows"] == 19
+    assert stages["mcc_writer/MCC-003"]["rows"] == 10
+    assert stages["mcc_writer"]["wall"] >= stages["mcc_writer/MCC-001"]["wall"] > 0
+
+    # Only the outermost stages are profiled
+    assert (tmp_path / "mcc_writer.pstats").exists()
+    assert not (tmp_path / "mcc_writer-MCC-001.pstats").exists()
+
+
+def test_null_profiler():
+    with NULL_PROFILER.stage("stage") as stage:
+        stage.rows = 1
+    NULL_PROFILER.record("stage", 1.0, 1.0)
+    assert NULL_PROFILER.report() == []
+
+
+def test_stage_peak_growth():
+    from profiler import peak_rss
+
+    profiler = Profiler()
+    size = max(64 * 2 ** 20, peak_rss())
+    with profiler.stage("large"):
+        data = b"x" * size
+        del data
+    with profiler.stage("small"):
+        data = b"x" * 1024
+
+    large, small = profiler.stages
+    assert large.peak_rss_growth >= size // 2
+    assert small.peak_rss_growth < size // 2
+    assert small.peak_rss >= large.peak_rss
+    assert "PEAK GROWTH MB" in profiler.format()
@@ -0,0 +1,75 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from eload import els_builder, eload, read_client_mel, read_standards
+from profiles import (
+    LOAD_PROFILE_OUTPUT_FILE,
+    DutyCycle,
+    default_duty_cycle,
+    load_profile,
+)
+
+ELS = els_builder(
+    read_standards("tests/fixtures/standards.xlsx"),
+    read_client_mel("tests/fixtures/mel.xlsx"),
+)
+
+
+def misc_kw(mcc):
+    return sum(misc.max_kw for misc in (mcc.lighting, mcc.ups, mcc.field_equipment))
+
+
+def test_load_profile_average():
+    profile = load_profile(ELS, steps_per_hour=4)
+
+    assert profile.kw.shape == (8760 * 4, len(ELS.mccl))
+    for j, mcc in enumerate(ELS.mccl):
+        average = sum(
+            me.max_kw * default_duty_cycle(me.type).duty
+            for me in mcc.mel
+            if me.operation_mode != 2
+        )
+        assert profile.kw[:, j].mean() - misc_kw(mcc) == pytest.approx(average)
+        assert profile.kw[:, j].max() <= mcc.total_max_kw + 1e-9
+
+    site = list(profile.peak_rows())[-1]
+    assert site[0] == "SITE"
+    assert site[2] == round(profile.site_kw.max(), 1)
+
+
+def test_coincident_duty_cycles():
+    types = {me.type for mcc in ELS.mccl for me in mcc.mel}
+    together = {key: DutyCycle(24, 0.5, start=6) for key in types}
+    profile = load_profile(ELS, duty_cycles=together, hours=48)
+
+    for j, mcc in enumerate(ELS.mccl):
+        np.testing.assert_allclose(profile.kw[6:18, j], mcc.total_max_kw)
+        np.testing.assert_allclose(profile.kw[:6, j], misc_kw(mcc))
+        np.testing.assert_allclose(profile.kw[24:], profile.kw[:24])
+
+    # Periods that are not a whole number of steps are computed over all steps
+    uneven = load_profile(ELS, 1, {key: DutyCycle(7.5, 0.4) for key in types}, 1000)
+    stepped = load_profile(ELS, 2, {key: DutyCycle(7.5, 0.4) for key in types}, 1000)
+    np.testing.assert_allclose(
+        uneven.kw, stepped.kw.reshape(1000, 2, -1).mean(axis=1), atol=1e-9
+    )
+
+
+def test_eload_load_profile(tmp_path):
+    from openpyxl import load_workbook
+
+    folder = str(tmp_path)
+    assert eload(
+        "tests/fixtures/standards.xlsx",
+        "tests/fixtures/mel.xlsx",
+        output_folder=folder,
+        load_profile=1,
+    ) == {}
+
+    wb = load_workbook(str(tmp_path / LOAD_PROFILE_OUTPUT_FILE), read_only=True)
+    assert wb.sheetnames == ["PEAK DEMAND", "PROFILE"]
+    assert [row[0] for row in wb["PEAK DEMAND"].values][1:] == [
+        mcc.name for mcc in ELS.mccl
+    ] + ["SITE"]
+    assert sum(1 for row in wb["PROFILE"].values) == 8761
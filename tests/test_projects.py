@@ -0,0 +1,61 @@
+import os
+
+from projects import read_projects, run_projects
+
+
+def write_manifest(tmp_path):
+    fixtures = os.path.abspath("tests/fixtures")
+    manifest = tmp_path / "projects.csv"
+    manifest.write_text(
+        "name,standards,mel,output\n"
+        "alpha,{0}/standards.xlsx,{0}/mel.xlsx,\n"
+        "beta,{0}/standards.xlsx,{0}/mel.xlsx,beta-output\n"
+        "broken,{0}/standards.xlsx,missing.xlsx,\n".format(fixtures)
+    )
+    return str(manifest)
+
+
+def test_run_projects(tmp_path):
+    projects = read_projects(write_manifest(tmp_path), str(tmp_path / "out"))
+    assert [project.output_folder for project in projects] == [
+        str(tmp_path / "out" / "alpha"),
+        str(tmp_path / "beta-output"),
+        str(tmp_path / "out" / "broken"),
+    ]
+
+    for jobs in (1, 2):
+        reported = []
+        results = run_projects(projects, jobs, report=reported.append)
+
+        assert sorted(result.name for result in reported) == ["alpha", "beta", "broken"]
+        assert [result.ok for result in results] == [True, True, False]
+        assert "FileNotFoundError" in results[2].errors["broken"]
+        for project in projects[:2]:
+            assert len(os.listdir(project.output_folder)) == 4
+
+
+def test_output_folder_keeps_inputs(tmp_path):
+    from shutil import copyfile
+
+    for name in ("standards.xlsx", "mel.xlsx"):
+        copyfile(os.path.join("tests/fixtures", name), str(tmp_path / name))
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "notes.txt").write_text("notes")
+    (tmp_path / "POWER SUMMARY.xlsx").write_text("stale")
+    manifest = tmp_path / "projects.csv"
+    manifest.write_text("name,standards,mel,output\nhere,standards.xlsx,mel.xlsx,.\n")
+
+    (result,) = run_projects(read_projects(str(manifest)))
+
+    assert result.ok
+    assert sorted(os.listdir(str(tmp_path))) == [
+        "ELECTRICAL LOADS LIST SUBSTATION - MCC-001.xlsx",
+        "ELECTRICAL LOADS LIST SUBSTATION - MCC-002.xlsx",
+        "ELECTRICAL LOADS LIST SUBSTATION - MCC-003.xlsx",
+        "POWER SUMMARY.xlsx",
+        "mel.xlsx",
+        "projects.csv",
+        "standards.xlsx",
+        "sub",
+    ]
+    assert (tmp_path / "sub" / "notes.txt").read_text() == "notes"
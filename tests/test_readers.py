@@ -0,0 +1,115 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from eload import (
+    client_mel_builder,
+    iter_client_mel_rows,
+    read_client_mel,
+    read_client_mels,
+)
+from readers import MEL_COLUMNS, MELError, iter_xlsx_rows, iter_xlsx_xml_rows, mel_reader
+from tests.helpers import MEL_FILE, mel_rows, write_csv, write_parquet
+
+
+def test_csv_and_jsonl_readers(tmp_path):
+    rows = mel_rows()
+    expected = client_mel_builder(rows)
+    assert expected.mel[-1].max_kw == 0
+
+    csv_file = str(tmp_path / "mel.csv")
+    write_csv(csv_file, rows)
+
+    jsonl_file = str(tmp_path / "mel.jsonl")
+    with open(jsonl_file, "w") as f:
+        for i, row in enumerate(rows):
+            values = dict(zip(MEL_COLUMNS, row)) if i % 2 else list(row)
+            f.write(json.dumps(values) + "\n")
+
+    assert list(iter_client_mel_rows(jsonl_file)) == rows
+    assert list(iter_client_mel_rows(csv_file))[-1][6:10] == rows[-1][6:10]
+    assert read_client_mel(csv_file) == expected
+    assert read_client_mel(jsonl_file) == expected
+    assert read_client_mel(csv_file, row_cache=True) == expected
+
+
+def test_parquet_reader(tmp_path):
+    rows = mel_rows()
+    parquet_file = str(tmp_path / "mel.parquet")
+    write_parquet(parquet_file, rows)
+
+    assert read_client_mel(parquet_file) == client_mel_builder(rows)
+
+
+def test_xml_engine_matches_openpyxl(tmp_path):
+    from openpyxl import Workbook
+    from openpyxl.utils.datetime import CALENDAR_MAC_1904
+
+    assert list(iter_xlsx_xml_rows(MEL_FILE)) == list(iter_xlsx_rows(MEL_FILE))
+    assert read_client_mel(MEL_FILE, engine="xml") == read_client_mel(MEL_FILE)
+
+    wb = Workbook()
+    wb.epoch = CALENDAR_MAC_1904
+    ws = wb.create_sheet("MEL")
+    wb.active = ws
+    ws["A1"] = "Title"
+    ws.append([])
+    ws["A8"] = 121
+    ws["C8"] = "001"
+    ws["G8"] = 7.5
+    ws["L8"] = 5
+    ws["M8"] = "beyond the MEL columns"
+    ws["B10"] = True
+    ws["D10"] = datetime(2020, 1, 2, 3, 4)
+    ws["E10"] = 1e-20
+    ws["F10"] = "=A8*2"
+    ws["A12"] = "last"
+    ws["J14"] = None
+    mel = str(tmp_path / "mel.xlsx")
+    wb.save(mel)
+
+    rows = list(iter_xlsx_xml_rows(mel))
+    assert rows == list(iter_xlsx_rows(mel))
+    assert [type(value) for value in rows[2]] == [
+        type(value) for value in list(iter_xlsx_rows(mel))[2]
+    ]
+
+
+def test_read_client_mels(tmp_path):
+    from openpyxl import Workbook
+
+    rows = list(iter_client_mel_rows(MEL_FILE))
+
+    wb = Workbook()
+    for name, sheet_rows in (("North", rows[:6]), ("South", rows[6:12])):
+        ws = wb.create_sheet(name)
+        for i, row in enumerate(sheet_rows):
+            for j, value in enumerate(row):
+                ws.cell(8 + i, 1 + j, value)
+    workbook = str(tmp_path / "mel.xlsx")
+    wb.save(workbook)
+
+    csv_file = str(tmp_path / "mel.csv")
+    write_csv(csv_file, rows[12:])
+
+    expected = read_client_mel(MEL_FILE)
+    for jobs in (1, 2):
+        MEL = read_client_mels([workbook, csv_file], ["North", "South"], jobs=jobs)
+        assert MEL == expected
+
+    with pytest.raises(MELError, match=rows[12][1]):
+        read_client_mels([csv_file, workbook, csv_file], ["North"])
+
+    for engine in ("openpyxl", "xml"):
+        with pytest.raises(MELError, match="has no sheet named West"):
+            read_client_mels([workbook], ["West"], engine=engine)
+    with pytest.raises(MELError, match="has no sheet named West"):
+        read_client_mel(workbook, streaming=False, sheet="West")
+
+
+def test_unsupported_mel_file():
+    with pytest.raises(ValueError):
+        mel_reader("mel.xls")
+    with pytest.raises(ValueError):
+        mel_reader(MEL_FILE, engine="unknown")
@@ -0,0 +1,56 @@
+import os
+from datetime import date, datetime
+from shutil import copyfile
+
+import eload
+from eload import read_client_mel, read_standards
+from rowcache import RowTable, load_row_cache, row_cache_file
+
+
+def test_row_table_round_trip(tmp_path):
+    rows = [
+        ("A", 1, 1.0, None, True, date(2020, 1, 2)),
+        ("B", 1.0, 1, "x", False, datetime(2020, 1, 2, 3, 4)),
+        ("A", 1, 0.1 + 0.2, None, True, date(2020, 1, 2)),
+    ]
+
+    table = RowTable()
+    for row in rows:
+        table.append(row)
+    table.save(str(tmp_path / "rows"), "digest")
+
+    cached = list(load_row_cache(str(tmp_path / "rows"), "digest"))
+    assert cached == rows
+    assert [type(value) for value in cached[1]] == [type(value) for value in rows[1]]
+
+    assert load_row_cache(str(tmp_path / "rows"), "other digest") is None
+
+
+def test_cached_readers(tmp_path, monkeypatch):
+    standards = str(tmp_path / "standards.xlsx")
+    mel = str(tmp_path / "mel.xlsx")
+    copyfile("tests/fixtures/standards.xlsx", standards)
+    copyfile("tests/fixtures/mel.xlsx", mel)
+
+    expected_standard = read_standards(standards)
+    expected_mel = read_client_mel(mel)
+
+    assert read_standards(standards, row_cache=True) == expected_standard
+    assert read_client_mel(mel, row_cache=True) == expected_mel
+    assert os.path.exists(row_cache_file(standards, "standards"))
+    assert os.path.exists(row_cache_file(mel, "mel"))
+
+    # Cache hits never open the workbooks
+    def unavailable(path):
+        raise AssertionError("workbook parsed")
+
+    monkeypatch.setattr(eload, "iter_standards_rows", unavailable)
+    monkeypatch.setattr(eload, "iter_client_mel_rows", unavailable)
+
+    assert read_standards(standards, row_cache=True) == expected_standard
+    assert read_client_mel(mel, row_cache=True) == expected_mel
+
+    columns = read_client_mel(mel, columnar=True, row_cache=True).mel
+    assert list(columns.column("installed_kw")) == [
+        me.installed_kw for me in expected_mel.mel
+    ]
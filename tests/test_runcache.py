@@ -0,0 +1,64 @@
+import os
+
+from runcache import RunCache
+
+
+def test_lru_eviction(tmp_path):
+    workbook = tmp_path / "book.xlsx"
+    workbook.write_bytes(b"x" * 1000)
+
+    cache = RunCache(str(tmp_path / "cache"), max_size=2500)
+    for key in ("a", "b"):
+        cache.store(key, "STANDARD", key, [str(workbook)])
+        os.utime(tmp_path / "cache" / key, (0, 0))
+
+    # Loading marks an entry as recently used
+    assert cache.load("a") == ("STANDARD", "a")
+
+    cache.store("c", "STANDARD", "c", [str(workbook)])
+    assert [key for key, _, _ in cache.entries()] == ["a", "c"]
+    assert cache.load("b") is None
+
+    # Corrupt entries are dropped
+    (tmp_path / "cache" / "a" / "result.pickle").write_bytes(b"corrupt")
+    assert cache.load("a") is None
+    assert [key for key, _, _ in cache.entries()] == ["c"]
+
+
+def test_key(tmp_path, monkeypatch):
+    import runcache
+
+    files = ("tests/fixtures/standards.xlsx", "tests/fixtures/mel.xlsx")
+    cache = RunCache()
+    key = cache.key(*files)
+
+    assert cache.key(*files, output_engine="template") == key
+    assert cache.key(*files, output_engine="stream") != key
+
+    # A change to the code producing the results changes every key
+    module = tmp_path / "changed.py"
+    module.write_text("CHANGED = True\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(runcache, "RESULT_MODULES", runcache.RESULT_MODULES + ["changed"])
+    assert cache.key(*files) != key
+
+
+def test_entry_evicted_before_restore(tmp_path):
+    from eload import eload
+
+    class EvictingCache(RunCache):
+        def load(self, key):
+            result = super().load(key)
+            self.purge()
+            return result
+
+    files = ("tests/fixtures/standards.xlsx", "tests/fixtures/mel.xlsx")
+    folder = str(tmp_path / "output")
+    cache = EvictingCache(str(tmp_path / "cache"))
+    assert eload(*files, cache=cache, output_folder=folder) == {}
+    assert cache.restore(cache.key(*files), folder) is True
+
+    os.remove(os.path.join(folder, "POWER SUMMARY.xlsx"))
+    assert eload(*files, cache=cache, output_folder=folder) == {}
+    assert len(os.listdir(folder)) == 4
+    assert cache.entries() == []
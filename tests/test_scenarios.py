@@ -0,0 +1,96 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import eload
+from data import CONTINGENCY_TABLE, LOAD_FACTOR, MOTOR_POWER_FACTOR
+from eload import MotorControlCenter, client_mel_builder, els_builder, read_standards
+from scenarios import Scenario, ScenarioModel, scenario_grid
+from utility import LookupTable
+
+STANDARD = read_standards("tests/fixtures/standards.xlsx")
+
+
+def random_rows(rng, count):
+    types = [row[0] for row in LOAD_FACTOR if row[2] is not None]
+    ratings = [row[0] for row in CONTINGENCY_TABLE]
+    kws = [row[0] for row in MOTOR_POWER_FACTOR if 0 < row[0] <= 30]
+
+    return [
+        (
+            121,
+            rng.choice(types),
+            str(i),
+            "EQUIPMENT",
+            2,
+            "MCC-{:03d}".format(rng.randint(1, 8)),
+            rng.choice(kws),
+            rng.choice(["DOL", "VSD", "FEEDER"]),
+            415,
+            rng.choice(["DUTY", "DUTY", 2]),
+            "A",
+            rng.choice(ratings),
+        )
+        for i in range(count)
+    ]
+
+
+def assert_matches_els(result, i, els):
+    assert result.mcc_names == [mcc.name for mcc in els.mccl]
+    for j, mcc in enumerate(els.mccl):
+        assert result.total_actual_contingency[i, j] == mcc.total_actual_contingency
+        assert result.tx_size[i, j] == mcc.tx_size
+        assert result.spare_tx[i, j] == mcc.spare_tx
+        assert result.spare_starters[i, j] == mcc.spare_starters
+        assert result.total_mcc_load_allowed[i, j] == mcc.total_mcc_load_allowed
+    assert result.total_transformer_cost[i] == els.total_transformer_cost
+
+
+def test_scenarios_match_els_builder(monkeypatch):
+    rng = random.Random(0)
+    rows = random_rows(rng, 600)
+    model = ScenarioModel(STANDARD, client_mel_builder(rows))
+
+    load_factors = {row[0]: (rng.random(), rng.random()) for row in LOAD_FACTOR[:20]}
+    scenarios = [
+        Scenario("base"),
+        Scenario("loads", load_factors=load_factors),
+        Scenario("combined", "1", 0.35, load_factors),
+    ] + scenario_grid(["1", "2", "3", "4", "5"], [0.1, 0.25])
+    result = model.evaluate(scenarios)
+
+    for i, scenario in enumerate(scenarios):
+        scenario_rows = rows
+        if scenario.procurement_rating is not None:
+            scenario_rows = [row[:11] + (scenario.procurement_rating,) for row in rows]
+
+        table = [
+            row[:2] + list(load_factors[row[0]]) if row[0] in scenario.load_factors else row
+            for row in LOAD_FACTOR
+        ]
+        with monkeypatch.context() as patch:
+            patch.setattr(eload, "LOAD_FACTOR_LOOKUP", LookupTable(table))
+            if scenario.contingency_factor_percent is not None:
+                patch.setattr(
+                    MotorControlCenter,
+                    "contingency_factor_percent",
+                    scenario.contingency_factor_percent,
+                )
+            els = els_builder(STANDARD, client_mel_builder(scenario_rows))
+
+        assert_matches_els(result, i, els)
+
+
+def test_oversized_scenario():
+    rows = [row[:5] + ("MCC-001",) + row[6:] for row in random_rows(random.Random(1), 1200)]
+    model = ScenarioModel(STANDARD, client_mel_builder(rows))
+
+    everything_runs = {row[0]: (1, 1) for row in LOAD_FACTOR if row[2] is not None}
+    result = model.evaluate([Scenario("base"), Scenario("heavy", load_factors=everything_runs)])
+
+    assert result.tx_size[0, 0] > 0
+    assert result.tx_size[1, 0] == 0
+    assert np.isnan(result.total_transformer_cost[1])
+    assert list(result.rows())[1][3:6] == [0, None, None]
@@ -0,0 +1,73 @@
+import os
+import threading
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+
+from server import JobError, JobServer, submit_job
+
+
+@pytest.fixture
+def server(tmp_path):
+    server = JobServer(
+        ("127.0.0.1", 0), workers=1, queue_size=1, output_root=str(tmp_path / "jobs")
+    )
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    yield "http://127.0.0.1:{}".format(server.server_address[1])
+    server.shutdown()
+    thread.join()
+    server.server_close()
+
+
+def test_submit_job(server, tmp_path):
+    output = tmp_path / "jobs" / "output"
+    reply = submit_job(
+        "tests/fixtures/standards.xlsx", "tests/fixtures/mel.xlsx", str(output), server
+    )
+
+    assert reply["errors"] == {}
+    assert reply["output"] == str(output)
+    assert reply["files"] == sorted(os.listdir(output))
+    assert len(reply["files"]) == 4
+
+    with urlopen(server + "/health") as response:
+        assert b'"completed": 1' in response.read()
+
+
+def test_refused_job(server, tmp_path):
+    with pytest.raises(JobError) as error:
+        submit_job("tests/fixtures/standards.xlsx", "missing.xlsx", str(tmp_path), server)
+    assert error.value.status == 400
+
+    for output in (tmp_path, tmp_path / "jobs" / ".." / "elsewhere"):
+        with pytest.raises(JobError) as error:
+            submit_job(
+                "tests/fixtures/standards.xlsx",
+                "tests/fixtures/mel.xlsx",
+                str(output),
+                server,
+            )
+        assert error.value.status == 403
+    assert not (tmp_path / "elsewhere").exists()
+
+
+def test_refused_request(server):
+    def post(data, **headers):
+        request = Request(server + "/jobs", data=data, headers=headers)
+        with pytest.raises(HTTPError) as error:
+            urlopen(request)
+        return error.value.code
+
+    job = b'{"standards": "a", "mel": "b", "output": "c"}'
+    assert post(job) == 415
+    assert post(job, **{"Content-Type": "text/plain"}) == 415
+    assert post(job, **{"Content-Type": "application/json", "Host": "evil.example"}) == 403
+    assert post(b"[1, 2]", **{"Content-Type": "application/json"}) == 400
+    assert post(b"not json", **{"Content-Type": "application/json; charset=utf-8"}) == 400
+
+    localhost = server.replace("127.0.0.1", "localhost")
+    with pytest.raises(JobError) as error:
+        submit_job("a.xlsx", "b.xlsx", "c", localhost)
+    assert error.value.status == 400
@@ -0,0 +1,42 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from eload import els_builder, read_client_mel, read_standards
+from simulation import FactorDistribution, LoadSimulation, report_columns
+
+ELS = els_builder(
+    read_standards("tests/fixtures/standards.xlsx"),
+    read_client_mel("tests/fixtures/mel.xlsx"),
+)
+
+
+@pytest.mark.parametrize("kind", ["triangular", "uniform", "normal"])
+def test_simulation_without_spread(kind):
+    simulation = LoadSimulation(ELS)
+    no_spread = FactorDistribution(kind, 0)
+    result = simulation.run(100, no_spread, no_spread, seed=0)
+
+    expected = [mcc.total_actual_contingency for mcc in ELS.mccl]
+    for row in result.percentiles:
+        np.testing.assert_allclose(row, expected)
+    assert not result.exceed_probability.any()
+    assert result.els_total_actual_contingency == pytest.approx(sum(expected))
+
+
+def test_simulation_with_spread():
+    simulation = LoadSimulation(ELS)
+    result = simulation.run(25000, FactorDistribution("uniform", 0.5), seed=1)
+
+    assert result.trials == 25000
+    assert (np.diff(result.percentiles, axis=0) >= 0).all()
+    assert ((result.upsize_probability >= 0) & (result.upsize_probability <= 1)).all()
+    assert (result.exceed_probability <= result.upsize_probability).all()
+    assert result.els_upsize_probability >= result.upsize_probability.max()
+
+    rows = list(result.rows())
+    assert [row[0] for row in rows] == [mcc.name for mcc in ELS.mccl] + ["ELS"]
+    assert all(len(row) == len(report_columns()) for row in rows)
+
+    again = simulation.run(25000, FactorDistribution("uniform", 0.5), seed=1)
+    np.testing.assert_array_equal(again.percentiles, result.percentiles)
@@ -0,0 +1,44 @@
+from data import (CONTINGENCY_TABLE, LOAD_FACTOR, MOTOR_POWER_FACTOR,
+                  TRANSFORMER_PRICING)
+from utility import LookupTable, vlookup
+
+
+def test_lookup_table_approximate_match():
+    lookup_table = LookupTable(MOTOR_POWER_FACTOR)
+    keys = [-1, 0, 0.05, 0.06, 0.1, 2.2, 2.3, 7.5, 1000, 6000, 10000]
+
+    for key in keys:
+        for column in (1, 2):
+            assert lookup_table.lookup(key, column) == vlookup(key, MOTOR_POWER_FACTOR, column)
+
+
+def test_lookup_table_string_keys():
+    for table in (LOAD_FACTOR, CONTINGENCY_TABLE):
+        lookup_table = LookupTable(table)
+        keys = [row[0] for row in table] + ["", "A", "CZ", "ZZ", "0", "6"]
+
+        for key in keys:
+            for approximate_match in (True, False):
+                assert lookup_table.lookup(key, 1, approximate_match) == vlookup(
+                    key, table, 1, approximate_match
+                )
+
+
+def test_lookup_table_exact_match():
+    lookup_table = LookupTable(TRANSFORMER_PRICING)
+
+    assert lookup_table.lookup(750, 1, False) == 55000
+    assert lookup_table.lookup(750.0, 1, False) == 55000
+    assert lookup_table.lookup(751, 1, False) is None
+    assert lookup_table.lookup(751, 1) == 55000
+
+
+def test_lookup_table_duplicate_keys():
+    table = [[1, "a"], [2, "b"], [2, "c"], [3, "d"]]
+    lookup_table = LookupTable(table)
+
+    for key in (0, 1, 2, 2.5, 3, 4):
+        for approximate_match in (True, False):
+            assert lookup_table.lookup(key, 1, approximate_match) == vlookup(
+                key, table, 1, approximate_match
+            )
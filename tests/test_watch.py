@@ -0,0 +1,50 @@
+import os
+from shutil import copyfile
+
+from eload import els_builder, read_client_mel, read_standards
+from watch import Watcher
+
+
+def test_watcher_rebuilds_changed_mccs(tmp_path):
+    from openpyxl import load_workbook
+
+    standards = str(tmp_path / "standards.xlsx")
+    mel = str(tmp_path / "mel.xlsx")
+    copyfile("tests/fixtures/standards.xlsx", standards)
+    copyfile("tests/fixtures/mel.xlsx", mel)
+
+    watcher = Watcher(standards, mel)
+    changed, errors = watcher.poll()
+    assert changed == ["MCC-001", "MCC-002", "MCC-003"]
+    assert errors == {}
+    assert watcher.poll() is None
+
+    # Change the installed kW of one MCC-002 motor
+    wb = load_workbook(mel)
+    ws = wb.active
+    for row in ws.iter_rows(min_row=8, max_col=12):
+        if row[5].value == "MCC-002":
+            row[6].value = row[6].value * 2
+            break
+    wb.save(mel)
+    os.utime(mel, ns=(10 ** 9, 10 ** 9))
+
+    changed, errors = watcher.poll()
+    assert changed == ["MCC-002"]
+    assert errors == {}
+    assert watcher.els == els_builder(read_standards(standards), read_client_mel(mel))
+
+    # A broken save is reported once and picked up again once fixed
+    with open(mel, "wb") as f:
+        f.write(b"partial")
+    try:
+        watcher.poll()
+    except Exception:
+        pass
+    else:
+        raise AssertionError("broken MEL read")
+    assert watcher.poll() is None
+
+    wb.save(mel)
+    os.utime(mel, ns=(2 * 10 ** 9, 2 * 10 ** 9))
+    assert watcher.poll() == ([], {})
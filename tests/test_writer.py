@@ -0,0 +1,132 @@
+import os
+
+from eload import els_builder, read_client_mel, read_standards
+from writer import clear_output, write_outputs
+
+
+def build():
+    STANDARD = read_standards("tests/fixtures/standards.xlsx")
+    MEL = read_client_mel("tests/fixtures/mel.xlsx")
+    return els_builder(STANDARD, MEL), STANDARD
+
+
+def test_write_outputs_collects_errors():
+    els, STANDARD = build()
+    els.mccl[1].name = "MCC/002"
+
+    for jobs in (1, 2):
+        clear_output()
+        errors = write_outputs(els, STANDARD, jobs)
+
+        assert list(errors) == ["MCC/002"]
+        assert sorted(os.listdir("output")) == [
+            "ELECTRICAL LOADS LIST SUBSTATION - MCC-001.xlsx",
+            "ELECTRICAL LOADS LIST SUBSTATION - MCC-003.xlsx",
+            "POWER SUMMARY.xlsx",
+        ]
+
+
+def test_template_cache(tmp_path):
+    from shutil import copyfile
+
+    from writer import TemplateCache
+
+    template = str(tmp_path / "template.xlsx")
+    copyfile("src/templates/mcc_template.xlsx", template)
+
+    cache = TemplateCache()
+    first = cache.get(template)
+    parsed = cache.templates[template][2]
+    second = cache.get(template)
+
+    assert first is not second
+    first["Template for MCC"]["A9"] = "changed"
+    assert second["Template for MCC"]["A9"].value is None
+    assert parsed["Template for MCC"]["A9"].value is None
+
+    # Touching the file keeps the parsed template while the content is unchanged
+    os.utime(template, ns=(0, 0))
+    cache.get(template)
+    assert cache.templates[template][2] is parsed
+
+    # Changed content is parsed again
+    copyfile("src/templates/electrical_load_summary_template.xlsx", template)
+    os.utime(template, ns=(10 ** 9, 10 ** 9))
+    assert cache.get(template).sheetnames == ["ELECTRICAL LOAD SUMMARY"]
+    assert cache.templates[template][2] is not parsed
+
+
+def test_stream_engine(tmp_path):
+    from copy import copy
+
+    from openpyxl import load_workbook
+
+    els, STANDARD = build()
+
+    outputs = {}
+    for engine in ("template", "stream"):
+        outputs[engine] = tmp_path / engine
+        outputs[engine].mkdir()
+        assert write_outputs(els, STANDARD, engine=engine, folder=str(outputs[engine])) == {}
+
+    names = sorted(os.listdir(outputs["template"]))
+    assert sorted(os.listdir(outputs["stream"])) == names
+
+    for name in names:
+        expected = load_workbook(outputs["template"] / name).active
+        actual = load_workbook(outputs["stream"] / name).active
+
+        assert actual.title == expected.title
+        assert actual.max_row == expected.max_row
+        assert actual.print_area == expected.print_area
+        assert actual.merged_cells.ranges == expected.merged_cells.ranges
+        for expected_row, actual_row in zip(expected.iter_rows(), actual.iter_rows()):
+            for expected_cell, actual_cell in zip(expected_row, actual_row):
+                assert actual_cell.value == expected_cell.value
+                for name in ("font", "border", "fill", "alignment", "protection"):
+                    assert copy(getattr(actual_cell, name)) == copy(
+                        getattr(expected_cell, name)
+                    )
+                assert actual_cell.number_format == expected_cell.number_format
+
+
+def test_incremental_outputs():
+    els, STANDARD = build()
+    mcc_file = "output/ELECTRICAL LOADS LIST SUBSTATION - {}.xlsx"
+
+    clear_output()
+    assert write_outputs(els, STANDARD, incremental=True) == {}
+    assert sorted(os.listdir("output")) == [
+        "ELECTRICAL LOADS LIST SUBSTATION - MCC-001.xlsx",
+        "ELECTRICAL LOADS LIST SUBSTATION - MCC-002.xlsx",
+        "ELECTRICAL LOADS LIST SUBSTATION - MCC-003.xlsx",
+        "POWER SUMMARY.xlsx",
+        "manifest.json",
+    ]
+
+    def mark(path):
+        with open(path, "w") as f:
+            f.write("unchanged")
+
+    def marked(path):
+        with open(path, "rb") as f:
+            return f.read() == b"unchanged"
+
+    for name in ("MCC-001", "MCC-002", "MCC-003"):
+        mark(mcc_file.format(name))
+    mark("output/POWER SUMMARY.xlsx")
+
+    # Only the changed MCC is rewritten
+    els.mccl[1].spare_starters += 1
+    assert write_outputs(els, STANDARD, incremental=True) == {}
+    assert marked(mcc_file.format("MCC-001"))
+    assert not marked(mcc_file.format("MCC-002"))
+    assert marked(mcc_file.format("MCC-003"))
+    assert marked("output/POWER SUMMARY.xlsx")
+
+    # Removed MCCs are cleaned up and the totals rewritten
+    els.mccl.pop()
+    assert write_outputs(els, STANDARD, incremental=True) == {}
+    assert not os.path.exists(mcc_file.format("MCC-003"))
+    assert marked(mcc_file.format("MCC-001"))
+    assert not marked("output/POWER SUMMARY.xlsx")